@@ -3,3 +3,6 @@ from django.apps import AppConfig
 class BooksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.books'
+
+    def ready(self):
+        import apps.books.signals  # Register signals
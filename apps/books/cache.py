@@ -0,0 +1,138 @@
+"""
+Generation counters for catalog data, and a cached-query helper built on them.
+
+Each name (usually a model label such as 'books.Book') maps to a Generation
+row that is bumped whenever the underlying rows change. The counters live in
+the database, so all workers agree on them and they never move backwards
+across restarts or cache evictions. Per-process structures (facet bitmaps,
+prefix indexes, ...) remember the generation they were built from and rebuild
+when it moves; cached_query puts the generations of the models a query reads
+into its cache key.
+
+The cached values and single-flight locks use the default cache; production
+configures a shared (database) cache so workers share them as well.
+"""
+import math
+import random
+import time
+from django.core.cache import cache
+from django.db import connection
+from .models.generation import Generation
+
+# Bumped on any change that can alter catalog listings (books, their relations)
+CATALOG_GENERATION = 'books.catalog'
+AUTHOR_GENERATION = 'books.Author'
+CATEGORY_GENERATION = 'books.Category'
+BOOK_GENERATION = 'books.Book'
+
+
+def _seed():
+    # New rows start from the clock, so a counter that is recreated (table
+    # emptied, test database rolled back) never repeats a value some process
+    # may still be holding.
+    return int(time.time() * 1000)
+
+
+def get_generation(name):
+    return get_generations(name)[0]
+
+
+def bump_generation(name):
+    """Increments the named generation (creating it if needed) and returns the new value."""
+    table = connection.ops.quote_name(Generation._meta.db_table)
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            # LAST_INSERT_ID(expr) makes the new value readable on this connection
+            cursor.execute(
+                f'INSERT INTO {table} (name, value) VALUES (%s, LAST_INSERT_ID(%s)) '
+                f'ON DUPLICATE KEY UPDATE value = LAST_INSERT_ID(value + 1)',
+                [name, _seed()],
+            )
+            cursor.execute('SELECT LAST_INSERT_ID()')
+        else:
+            cursor.execute(
+                f'INSERT INTO {table} (name, value) VALUES (%s, %s) '
+                f'ON CONFLICT (name) DO UPDATE SET value = {table}.value + 1 RETURNING value',
+                [name, _seed()],
+            )
+        return cursor.fetchone()[0]
+
+
+def get_generations(*names):
+    """Tuple of generations for several names, read in one query (missing ones are created)."""
+    values = dict(Generation.objects.filter(name__in=names).values_list('name', 'value'))
+    missing = [name for name in names if name not in values]
+    if missing:
+        Generation.objects.bulk_create(
+            [Generation(name=name, value=_seed()) for name in missing], ignore_conflicts=True
+        )
+        values.update(Generation.objects.filter(name__in=missing).values_list('name', 'value'))
+    return tuple(values[name] for name in names)
+
+
+def model_generation_name(model):
+    return model._meta.label
+
+
+# ==========================================
+# 🗄️ CACHED QUERIES
+# ==========================================
+QUERY_KEY_PREFIX = 'query:'
+# How long a recomputation may hold the lock before others take over
+LOCK_TIMEOUT = 30
+LOCK_POLL_INTERVAL = 0.05
+
+
+def cached_query(key, compute, models=(), timeout=60 * 15, beta=1.0):
+    """
+    Returns compute(), cached under key until the timeout passes or any of
+    models changes (their generations are part of the cache key).
+
+    * Empty results are cached like any other value: entries are stored as
+      (value, compute_time, expires_at) tuples, so only a missing key is a miss.
+    * Single flight: on a miss one caller recomputes under a cache.add() lock;
+      the others wait for its result instead of querying too.
+    * Early refresh (XFetch): shortly before expiry a caller may volunteer to
+      recompute, with a probability that grows as expiry approaches and with
+      how slow compute() is, so a hot key is refreshed before it expires.
+    """
+    generations = get_generations(*[model_generation_name(model) for model in models])
+    cache_key = QUERY_KEY_PREFIX + key + ':' + '.'.join(map(str, generations))
+    lock_key = cache_key + ':lock'
+
+    entry = cache.get(cache_key)
+    if entry is not None:
+        value, compute_time, expires_at = entry
+        if time.time() - compute_time * beta * math.log(random.random() or 1e-12) < expires_at:
+            return value
+        if not cache.add(lock_key, 1, LOCK_TIMEOUT):
+            # Someone else is already refreshing; the current value is still valid
+            return value
+        return _recompute(cache_key, lock_key, compute, timeout)
+
+    deadline = time.time() + LOCK_TIMEOUT
+    while not cache.add(lock_key, 1, LOCK_TIMEOUT):
+        time.sleep(LOCK_POLL_INTERVAL)
+        entry = cache.get(cache_key)
+        if entry is not None:
+            return entry[0]
+        if time.time() > deadline:
+            # The lock holder is gone or stuck: compute without it
+            return compute()
+    entry = cache.get(cache_key)
+    if entry is not None:
+        # Filled between our miss and taking the lock
+        cache.delete(lock_key)
+        return entry[0]
+    return _recompute(cache_key, lock_key, compute, timeout)
+
+
+def _recompute(cache_key, lock_key, compute, timeout):
+    try:
+        started = time.time()
+        value = compute()
+        compute_time = time.time() - started
+        cache.set(cache_key, (value, compute_time, time.time() + timeout), timeout)
+        return value
+    finally:
+        cache.delete(lock_key)
@@ -0,0 +1,60 @@
+"""
+Conditional GET (ETag / Last-Modified) for catalog pages.
+
+Validators are computed from cheap version stamps, never from the rendered
+HTML, so a matching If-None-Match / If-Modified-Since is answered with a 304
+before any template work happens.
+
+Pages also carry per-visitor bits (cart badge, wishlist hearts, flash
+messages). Validators are therefore only issued to "shareable" requests:
+anonymous visitors with an empty cart and no pending messages, whose page
+is identical to everyone else's. Everybody else gets a plain 200.
+"""
+import hashlib
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_vary_headers, quote_etag
+from django.utils.http import http_date
+
+
+def is_shareable(request):
+    if request.method not in ('GET', 'HEAD') or request.user.is_authenticated:
+        return False
+    if request.COOKIES.get('messages') or request.session.get('_messages'):
+        return False
+    if request.session.get(getattr(settings, 'CART_SESSION_LINES', 'cart_lines')):
+        return False
+    cart_id = request.session.get(settings.CART_SESSION_ID)
+    if cart_id:
+        from apps.cart.models import CartItem
+        if CartItem.objects.filter(cart_id=cart_id).exists():
+            return False
+    return True
+
+
+def make_etag(*parts):
+    return hashlib.md5(':'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+def conditional_response(request, render, etag=None, last_modified=None):
+    """
+    Returns a 304 when the client's validators match, otherwise render()
+    with ETag/Last-Modified attached. etag and last_modified are callables,
+    only evaluated for shareable requests.
+    """
+    if not is_shareable(request):
+        return render()
+
+    etag = quote_etag(etag()) if etag else None
+    last_modified = last_modified() if last_modified else None
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        response = render()
+        if response.status_code == 200:
+            if etag:
+                response.headers.setdefault('ETag', etag)
+            if timestamp:
+                response.headers.setdefault('Last-Modified', http_date(timestamp))
+    patch_vary_headers(response, ['Cookie'])
+    return response
@@ -0,0 +1,183 @@
+"""
+Precomputed facet bitmaps for the catalog sidebar.
+
+For every facet value (a category subtree, an author, a format, a language,
+a price bucket) we keep a Python int used as a bitset over book ids. Counting how
+many books of the current result set fall into each value is then
+``(result_mask & bitmap).bit_count()`` per value: no GROUP BY queries, only
+the id list of the already filtered result set.
+
+The index lives in process memory, is built lazily, updated in place when a
+book changes in this process and rebuilt when another process bumps the
+catalog generation.
+"""
+import threading
+from decimal import Decimal
+from django.db import transaction
+from .cache import get_generation, bump_generation, CATALOG_GENERATION
+
+GENERATION = CATALOG_GENERATION
+
+FACETS = ('category', 'author', 'format', 'language', 'price')
+
+# [low, high) in AZN; None means open-ended
+PRICE_BUCKETS = (
+    (Decimal('0'), Decimal('10')),
+    (Decimal('10'), Decimal('20')),
+    (Decimal('20'), Decimal('30')),
+    (Decimal('30'), Decimal('50')),
+    (Decimal('50'), None),
+)
+
+
+def price_bucket(price):
+    if price is None:
+        return None
+    for index, (low, high) in enumerate(PRICE_BUCKETS):
+        if price >= low and (high is None or price < high):
+            return index
+    return None
+
+
+def _bitmap(ids):
+    """Builds a bitset from an iterable of non-negative ints in O(n)."""
+    ids = list(ids)
+    if not ids:
+        return 0
+    buffer = bytearray(max(ids) // 8 + 1)
+    for book_id in ids:
+        buffer[book_id >> 3] |= 1 << (book_id & 7)
+    return int.from_bytes(buffer, 'little')
+
+
+class FacetIndex:
+    def __init__(self):
+        self.bitmaps = {facet: {} for facet in FACETS}
+        self.book_values = {}  # book_id -> {facet: set of values}
+        self.generation = None
+        self._lock = threading.Lock()
+
+    # ==========================================
+    # 🏗️ BUILDING
+    # ==========================================
+    def _load(self, book_ids=None):
+        """Reads facet values for active books (all of them, or just book_ids)."""
+        from apps.books.models import Book
+
+        books = Book.objects.filter(is_active=True)
+        categories = Book.categories.through.objects.filter(book__is_active=True)
+        authors = Book.authors.through.objects.filter(book__is_active=True)
+        if book_ids is not None:
+            books = books.filter(id__in=book_ids)
+            categories = categories.filter(book_id__in=book_ids)
+            authors = authors.filter(book_id__in=book_ids)
+
+        values = {}
+        for book_id, book_format, language, price in books.values_list('id', 'format', 'language', 'price'):
+            values[book_id] = {
+                'category': set(),
+                'author': set(),
+                'format': {book_format},
+                'language': {language},
+                'price': {price_bucket(price)} - {None},
+            }
+        for book_id, category_path in categories.values_list('book_id', 'category__path'):
+            if book_id in values:
+                # A book counts towards its categories and all their ancestors
+                values[book_id]['category'].update(
+                    int(part) for part in category_path.split('/') if part
+                )
+        for book_id, author_id in authors.values_list('book_id', 'author_id'):
+            if book_id in values:
+                values[book_id]['author'].add(author_id)
+        return values
+
+    def build(self):
+        generation = get_generation(GENERATION)
+        book_values = self._load()
+
+        members = {facet: {} for facet in FACETS}
+        for book_id, facets in book_values.items():
+            for facet, facet_values in facets.items():
+                for value in facet_values:
+                    members[facet].setdefault(value, []).append(book_id)
+
+        bitmaps = {
+            facet: {value: _bitmap(ids) for value, ids in values.items()}
+            for facet, values in members.items()
+        }
+        with self._lock:
+            self.bitmaps = bitmaps
+            self.book_values = book_values
+            self.generation = generation
+
+    # ==========================================
+    # 🔄 INCREMENTAL UPDATES
+    # ==========================================
+    def update_books(self, book_ids):
+        fresh = self._load(book_ids)
+        with self._lock:
+            for book_id in book_ids:
+                bit = 1 << book_id
+                for facet, facet_values in self.book_values.pop(book_id, {}).items():
+                    for value in facet_values:
+                        self.bitmaps[facet][value] &= ~bit
+                for facet, facet_values in fresh.get(book_id, {}).items():
+                    for value in facet_values:
+                        self.bitmaps[facet][value] = self.bitmaps[facet].get(value, 0) | bit
+                if book_id in fresh:
+                    self.book_values[book_id] = fresh[book_id]
+
+    # ==========================================
+    # 📊 COUNTING
+    # ==========================================
+    def totals(self, facet):
+        """Returns {value: number of active books} for one facet."""
+        with self._lock:
+            return {value: bitmap.bit_count() for value, bitmap in self.bitmaps[facet].items()}
+
+    def counts(self, book_ids):
+        """Returns {facet: {value: count}} for the given result set, omitting zero counts."""
+        mask = _bitmap(book_ids)
+        result = {}
+        with self._lock:
+            for facet, values in self.bitmaps.items():
+                facet_counts = {}
+                for value, bitmap in values.items():
+                    count = (mask & bitmap).bit_count()
+                    if count:
+                        facet_counts[value] = count
+                result[facet] = facet_counts
+        return result
+
+
+_index = FacetIndex()
+_build_lock = threading.Lock()
+
+
+def get_facet_index():
+    """Returns the process-wide index, (re)building it if it is missing or stale."""
+    if _index.generation is None or _index.generation != get_generation(GENERATION):
+        with _build_lock:
+            if _index.generation is None or _index.generation != get_generation(GENERATION):
+                _index.build()
+    return _index
+
+
+def books_changed(book_ids):
+    """Applies changes to the local index once the surrounding transaction commits."""
+    book_ids = list(book_ids)
+
+    def apply():
+        generation = bump_generation(GENERATION)
+        if _index.generation is not None and _index.generation == generation - 1:
+            _index.update_books(book_ids)
+            _index.generation = generation
+        # Otherwise the index is stale or not built; the next read rebuilds it.
+
+    transaction.on_commit(apply)
+
+
+def invalidate():
+    """Forces a full rebuild everywhere (used when cascades bypass per-book signals)."""
+    transaction.on_commit(lambda: bump_generation(GENERATION))
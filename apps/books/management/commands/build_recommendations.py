@@ -0,0 +1,21 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from apps.books.recommendations import build_recommendations
+
+class Command(BaseCommand):
+    help = 'Rebuilds "customers also bought" recommendations from order history'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=10, help='Neighbours to keep per book')
+        parser.add_argument('--min-support', type=int, default=1, help='Minimum number of shared orders')
+        parser.add_argument('--days', type=int, default=None, help='Only use orders from the last N days')
+
+    def handle(self, *args, **options):
+        since = None
+        if options['days']:
+            since = timezone.now() - timedelta(days=options['days'])
+
+        self.stdout.write('Counting co-purchases...')
+        count = build_recommendations(top_k=options['top'], min_support=options['min_support'], since=since)
+        self.stdout.write(self.style.SUCCESS(f'Successfully stored {count} recommendations!'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from apps.books import search
+
+class Command(BaseCommand):
+    help = 'Rebuilds the full-text search index for all active books'
+
+    def handle(self, *args, **kwargs):
+        if not search.is_supported():
+            self.stdout.write(self.style.WARNING('Full-text index requires SQLite (FTS5); nothing to do.'))
+            return
+
+        self.stdout.write('Rebuilding search index...')
+        count = search.rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f'Successfully indexed {count} books!'))
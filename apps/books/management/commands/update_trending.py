@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from apps.books.trending import update_trending
+
+class Command(BaseCommand):
+    help = 'Updates trending scores, sales counts and bestseller flags from new orders and views'
+
+    def handle(self, *args, **kwargs):
+        self.stdout.write('Updating trending scores...')
+        result = update_trending()
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['units_sold']} units of {result['books_sold']} books sold in the window "
+            f"(order lines read up to #{result['watermark']}); {result['bestsellers']} bestsellers."
+        ))
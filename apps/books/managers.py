@@ -1,19 +1,66 @@
-from django.db import models
-from django.db.models import Avg, Count, Q
+from django.db import models, transaction
+from django.db.models import Avg, Count, Sum, Value, OuterRef, Subquery, FloatField
+from django.db.models.functions import Coalesce, Cast
+from django.utils import timezone
+from .cache import bump_generation, BOOK_GENERATION
 
-class BookManager(models.Manager):
+class BookQuerySet(models.QuerySet):
+    def touch(self):
+        """Bumps updated_at (and so the cached cards) without sending signals."""
+        return self.update(updated_at=timezone.now())
+
+    def in_category_tree(self, category):
+        """Books filed under the category or any of its descendants (no JOIN, no DISTINCT)."""
+        from apps.books.models.category import subtree_lookup
+
+        book_ids = self.model.categories.through.objects.filter(
+            **subtree_lookup(category.path, 'category__path')
+        ).values('book_id')
+        return self.filter(id__in=book_ids)
+
+    def with_available_stock(self, exclude_holder=None):
+        """
+        Annotates available_stock: stock minus active checkout reservations
+        (other than exclude_holder's own), in the same query.
+        """
+        from apps.orders.reservations import reserved_quantity
+
+        return self.annotate(available_stock=models.F('stock') - reserved_quantity(exclude_holder))
+
+    def refresh_ratings(self):
+        """
+        Recomputes the denormalized rating columns (rating_avg, rating_count,
+        rating_score) for the books in this queryset with a single UPDATE.
+        Called whenever reviews are created, edited, deleted or (de)activated.
+        """
+        from apps.reviews.models import Review
+
+        active_reviews = Review.objects.filter(book=OuterRef('pk'), is_active=True).order_by().values('book')
+        review_count = Coalesce(Subquery(active_reviews.annotate(n=Count('id')).values('n')), 0)
+        rating_sum = Coalesce(
+            Subquery(active_reviews.annotate(total=Sum('rating')).values('total')),
+            0,
+        )
+        rating_avg = Coalesce(
+            Subquery(active_reviews.annotate(avg=Avg('rating')).values('avg')),
+            Value(0.0),
+        )
+        prior_weight = self.model.RATING_PRIOR_WEIGHT
+        prior_mean = self.model.RATING_PRIOR_MEAN
+        # A queryset update sends no Book signals: bump cached queries ourselves
+        transaction.on_commit(lambda: bump_generation(BOOK_GENERATION))
+        return self.update(
+            rating_count=review_count,
+            rating_avg=rating_avg,
+            rating_score=(
+                (Value(prior_weight * prior_mean) + Cast(rating_sum, FloatField()))
+                / (Value(float(prior_weight)) + Cast(review_count, FloatField()))
+            ),
+        )
+
+class BookManager(models.Manager.from_queryset(BookQuerySet)):
     def get_queryset(self):
         # We override get_queryset to ensure 'is_active' filter is not applied globally by default unless desired.
         # But typically managers just return the base queryset.
         # Here we just return the default queryset.
         return super().get_queryset()
-
-    def with_stats(self):
-        """
-        Annotates the queryset with average rating and review count.
-        Using this prevents N+1 queries when accessing avg_rating and review_count.
-        """
-        return self.annotate(
-            _avg_rating=Avg('reviews__rating', filter=Q(reviews__is_active=True)),
-            _review_count=Count('reviews', filter=Q(reviews__is_active=True))
-        )
@@ -0,0 +1,48 @@
+from django.db import migrations
+
+CREATE_SQL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS books_book_search USING fts5(
+    title, subtitle, description, authors, isbn,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+)
+"""
+
+POPULATE_SQL = """
+INSERT INTO books_book_search (rowid, title, subtitle, description, authors, isbn)
+SELECT
+    b.id, b.title, b.subtitle, b.description,
+    COALESCE((
+        SELECT group_concat(a.name, ' ')
+        FROM books_author a
+        JOIN books_book_authors ba ON ba.author_id = a.id
+        WHERE ba.book_id = b.id
+    ), ''),
+    b.isbn
+FROM books_book b
+WHERE b.is_active
+"""
+
+
+def create_search_index(apps, schema_editor):
+    # FTS5 is SQLite-only; other backends keep using icontains lookups.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(CREATE_SQL)
+    schema_editor.execute(POPULATE_SQL)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute('DROP TABLE IF EXISTS books_book_search')
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("books", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,64 @@
+import unicodedata
+from django.db import migrations
+
+# Frozen copy of apps.books.search.normalize.fold as of this migration, so
+# later changes to the live code can't change what this migration does.
+LATIN_FOLD = str.maketrans({
+    'ə': 'e',
+    'ı': 'i',
+    'ø': 'o',
+    'ß': 'ss',
+    'æ': 'ae',
+    'œ': 'oe',
+})
+CYRILLIC_FOLD = str.maketrans({
+    'а': 'a', 'б': 'b', 'в': 'v', 'г': 'q', 'ғ': 'g', 'д': 'd', 'е': 'e',
+    'ә': 'e', 'ж': 'j', 'з': 'z', 'и': 'i', 'ы': 'i', 'ј': 'y', 'й': 'y',
+    'к': 'k', 'ҝ': 'g', 'л': 'l', 'м': 'm', 'н': 'n', 'о': 'o', 'ө': 'o',
+    'п': 'p', 'р': 'r', 'с': 's', 'т': 't', 'у': 'u', 'ү': 'u', 'ф': 'f',
+    'х': 'x', 'һ': 'h', 'ч': 'c', 'ҹ': 'c', 'ш': 's', 'щ': 's', 'ц': 'ts',
+    'э': 'e', 'ю': 'yu', 'я': 'ya', 'ё': 'yo', 'ь': '', 'ъ': '',
+})
+
+
+def fold(text):
+    if not text:
+        return ''
+    text = text.lower().translate(LATIN_FOLD).translate(CYRILLIC_FOLD)
+    text = unicodedata.normalize('NFKD', text)
+    return ''.join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def refold_search_index(apps, schema_editor):
+    """Rewrites existing index rows in folded form (see apps.books.search.normalize)."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    Book = apps.get_model('books', 'Book')
+    rows = [
+        (
+            book.id,
+            fold(book.title),
+            fold(book.subtitle),
+            fold(book.description),
+            fold(' '.join(author.name for author in book.authors.all())),
+            book.isbn,
+        )
+        for book in Book.objects.filter(is_active=True).prefetch_related('authors')
+    ]
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute('DELETE FROM books_book_search')
+        cursor.executemany(
+            'INSERT INTO books_book_search (rowid, title, subtitle, description, authors, isbn) '
+            'VALUES (%s, %s, %s, %s, %s, %s)',
+            rows,
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("books", "0002_book_search_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(refold_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.10 on 2026-10-18 12:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("books", "0003_fold_search_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(
+                fields=["is_active", "created_at", "id"], name="books_book_is_acti_df676a_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(
+                fields=["is_active", "price", "id"], name="books_book_is_acti_274e50_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(
+                fields=["is_active", "views_count", "id"], name="books_book_is_acti_4ca4c8_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.10 on 2026-10-18 12:29
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Avg, Count, Sum
+
+# Mirrors Book.RATING_PRIOR_WEIGHT / Book.RATING_PRIOR_MEAN at the time of writing
+PRIOR_WEIGHT = 5
+PRIOR_MEAN = 3.0
+
+
+def backfill_ratings(apps, schema_editor):
+    Book = apps.get_model("books", "Book")
+    Review = apps.get_model("reviews", "Review")
+
+    stats = (
+        Review.objects.filter(is_active=True)
+        .values("book_id")
+        .annotate(n=Count("id"), total=Sum("rating"), avg=Avg("rating"))
+    )
+    books = []
+    for row in stats:
+        books.append(Book(
+            id=row["book_id"],
+            rating_count=row["n"],
+            rating_avg=Decimal(str(round(row["avg"], 2))),
+            rating_score=(PRIOR_WEIGHT * PRIOR_MEAN + row["total"]) / (PRIOR_WEIGHT + row["n"]),
+        ))
+    Book.objects.bulk_update(books, ["rating_count", "rating_avg", "rating_score"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("books", "0004_book_keyset_indexes"),
+        ("reviews", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="book",
+            name="rating_avg",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=3),
+        ),
+        migrations.AddField(
+            model_name="book",
+            name="rating_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="book",
+            name="rating_score",
+            field=models.FloatField(default=3.0),
+        ),
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(
+                fields=["is_active", "rating_score", "id"], name="books_book_is_acti_7d7ee2_idx"
+            ),
+        ),
+        migrations.RunPython(backfill_ratings, migrations.RunPython.noop),
+    ]
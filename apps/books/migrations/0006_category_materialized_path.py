@@ -0,0 +1,43 @@
+# Generated by Django 5.2.10 on 2026-10-18 12:33
+
+from django.db import migrations, models
+
+
+def backfill_paths(apps, schema_editor):
+    Category = apps.get_model("books", "Category")
+
+    parents = dict(Category.objects.values_list("id", "parent_id"))
+    paths = {}
+
+    def build(category_id):
+        if category_id not in paths:
+            parent_id = parents[category_id]
+            prefix = build(parent_id) if parent_id else "/"
+            paths[category_id] = f"{prefix}{category_id}/"
+        return paths[category_id]
+
+    categories = []
+    for category_id in parents:
+        path = build(category_id)
+        categories.append(Category(id=category_id, path=path, depth=path.count("/") - 2))
+    Category.objects.bulk_update(categories, ["path", "depth"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("books", "0005_book_rating_aggregates"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="category",
+            name="depth",
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="category",
+            name="path",
+            field=models.CharField(db_index=True, default="", editable=False, max_length=255),
+        ),
+        migrations.RunPython(backfill_paths, migrations.RunPython.noop),
+    ]
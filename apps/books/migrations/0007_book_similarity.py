@@ -0,0 +1,53 @@
+# Generated by Django 5.2.10 on 2026-10-18 12:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("books", "0006_category_materialized_path"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BookSimilarity",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("score", models.FloatField()),
+                ("rank", models.PositiveSmallIntegerField()),
+                (
+                    "book",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="neighbours",
+                        to="books.book",
+                    ),
+                ),
+                (
+                    "similar_book",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="neighbour_of",
+                        to="books.book",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["book", "rank"],
+                "indexes": [
+                    models.Index(fields=["book", "rank"], name="books_similarity_rank_idx")
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("book", "similar_book"), name="unique_book_similarity"
+                    )
+                ],
+            },
+        ),
+    ]
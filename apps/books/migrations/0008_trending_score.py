@@ -0,0 +1,42 @@
+# Generated by Django 5.2.10 on 2026-10-18 12:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("books", "0007_book_similarity"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JobWatermark",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("name", models.CharField(max_length=100, unique=True)),
+                ("last_id", models.BigIntegerField(default=0)),
+                ("last_run_at", models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="book",
+            name="trending_score",
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name="book",
+            name="views_counted",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(
+                fields=["is_active", "trending_score", "id"], name="books_book_is_acti_9ec8d2_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.10 on 2026-10-18 13:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("books", "0009_generation"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BookSearchEntry",
+            fields=[
+                (
+                    "book",
+                    models.OneToOneField(
+                        db_column="rowid",
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        primary_key=True,
+                        related_name="search_entry",
+                        serialize=False,
+                        to="books.book",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "books_book_search",
+                "managed": False,
+            },
+        ),
+    ]
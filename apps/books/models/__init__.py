@@ -2,3 +2,7 @@ from .category import Category
 from .publisher import Publisher
 from .author import Author
 from .book import Book
+from .similarity import BookSimilarity
+from .watermark import JobWatermark
+from .generation import Generation
+from .search import BookSearchEntry
@@ -44,6 +44,19 @@ class Book(models.Model):
     # Analytics
     views_count = models.PositiveIntegerField(default=0)
     sales_count = models.PositiveIntegerField(default=0)
+    # Exponentially decayed sales + views, maintained by the update_trending command
+    trending_score = models.FloatField(default=0)
+    # views_count already included in trending_score
+    views_counted = models.PositiveIntegerField(default=0, editable=False)
+
+    # Ratings (denormalized from active reviews, see BookQuerySet.refresh_ratings)
+    # A book "starts" with RATING_PRIOR_WEIGHT virtual reviews of RATING_PRIOR_MEAN stars
+    RATING_PRIOR_MEAN = 3.0
+    RATING_PRIOR_WEIGHT = 5
+    rating_avg = models.DecimalField(max_digits=3, decimal_places=2, default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    # Bayesian average: pulls books with few reviews towards RATING_PRIOR_MEAN
+    rating_score = models.FloatField(default=RATING_PRIOR_MEAN)
     
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
@@ -57,6 +70,12 @@ class Book(models.Model):
             models.Index(fields=['isbn']),
             models.Index(fields=['slug']),
             models.Index(fields=['is_active', 'is_featured']),
+            # Keyset pagination: (sort field, id) for each listing sort
+            models.Index(fields=['is_active', 'created_at', 'id']),
+            models.Index(fields=['is_active', 'price', 'id']),
+            models.Index(fields=['is_active', 'views_count', 'id']),
+            models.Index(fields=['is_active', 'rating_score', 'id']),
+            models.Index(fields=['is_active', 'trending_score', 'id']),
         ]
         app_label = 'books'
 
@@ -72,24 +91,11 @@ class Book(models.Model):
 
     @property
     def avg_rating(self):
-        if hasattr(self, '_avg_rating') and self._avg_rating is not None:
-            return round(self._avg_rating, 1)
-            
-        from apps.reviews.models import Review
-        reviews = Review.objects.filter(book=self, is_active=True)
-        if reviews.exists():
-            from django.db.models import Avg
-            avg = reviews.aggregate(Avg('rating'))['rating__avg']
-            return round(avg, 1) if avg else 0
-        return 0
+        return round(float(self.rating_avg), 1)
 
     @property
     def review_count(self):
-        if hasattr(self, '_review_count'):
-            return self._review_count
-            
-        from apps.reviews.models import Review
-        return Review.objects.filter(book=self, is_active=True).count()
+        return self.rating_count
 
     def is_in_stock(self):
         return self.stock > 0
@@ -1,9 +1,38 @@
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Substr
+
+PATH_SEPARATOR = '/'
+# Maintained by Category.save() and subtree moves only
+TREE_FIELDS = ('path', 'depth')
+# parent_id was deferred when the row was loaded
+NOT_LOADED = object()
+
+
+def subtree_lookup(path, field='path'):
+    """
+    Range lookup matching every path that starts with the given one.
+    Paths only contain digits and '/', and '0' is the character right after
+    '/', so "/1/5/" <= x < "/1/50" selects exactly the "/1/5/..." subtree.
+    Unlike LIKE 'prefix%', a plain range can use the b-tree index on every backend.
+    """
+    return {f'{field}__gte': path, f'{field}__lt': path[:-1] + '0'}
+
+
+class CategoryQuerySet(models.QuerySet):
+    def subtree(self, category):
+        """The category and all its descendants, as one indexed range scan on path."""
+        return self.filter(**subtree_lookup(category.path))
+
 
 class Category(models.Model):
     """
     Hierarchical category system (Self-referencing).
     Example: Fiction -> Mystery -> Noir.
+
+    Every row also stores its materialized path of ids ("/1/5/12/") and its
+    depth, maintained on save, so subtrees and ancestors are single queries.
     """
     name = models.CharField(max_length=200)
     slug = models.SlugField(max_length=200, unique=True)
@@ -14,6 +43,10 @@ class Category(models.Model):
     image = models.ImageField(upload_to='categories/', blank=True)
     is_active = models.BooleanField(default=True)
     order = models.IntegerField(default=0)
+    path = models.CharField(max_length=255, db_index=True, editable=False, default='')
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+
+    objects = CategoryQuerySet.as_manager()
 
     class Meta:
         verbose_name_plural = "Categories"
@@ -21,9 +54,89 @@ class Category(models.Model):
         app_label = 'books'
 
     def __str__(self):
-        full_path = [self.name]
-        k = self.parent
-        while k is not None:
-            full_path.append(k.name)
-            k = k.parent
-        return ' -> '.join(full_path[::-1])
+        # Just the name: admin lists and form dropdowns call this per row
+        return self.name
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Saves compare against the row as loaded, so only a move reads anything
+        instance._loaded_parent_id = instance.__dict__.get('parent_id', NOT_LOADED)
+        instance._loaded_path = instance.__dict__.get('path', '')
+        return instance
+
+    def _is_move(self):
+        return self._state.adding or self.parent_id != getattr(self, '_loaded_parent_id', NOT_LOADED)
+
+    def _old_path(self):
+        return '' if self._state.adding else getattr(self, '_loaded_path', self.path)
+
+    def clean(self):
+        if self.parent_id and self._is_move() and self._creates_cycle(self._old_path(), self._parent_path()):
+            raise ValidationError({'parent': 'Kateqoriya öz alt kateqoriyasına köçürülə bilməz.'})
+
+    def _parent_path(self):
+        if self.parent_id is None:
+            return PATH_SEPARATOR
+        return Category.objects.values_list('path', flat=True).get(pk=self.parent_id)
+
+    def _creates_cycle(self, old_path, parent_path):
+        return self.parent_id == self.pk or bool(old_path and parent_path.startswith(old_path))
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            # path/depth are only written below (or by an ancestor's move), never
+            # from a possibly stale in-memory copy
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in TREE_FIELDS
+            ]
+        if not self._is_move():
+            # Same parent, same place in the tree: a plain UPDATE
+            return super().save(*args, **kwargs)
+
+        with transaction.atomic():
+            old_path = self._old_path()
+            parent_path = self._parent_path()
+            if self.parent_id and self._creates_cycle(old_path, parent_path):
+                raise ValueError('A category cannot be moved under itself or its descendants.')
+
+            super().save(*args, **kwargs)
+
+            new_path = f'{parent_path}{self.pk}{PATH_SEPARATOR}'
+            new_depth = new_path.count(PATH_SEPARATOR) - 2
+            self.path, self.depth = new_path, new_depth
+            self._loaded_parent_id, self._loaded_path = self.parent_id, new_path
+            if new_path == old_path:
+                return
+            Category.objects.filter(pk=self.pk).update(path=new_path, depth=new_depth)
+
+            if old_path:
+                # Moved: rewrite the prefix of every descendant in one UPDATE
+                old_depth = old_path.count(PATH_SEPARATOR) - 2
+                Category.objects.filter(**subtree_lookup(old_path)).exclude(pk=self.pk).update(
+                    path=Concat(Value(new_path), Substr('path', len(old_path) + 1)),
+                    depth=F('depth') + (new_depth - old_depth),
+                )
+
+    # ==========================================
+    # 🌳 TREE HELPERS
+    # ==========================================
+    @property
+    def ancestor_ids(self):
+        return [int(part) for part in self.path.strip(PATH_SEPARATOR).split(PATH_SEPARATOR) if part]
+
+    def ancestors(self, include_self=False):
+        """Root-first list of ancestors, read in one query (breadcrumbs)."""
+        ids = self.ancestor_ids[:-1]
+        by_id = Category.objects.in_bulk(ids) if ids else {}
+        result = [by_id[pk] for pk in ids if pk in by_id]
+        if include_self:
+            result.append(self)
+        return result
+
+    def get_descendants(self, include_self=False):
+        queryset = Category.objects.subtree(self)
+        if not include_self:
+            queryset = queryset.exclude(pk=self.pk)
+        return queryset
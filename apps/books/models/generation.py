@@ -0,0 +1,15 @@
+from django.db import models
+
+class Generation(models.Model):
+    """
+    Change counter for cached catalog data (see apps.books.cache). Kept in the
+    database so every worker sees the same, monotonically increasing value.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    value = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        app_label = 'books'
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
@@ -0,0 +1,17 @@
+from django.db import models
+
+class BookSearchEntry(models.Model):
+    """
+    Read-only view of a row of the books_book_search FTS5 table (created by
+    migration 0002, maintained by apps.books.search.index). Its rowid is the
+    book id, so querysets can join books to the index and rank in SQL.
+    """
+    book = models.OneToOneField(
+        'books.Book', on_delete=models.DO_NOTHING, primary_key=True,
+        db_column='rowid', db_constraint=False, related_name='search_entry',
+    )
+
+    class Meta:
+        app_label = 'books'
+        managed = False
+        db_table = 'books_book_search'
@@ -0,0 +1,25 @@
+from django.db import models
+from .book import Book
+
+class BookSimilarity(models.Model):
+    """
+    Precomputed "customers also bought" neighbours of a book.
+    Rebuilt offline by the build_recommendations command; rank 1 is the closest.
+    """
+    book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name='neighbours')
+    similar_book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name='neighbour_of')
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()
+
+    class Meta:
+        app_label = 'books'
+        ordering = ['book', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['book', 'similar_book'], name='unique_book_similarity'),
+        ]
+        indexes = [
+            models.Index(fields=['book', 'rank'], name='books_similarity_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.book_id} -> {self.similar_book_id} ({self.score:.3f})"
@@ -0,0 +1,16 @@
+from django.db import models
+
+class JobWatermark(models.Model):
+    """
+    Progress marker for incremental batch jobs: the highest source row id a
+    job has already processed and when it last ran.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    last_id = models.BigIntegerField(default=0)
+    last_run_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        app_label = 'books'
+
+    def __str__(self):
+        return f"{self.name} @ {self.last_id}"
@@ -0,0 +1,121 @@
+"""
+Pagination helpers for the catalog.
+
+* CachedCountPaginator: the regular page-number paginator, but the
+  COUNT(*) over the filtered queryset is cached per filter set and catalog
+  generation instead of being recomputed on every page.
+* KeysetPaginator: cursor ("seek") pagination on (sort field, id). Each page
+  is an indexed range scan starting after the last row of the previous one,
+  so page 500 costs the same as page 1.
+"""
+import base64
+import json
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+from .cache import get_generation, CATALOG_GENERATION
+
+COUNT_TIMEOUT = 60 * 10
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def cached_count(queryset, key):
+    """COUNT(*) of the queryset, cached under key for the current catalog generation."""
+    if not key:
+        return queryset.count()
+    cache_key = f'book_count:{get_generation(CATALOG_GENERATION)}:{key}'
+    count = cache.get(cache_key)
+    if count is None:
+        count = queryset.count()
+        cache.set(cache_key, count, COUNT_TIMEOUT)
+    return count
+
+
+class CachedCountPaginator(Paginator):
+    def __init__(self, object_list, per_page, count_key=None, count_queryset=None, **kwargs):
+        """
+        count_queryset: a cheaper equivalent of object_list to count
+        (e.g. without annotations/prefetches). Defaults to object_list.
+        """
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_key = count_key
+        self.count_queryset = count_queryset if count_queryset is not None else object_list
+
+    @cached_property
+    def count(self):
+        return cached_count(self.count_queryset, self.count_key)
+
+
+class KeysetPage:
+    """Minimal page object exposing what the listing templates use."""
+
+    def __init__(self, object_list, paginator, next_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+class KeysetPaginator:
+    def __init__(self, queryset, ordering, per_page, count_key=None, count_queryset=None):
+        """
+        ordering: a single field name, optionally prefixed with '-'.
+        The primary key is always appended as a tie-breaker in the same direction.
+        """
+        self.queryset = queryset
+        self.descending = ordering.startswith('-')
+        self.field_name = ordering.lstrip('-')
+        self.field = queryset.model._meta.get_field(self.field_name)
+        self.per_page = per_page
+        self.count_key = count_key
+        self.count_queryset = count_queryset if count_queryset is not None else queryset
+
+    @cached_property
+    def count(self):
+        """Only evaluated if a template asks for it."""
+        return cached_count(self.count_queryset, self.count_key)
+
+    def encode_cursor(self, obj):
+        value = self.field.value_to_string(obj)
+        raw = json.dumps([value, obj.pk]).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            value, pk = json.loads(raw)
+            return self.field.to_python(value), int(pk)
+        except Exception as e:
+            raise InvalidCursor(str(e))
+
+    def page(self, cursor=None):
+        prefix = '-' if self.descending else ''
+        queryset = self.queryset.order_by(f'{prefix}{self.field_name}', f'{prefix}pk')
+
+        if cursor:
+            value, pk = self.decode_cursor(cursor)
+            lookup = 'lt' if self.descending else 'gt'
+            queryset = queryset.filter(
+                Q(**{f'{self.field_name}__{lookup}': value})
+                | Q(**{self.field_name: value, f'pk__{lookup}': pk})
+            )
+
+        # One extra row tells us whether another page exists without a COUNT
+        rows = list(queryset[:self.per_page + 1])
+        next_cursor = None
+        if len(rows) > self.per_page:
+            rows = rows[:self.per_page]
+            next_cursor = self.encode_cursor(rows[-1])
+        return KeysetPage(rows, self, next_cursor)
@@ -0,0 +1,84 @@
+"""
+Item-to-item "customers also bought" recommendations.
+
+Books bought in the same order co-occur. For every pair we count the orders
+containing both and score it with cosine similarity:
+
+    score(a, b) = orders(a and b) / sqrt(orders(a) * orders(b))
+
+which keeps bestsellers from becoming everybody's neighbour. Counting is
+sparse (only pairs that actually co-occur are stored) and streams order
+lines in order-id order, so memory grows with the number of distinct pairs,
+not with books squared or with the number of order lines.
+"""
+import heapq
+import math
+from collections import Counter, defaultdict
+from itertools import combinations, groupby
+from operator import itemgetter
+from django.db import transaction
+
+# Huge baskets (bulk/institutional orders) say little about taste and cost
+# n^2 pairs; they still count towards the per-book totals.
+MAX_BASKET_SIZE = 50
+
+
+def iter_baskets(order_lines):
+    """Groups (order_id, book_id) rows sorted by order_id into sets of book ids."""
+    for _, rows in groupby(order_lines, key=itemgetter(0)):
+        yield {book_id for _, book_id in rows}
+
+
+def count_cooccurrences(baskets, max_basket_size=MAX_BASKET_SIZE):
+    """Returns (orders per book, orders per book pair) with pairs keyed as (low_id, high_id)."""
+    book_counts = Counter()
+    pair_counts = Counter()
+    for basket in baskets:
+        book_counts.update(basket)
+        if 1 < len(basket) <= max_basket_size:
+            # Counter.update over a generator runs the counting loop in C
+            pair_counts.update(combinations(sorted(basket), 2))
+    return book_counts, pair_counts
+
+
+def top_neighbours(book_counts, pair_counts, top_k, min_support=1):
+    """Returns {book_id: [(score, similar_book_id), ...]} best first."""
+    candidates = defaultdict(list)
+    for (a, b), together in pair_counts.items():
+        if together < min_support:
+            continue
+        score = together / math.sqrt(book_counts[a] * book_counts[b])
+        candidates[a].append((score, b))
+        candidates[b].append((score, a))
+    return {
+        book_id: heapq.nlargest(top_k, scored)
+        for book_id, scored in candidates.items()
+    }
+
+
+def build_recommendations(top_k=10, min_support=1, since=None):
+    """Recomputes the BookSimilarity table from order history. Returns the number of rows written."""
+    from apps.books.models import BookSimilarity
+    from apps.orders.models import OrderItem
+
+    order_lines = (
+        OrderItem.objects.filter(book__isnull=False)
+        .exclude(order__status='cancelled')
+        .order_by('order_id')
+        .values_list('order_id', 'book_id')
+    )
+    if since is not None:
+        order_lines = order_lines.filter(order__created_at__gte=since)
+
+    book_counts, pair_counts = count_cooccurrences(iter_baskets(order_lines.iterator(chunk_size=5000)))
+    neighbours = top_neighbours(book_counts, pair_counts, top_k, min_support)
+
+    rows = [
+        BookSimilarity(book_id=book_id, similar_book_id=similar_id, score=score, rank=rank)
+        for book_id, scored in neighbours.items()
+        for rank, (score, similar_id) in enumerate(scored, start=1)
+    ]
+    with transaction.atomic():
+        BookSimilarity.objects.all().delete()
+        BookSimilarity.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
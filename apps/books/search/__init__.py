@@ -0,0 +1,3 @@
+from .index import is_supported, search_queryset, index_books, remove_books, rebuild_index
+from .normalize import fold, tokenize
+from .suggest import suggest
@@ -0,0 +1,170 @@
+"""
+Per-process typeahead index for the search box.
+
+Titles, author names and category names are folded (see normalize.fold) and
+stored in sorted key arrays, one key per word start, so "qizi" finds
+"Şəkər Qızı". A prefix lookup is a bisect over the keys; the top entries
+for short prefixes (where the matching range is huge) are precomputed at
+build time, and longer prefixes rank their whole matching range, so no
+match is ever cut off.
+
+The index is built on first use. When the catalog, author or category
+generation changes it is rebuilt in a background thread while requests keep
+reading the previous one; the new index replaces it in one assignment, so a
+request never sees books from one build and authors from another.
+"""
+import heapq
+import threading
+from bisect import bisect_left
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count, Sum, F
+from django.urls import reverse
+from apps.books.cache import (
+    get_generations, CATALOG_GENERATION, AUTHOR_GENERATION, CATEGORY_GENERATION
+)
+from .normalize import fold, WORD_RE
+
+GENERATIONS = (CATALOG_GENERATION, AUTHOR_GENERATION, CATEGORY_GENERATION)
+
+# Prefixes up to this length are answered from precomputed top lists; longer
+# ones match few enough keys to rank the whole range per request
+SHORT_PREFIX = 3
+MAX_LIMIT = 10
+
+
+class PrefixIndex:
+    """Weighted prefix lookup over (key -> entry) pairs for one kind of entry."""
+
+    def __init__(self, entries, top_size=MAX_LIMIT):
+        """entries: list of dicts with at least 'label' and 'weight'."""
+        self.entries = entries
+        pairs = []
+        for position, entry in enumerate(entries):
+            folded = fold(entry['label'])
+            # One key per word start: "seker qizi" and "qizi"
+            for match in WORD_RE.finditer(folded):
+                pairs.append((folded[match.start():], position))
+        pairs.sort()
+        self.keys = [key for key, _ in pairs]
+        self.positions = [position for _, position in pairs]
+
+        self.top = {}
+        for key, position in pairs:
+            for length in range(1, SHORT_PREFIX + 1):
+                if len(key) >= length:
+                    self.top.setdefault(key[:length], set()).add(position)
+        for prefix, positions in self.top.items():
+            self.top[prefix] = heapq.nlargest(top_size, positions, key=self._weight)
+
+    def _weight(self, position):
+        return self.entries[position]['weight']
+
+    def search(self, prefix, limit):
+        prefix = fold(prefix).strip()
+        if not prefix:
+            return []
+        if len(prefix) <= SHORT_PREFIX:
+            positions = self.top.get(prefix, [])[:limit]
+        else:
+            start = bisect_left(self.keys, prefix)
+            end = bisect_left(self.keys, prefix + '\uffff', start)
+            positions = heapq.nlargest(limit, set(self.positions[start:end]), key=self._weight)
+        return [self._public(self.entries[position]) for position in positions]
+
+    @staticmethod
+    def _public(entry):
+        return {key: value for key, value in entry.items() if key != 'weight'}
+
+
+class Autocomplete:
+    def __init__(self):
+        # (generations, books, authors, categories), replaced as a whole
+        self.state = None
+        self._lock = threading.Lock()
+
+    def build(self):
+        """Builds a complete index from the database and returns it as a new state tuple."""
+        from apps.books.models import Book, Author, Category
+
+        generations = get_generations(*GENERATIONS)
+
+        # Build URLs by substitution instead of reversing once per row
+        book_url = reverse('books:book_detail', kwargs={'slug': 'slug-placeholder'})
+        category_url = reverse('books:category_books', kwargs={'category_slug': 'slug-placeholder'})
+        list_url = reverse('books:book_list')
+
+        books = Book.objects.filter(is_active=True).values_list('title', 'slug', 'sales_count', 'views_count')
+        book_entries = [
+            {
+                'label': title,
+                'url': book_url.replace('slug-placeholder', slug),
+                'weight': sales * 10 + views,
+            }
+            for title, slug, sales, views in books.iterator()
+        ]
+
+        authors = (
+            Author.objects.filter(books__is_active=True)
+            .annotate(weight=Sum(F('books__sales_count') * 10 + F('books__views_count')))
+            .values_list('id', 'name', 'weight')
+        )
+        author_entries = [
+            {'label': name, 'url': f'{list_url}?author={author_id}', 'weight': weight or 0}
+            for author_id, name, weight in authors.iterator()
+        ]
+
+        categories = (
+            Category.objects.filter(is_active=True)
+            .annotate(weight=Count('books'))
+            .values_list('name', 'slug', 'weight')
+        )
+        category_entries = [
+            {'label': name, 'url': category_url.replace('slug-placeholder', slug), 'weight': weight}
+            for name, slug, weight in categories.iterator()
+        ]
+
+        return (
+            generations,
+            PrefixIndex(book_entries),
+            PrefixIndex(author_entries),
+            PrefixIndex(category_entries),
+        )
+
+    def ensure_fresh(self):
+        """Returns the current state, building it on first use and refreshing it when stale."""
+        state = self.state
+        if state is None:
+            # First build: nothing to serve yet, so everyone waits for it
+            with self._lock:
+                if self.state is None:
+                    self.state = self.build()
+                return self.state
+        if state[0] != get_generations(*GENERATIONS) and self._lock.acquire(blocking=False):
+            # Stale: one thread rebuilds, requests keep serving the old index
+            if getattr(settings, 'AUTOCOMPLETE_BACKGROUND_REBUILD', True):
+                threading.Thread(target=self._rebuild, daemon=True).start()
+            else:
+                self._rebuild(close_connection=False)
+        return state
+
+    def _rebuild(self, close_connection=True):
+        try:
+            self.state = self.build()
+        finally:
+            self._lock.release()
+            if close_connection:
+                # The thread got its own database connection
+                connection.close()
+
+    def search(self, prefix, limit=5):
+        _, books, authors, categories = self.ensure_fresh()
+        limit = max(1, min(limit, MAX_LIMIT))
+        return {
+            'books': books.search(prefix, limit),
+            'authors': authors.search(prefix, limit),
+            'categories': categories.search(prefix, limit),
+        }
+
+
+autocomplete = Autocomplete()
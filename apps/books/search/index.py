@@ -0,0 +1,157 @@
+"""
+Full-text search over the catalog backed by an SQLite FTS5 table.
+
+Every active book has one row in ``books_book_search`` whose rowid is the
+book id, so a search is a single inverted-index lookup ranked with bm25
+instead of a LIKE scan over books joined with authors. search_queryset()
+joins the index to a Book queryset (through BookSearchEntry), so filters,
+bm25 ordering and pagination all happen in the same SQL query and no id
+list ever goes through Python.
+
+Indexed text and queries both go through ``normalize.fold`` so that
+"seker", "şəkər" and "шәкәр" hit the same postings.
+"""
+from django.db import connection
+from django.db.models import BooleanField, F, FloatField, Func, Value
+from .normalize import fold, tokenize
+
+FTS_TABLE = 'books_book_search'
+
+# bm25 weights, in column order: title, subtitle, description, authors, isbn
+RANK_WEIGHTS = (10.0, 4.0, 1.0, 6.0, 8.0)
+
+CHUNK_SIZE = 500
+
+
+def is_supported():
+    """FTS5 is only available on SQLite; other backends fall back to icontains."""
+    return connection.vendor == 'sqlite'
+
+
+def build_match_query(query):
+    """
+    Turns free user input into a safe FTS5 MATCH expression.
+    Every token is quoted (so operators like AND/NEAR are not interpreted)
+    and used as a prefix, which keeps search-as-you-type working.
+    """
+    tokens = tokenize(query)
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+class _Match(Func):
+    """<fts table> MATCH <expression>; the table is the join alias of the first argument."""
+    output_field = BooleanField()
+    conditional = True
+
+    def as_sql(self, compiler, connection, **extra_context):
+        entry, match = self.get_source_expressions()
+        match_sql, params = compiler.compile(match)
+        return f'{compiler.quote_name_unless_alias(entry.alias)} MATCH {match_sql}', params
+
+
+class _Bm25(Func):
+    """bm25 rank of the joined FTS row (lower is better)."""
+    output_field = FloatField()
+
+    def as_sql(self, compiler, connection, **extra_context):
+        [entry] = self.get_source_expressions()
+        weights = ', '.join(str(w) for w in RANK_WEIGHTS)
+        return f'bm25({compiler.quote_name_unless_alias(entry.alias)}, {weights})', []
+
+
+def search_queryset(queryset, query):
+    """
+    Narrows a Book queryset to the books matching query and annotates
+    search_rank (bm25, lower is better) by joining the FTS table, or returns
+    None when the database has no FTS5 index.
+    """
+    if not is_supported():
+        return None
+
+    match = build_match_query(query)
+    if not match:
+        return queryset.annotate(search_rank=Value(0.0)).none()
+
+    entry = F('search_entry__pk')
+    return (
+        # isnull=False makes the join INNER, which MATCH requires
+        queryset.filter(search_entry__isnull=False)
+        .filter(_Match(entry, Value(match)))
+        .annotate(search_rank=_Bm25(entry))
+    )
+
+
+def _document(book):
+    return (
+        book.id,
+        fold(book.title),
+        fold(book.subtitle),
+        fold(book.description),
+        fold(' '.join(author.name for author in book.authors.all())),
+        book.isbn,
+    )
+
+
+def _chunks(items, size=CHUNK_SIZE):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def remove_books(book_ids):
+    if not is_supported():
+        return
+    with connection.cursor() as cursor:
+        for chunk in _chunks(book_ids):
+            placeholders = ', '.join(['%s'] * len(chunk))
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})', chunk)
+
+
+def index_books(book_ids):
+    """(Re)indexes the given books. Inactive or missing books are dropped from the index."""
+    if not is_supported():
+        return
+    from apps.books.models import Book
+
+    for chunk in _chunks(book_ids):
+        remove_books(chunk)
+        books = Book.objects.filter(id__in=chunk, is_active=True).prefetch_related('authors')
+        _insert([_document(book) for book in books])
+
+
+def rebuild_index():
+    """Drops and repopulates the whole index. Returns the number of indexed books."""
+    if not is_supported():
+        return 0
+    from apps.books.models import Book
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+
+    count = 0
+    books = (
+        Book.objects.filter(is_active=True)
+        .only('id', 'title', 'subtitle', 'description', 'isbn')
+        .prefetch_related('authors')
+        .order_by('id')
+    )
+    batch = []
+    for book in books.iterator(chunk_size=CHUNK_SIZE):
+        batch.append(_document(book))
+        if len(batch) >= CHUNK_SIZE:
+            _insert(batch)
+            count += len(batch)
+            batch = []
+    _insert(batch)
+    return count + len(batch)
+
+
+def _insert(rows):
+    if not rows:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE} (rowid, title, subtitle, description, authors, isbn) '
+            f'VALUES (%s, %s, %s, %s, %s, %s)',
+            rows,
+        )
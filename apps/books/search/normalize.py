@@ -0,0 +1,49 @@
+"""
+Text folding shared by the search index and incoming queries.
+
+Customers often type without Azerbaijani letters ("seker" for "şəkər") or in
+Cyrillic. Both the indexed text and the query are folded to the same plain
+Latin form so these variants match each other.
+"""
+import re
+import unicodedata
+
+# Letters that are not "diacritics" in the Unicode sense and would survive
+# NFKD decomposition, so they are mapped explicitly.
+LATIN_FOLD = str.maketrans({
+    'ə': 'e',
+    'ı': 'i',
+    'ø': 'o',
+    'ß': 'ss',
+    'æ': 'ae',
+    'œ': 'oe',
+})
+
+# Azerbaijani Cyrillic alphabet (pre-1991 spelling), plus the extra Russian letters.
+CYRILLIC_FOLD = str.maketrans({
+    'а': 'a', 'б': 'b', 'в': 'v', 'г': 'q', 'ғ': 'g', 'д': 'd', 'е': 'e',
+    'ә': 'e', 'ж': 'j', 'з': 'z', 'и': 'i', 'ы': 'i', 'ј': 'y', 'й': 'y',
+    'к': 'k', 'ҝ': 'g', 'л': 'l', 'м': 'm', 'н': 'n', 'о': 'o', 'ө': 'o',
+    'п': 'p', 'р': 'r', 'с': 's', 'т': 't', 'у': 'u', 'ү': 'u', 'ф': 'f',
+    'х': 'x', 'һ': 'h', 'ч': 'c', 'ҹ': 'c', 'ш': 's', 'щ': 's', 'ц': 'ts',
+    'э': 'e', 'ю': 'yu', 'я': 'ya', 'ё': 'yo', 'ь': '', 'ъ': '',
+})
+
+WORD_RE = re.compile(r'\w+')
+
+
+def fold(text):
+    """
+    Lowercases and strips the text down to plain Latin letters.
+    Example: 'Şəkər Qızı' -> 'seker qizi', 'Шәкәр' -> 'seker'.
+    """
+    if not text:
+        return ''
+    text = text.lower().translate(LATIN_FOLD).translate(CYRILLIC_FOLD)
+    text = unicodedata.normalize('NFKD', text)
+    return ''.join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def tokenize(text):
+    """Folded word tokens of the text."""
+    return WORD_RE.findall(fold(text))
@@ -0,0 +1,160 @@
+"""
+"Did you mean" suggestions using a symmetric-delete dictionary (SymSpell).
+
+Every dictionary word is stored under all strings obtainable by deleting up
+to ``max_distance`` characters from it. A misspelled term generates its own
+deletes and looks them up, so candidate corrections are found with a handful
+of dict lookups instead of comparing the term against every word.
+
+Each process keeps one dictionary and rebuilds it from the database when the
+catalog or author generation has moved since it was built.
+"""
+import threading
+from apps.books.cache import get_generations, CATALOG_GENERATION, AUTHOR_GENERATION
+from .normalize import tokenize, WORD_RE, fold
+
+# Book saves and deletes move the catalog generation, author changes their own
+GENERATIONS = (CATALOG_GENERATION, AUTHOR_GENERATION)
+
+
+def edit_distance(a, b, max_distance):
+    """
+    Optimal string alignment distance (Levenshtein + adjacent transpositions).
+    Returns max_distance + 1 as soon as the distance is known to exceed it.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class SpellingSuggester:
+    """In-memory symmetric-delete dictionary built from catalog words."""
+
+    MIN_WORD_LENGTH = 3
+
+    def __init__(self, max_distance=2, prefix_length=7):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.words = {}    # word -> frequency
+        self.deletes = {}  # delete variant -> [words]
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.words)
+
+    def _variants(self, word):
+        """The word itself plus every string reachable by up to max_distance deletes."""
+        word = word[:self.prefix_length]
+        variants = {word}
+        frontier = {word}
+        for _ in range(self.max_distance):
+            next_frontier = set()
+            for item in frontier:
+                if len(item) <= 1:
+                    continue
+                for i in range(len(item)):
+                    next_frontier.add(item[:i] + item[i + 1:])
+            next_frontier -= variants
+            variants |= next_frontier
+            frontier = next_frontier
+        return variants
+
+    def add_word(self, word, count=1):
+        if len(word) < self.MIN_WORD_LENGTH or word.isdigit():
+            return
+        with self._lock:
+            if word in self.words:
+                self.words[word] += count
+                return
+            self.words[word] = count
+            for variant in self._variants(word):
+                self.deletes.setdefault(variant, []).append(word)
+
+    def add_text(self, text):
+        for word in tokenize(text):
+            self.add_word(word)
+
+    def lookup(self, term):
+        """Best correction for a single folded term, or None if nothing is close enough."""
+        if term in self.words:
+            return term
+
+        best, best_key = None, None
+        seen = set()
+        for variant in self._variants(term):
+            for word in self.deletes.get(variant, ()):
+                if word in seen:
+                    continue
+                seen.add(word)
+                distance = edit_distance(term, word, self.max_distance)
+                if distance > self.max_distance:
+                    continue
+                key = (distance, -self.words[word])
+                if best_key is None or key < best_key:
+                    best, best_key = word, key
+        return best
+
+    def suggest(self, query):
+        """
+        Corrects every word of the query that is not in the dictionary.
+        Returns the corrected query, or None when there is nothing to suggest.
+        """
+        words = WORD_RE.findall(fold(query))
+        corrected = []
+        changed = False
+        for word in words:
+            replacement = word
+            if len(word) >= self.MIN_WORD_LENGTH and not word.isdigit():
+                replacement = self.lookup(word) or word
+            changed = changed or replacement != word
+            corrected.append(replacement)
+        return ' '.join(corrected) if changed else None
+
+
+# (generations, SpellingSuggester), replaced in one assignment
+_state = None
+_build_lock = threading.Lock()
+
+
+def build_suggester():
+    from apps.books.models import Book, Author
+
+    suggester = SpellingSuggester()
+    for title in Book.objects.filter(is_active=True).values_list('title', flat=True).iterator():
+        suggester.add_text(title)
+    for name in Author.objects.values_list('name', flat=True).iterator():
+        suggester.add_text(name)
+    return suggester
+
+
+def get_suggester():
+    """
+    Process-wide dictionary, built on first use and rebuilt once the catalog
+    or author generation moves, so titles saved by any worker show up here.
+    """
+    global _state
+    generations = get_generations(*GENERATIONS)
+    state = _state
+    if state is None or state[0] != generations:
+        with _build_lock:
+            state = _state
+            if state is None or state[0] != generations:
+                state = _state = (generations, build_suggester())
+    return state[1]
+
+
+def suggest(query):
+    return get_suggester().suggest(query)
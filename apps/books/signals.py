@@ -0,0 +1,129 @@
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+from django.db import transaction
+from django.dispatch import receiver
+from .models import Book, Author, Category
+from .cache import bump_generation, model_generation_name, BOOK_GENERATION, CATEGORY_GENERATION
+from . import search, facets
+
+# ==========================================
+# 🔎 SEARCH INDEX SYNC
+# ==========================================
+@receiver(post_save, sender=Book)
+def index_book(sender, instance, **kwargs):
+    search.index_books([instance.pk])
+
+@receiver(post_delete, sender=Book)
+def unindex_book(sender, instance, **kwargs):
+    search.remove_books([instance.pk])
+
+@receiver(m2m_changed, sender=Book.authors.through)
+def reindex_book_authors(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Keeps the 'authors' column in sync for both directions of the relation:
+    book.authors.add(...) and author.books.add(...).
+    """
+    if reverse and action == 'pre_clear':
+        # Remember which books lose this author before the rows disappear
+        instance._search_book_ids = list(instance.books.values_list('id', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        search.index_books([instance.pk])
+    elif action == 'post_clear':
+        search.index_books(getattr(instance, '_search_book_ids', []))
+    else:
+        search.index_books(pk_set)
+
+@receiver(post_save, sender=Author)
+def reindex_author_books(sender, instance, created, **kwargs):
+    if not created:
+        search.index_books(instance.books.values_list('id', flat=True))
+
+@receiver(pre_delete, sender=Author)
+def remember_author_books(sender, instance, **kwargs):
+    instance._search_book_ids = list(instance.books.values_list('id', flat=True))
+
+@receiver(post_delete, sender=Author)
+def reindex_after_author_delete(sender, instance, **kwargs):
+    search.index_books(getattr(instance, '_search_book_ids', []))
+
+# ==========================================
+# 📊 FACET BITMAPS
+# ==========================================
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+def update_book_facets(sender, instance, **kwargs):
+    facets.books_changed([instance.pk])
+
+@receiver(m2m_changed, sender=Book.authors.through)
+@receiver(m2m_changed, sender=Book.categories.through)
+def update_relation_facets(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        facets.books_changed([instance.pk])
+    elif pk_set:
+        facets.books_changed(pk_set)
+    else:
+        facets.invalidate()
+
+@receiver(post_delete, sender=Author)
+@receiver(post_delete, sender=Category)
+def invalidate_facets(sender, instance, **kwargs):
+    # Cascaded through-table deletes do not send m2m_changed
+    facets.invalidate()
+
+@receiver(post_save, sender=Category)
+def invalidate_category_facets(sender, instance, created, **kwargs):
+    # Category bitmaps include descendants, so moving a category changes them
+    if not created:
+        facets.invalidate()
+
+# ==========================================
+# 🔢 GENERATIONS
+# ==========================================
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+@receiver(post_save, sender=Author)
+@receiver(post_delete, sender=Author)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def bump_model_generation(sender, instance, **kwargs):
+    name = model_generation_name(sender)
+    transaction.on_commit(lambda: bump_generation(name))
+
+@receiver(m2m_changed, sender=Book.authors.through)
+@receiver(m2m_changed, sender=Book.categories.through)
+def bump_book_generation(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        transaction.on_commit(lambda: bump_generation(BOOK_GENERATION))
+
+# ==========================================
+# 🃏 CARD CACHE
+# ==========================================
+@receiver(m2m_changed, sender=Book.authors.through)
+@receiver(m2m_changed, sender=Book.categories.through)
+def touch_books_on_relation_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        Book.objects.filter(pk=instance.pk).touch()
+    elif pk_set:
+        Book.objects.filter(pk__in=pk_set).touch()
+    elif sender is Book.authors.through:
+        Book.objects.filter(pk__in=getattr(instance, '_search_book_ids', [])).touch()
+    else:
+        # category.books.clear(): the affected books are gone already, so
+        # invalidate all cards through the category generation
+        transaction.on_commit(lambda: bump_generation(CATEGORY_GENERATION))
+
+@receiver(post_save, sender=Author)
+def touch_author_books(sender, instance, created, **kwargs):
+    if not created:
+        Book.objects.filter(authors=instance).touch()
+
+@receiver(post_delete, sender=Author)
+def touch_books_after_author_delete(sender, instance, **kwargs):
+    Book.objects.filter(pk__in=getattr(instance, '_search_book_ids', [])).touch()
@@ -0,0 +1,54 @@
+"""
+Cached book card rendering.
+
+Each card is rendered once per book version and stored in the cache; a page
+of cards is then a single get_many() round trip. The key contains
+updated_at (touched on book, author and book-author/category changes) and
+the rating columns (kept in sync with reviews), plus the category
+generation for the category label, so stale cards are never looked up again.
+"""
+from django import template
+from django.core.cache import cache
+from django.db.models import prefetch_related_objects
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+from apps.books.cache import get_generation, CATEGORY_GENERATION
+
+register = template.Library()
+
+DEFAULT_TEMPLATE = 'books/includes/book_card.html'
+CARD_TIMEOUT = 60 * 60 * 24
+# Filled in per request, so cached cards stay user-independent
+HEART_PLACEHOLDER = '__wishlist_heart__'
+
+
+def card_key(book, template_name, category_generation):
+    return (
+        f'book_card:{template_name}:{book.pk}:{book.updated_at.timestamp()}:'
+        f'{book.rating_count}:{book.rating_avg}:{category_generation}'
+    )
+
+
+@register.simple_tag(takes_context=True)
+def book_cards(context, books, template_name=DEFAULT_TEMPLATE):
+    books = list(books)
+    category_generation = get_generation(CATEGORY_GENERATION)
+    keys = [card_key(book, template_name, category_generation) for book in books]
+    cards = cache.get_many(keys)
+
+    missing = [book for book, key in zip(books, keys) if key not in cards]
+    if missing:
+        # Only books that actually need rendering load their relations
+        prefetch_related_objects(missing, 'authors', 'categories')
+        rendered = {
+            card_key(book, template_name, category_generation): render_to_string(template_name, {'book': book})
+            for book in missing
+        }
+        cache.set_many(rendered, CARD_TIMEOUT)
+        cards.update(rendered)
+
+    wishlist_book_ids = context.get('wishlist_book_ids') or ()
+    return mark_safe(''.join(
+        cards[key].replace(HEART_PLACEHOLDER, 'fas' if book.pk in wishlist_book_ids else 'far')
+        for book, key in zip(books, keys)
+    ))
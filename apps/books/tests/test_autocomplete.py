@@ -0,0 +1,37 @@
+from django.test import SimpleTestCase, TestCase
+from apps.books.cache import bump_generation, CATALOG_GENERATION
+from apps.books.search.autocomplete import Autocomplete, PrefixIndex
+from .utils import make_book
+
+
+class PrefixIndexTests(SimpleTestCase):
+    def test_matches_any_word_start_after_folding(self):
+        index = PrefixIndex([{'label': 'Şəkər Qızı', 'weight': 1}])
+        self.assertEqual(index.search('qiz', 5), [{'label': 'Şəkər Qızı'}])
+        self.assertEqual(index.search('Şək', 5), [{'label': 'Şəkər Qızı'}])
+
+    def test_long_prefixes_rank_the_whole_range(self):
+        entries = [{'label': f'roman {n:05d}', 'weight': n} for n in range(20000)]
+        index = PrefixIndex(entries)
+        self.assertEqual(index.search('roman', 1), [{'label': 'roman 19999'}])
+
+    def test_short_prefixes_use_the_top_lists(self):
+        index = PrefixIndex([{'label': 'ab', 'weight': 1}, {'label': 'abc', 'weight': 5}])
+        self.assertEqual(index.search('a', 2), [{'label': 'abc'}, {'label': 'ab'}])
+
+
+class AutocompleteTests(TestCase):
+    def test_stale_index_is_replaced_as_a_whole(self):
+        make_book(1, title='Roman')
+        autocomplete = Autocomplete()
+        old_state = autocomplete.ensure_fresh()
+
+        make_book(2, title='Romantika')
+        bump_generation(CATALOG_GENERATION)
+        # This request is still answered from the old index
+        labels = [book['label'] for book in autocomplete.search('rom')['books']]
+        self.assertEqual(labels, ['Roman'])
+
+        self.assertIsNot(autocomplete.state, old_state)
+        labels = [book['label'] for book in autocomplete.search('rom')['books']]
+        self.assertEqual(sorted(labels), ['Roman', 'Romantika'])
@@ -0,0 +1,150 @@
+import threading
+import time
+from unittest import mock
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from apps.books import cache as generations
+from apps.books.cache import (
+    cached_query, bump_generation, get_generation, get_generations, model_generation_name,
+    QUERY_KEY_PREFIX, CATEGORY_GENERATION,
+)
+from apps.books.models import Author, Book, Category, Generation
+from .utils import make_book
+
+
+class Counter:
+    """compute() stand-in that records how often it ran."""
+
+    def __init__(self, value, delay=0):
+        self.value, self.delay, self.calls = value, delay, 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return self.value
+
+
+class CachedQueryTests(SimpleTestCase):
+    # Without models no generation is read, so these need no database
+    def setUp(self):
+        cache.clear()
+
+    def test_empty_results_are_hits(self):
+        for empty in ([], None):
+            with self.subTest(empty=empty):
+                compute = Counter(empty)
+                self.assertEqual(cached_query(f'empty-{empty}', compute), empty)
+                self.assertEqual(cached_query(f'empty-{empty}', compute), empty)
+                self.assertEqual(compute.calls, 1)
+
+    def test_waiting_callers_get_the_winners_value(self):
+        compute = Counter(['x'], delay=0.2)
+        results = []
+        barrier = threading.Barrier(5)
+
+        def worker():
+            barrier.wait()
+            results.append(cached_query('single-flight', compute))
+
+        threads = [threading.Thread(target=worker) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(compute.calls, 1)
+        self.assertEqual(results, [['x']] * 5)
+
+    def test_held_lock_is_waited_for(self):
+        cache_key = QUERY_KEY_PREFIX + 'locked:'
+        cache.add(cache_key + ':lock', 1)
+        compute = Counter('mine')
+
+        def winner_finishes(_):
+            cache.set(cache_key, ('winner', 0.0, time.time() + 60))
+
+        with mock.patch.object(generations.time, 'sleep', side_effect=winner_finishes):
+            self.assertEqual(cached_query('locked', compute), 'winner')
+        self.assertEqual(compute.calls, 0)
+
+    def test_early_refresh_near_expiry(self):
+        cache_key = QUERY_KEY_PREFIX + 'xfetch:'
+        # One second left, and computing took two: due for an early refresh
+        cache.set(cache_key, ('old', 2.0, time.time() + 1))
+        compute = Counter('new')
+
+        with mock.patch.object(generations.random, 'random', return_value=0.5):
+            self.assertEqual(cached_query('xfetch', compute), 'new')
+        self.assertEqual(compute.calls, 1)
+
+    def test_no_early_refresh_far_from_expiry_or_while_someone_refreshes(self):
+        cache_key = QUERY_KEY_PREFIX + 'fresh:'
+        compute = Counter('new')
+        with mock.patch.object(generations.random, 'random', return_value=0.5):
+            cache.set(cache_key, ('old', 0.01, time.time() + 600))
+            self.assertEqual(cached_query('fresh', compute), 'old')
+
+            cache.set(cache_key, ('old', 2.0, time.time() + 1))
+            cache.add(cache_key + ':lock', 1)
+            self.assertEqual(cached_query('fresh', compute), 'old')
+        self.assertEqual(compute.calls, 0)
+
+
+class GenerationTests(TestCase):
+    def test_bump_increments(self):
+        before = get_generation('tests.bump')
+        self.assertEqual(bump_generation('tests.bump'), before + 1)
+        self.assertEqual(get_generations('tests.bump', 'tests.other')[0], before + 1)
+
+    def test_missing_row_is_seeded_from_the_clock(self):
+        with mock.patch.object(generations.time, 'time', return_value=1000.0):
+            first = get_generation('tests.seeded')
+            bump_generation('tests.seeded')
+            held = bump_generation('tests.seeded')
+        self.assertEqual(first, 1000000)
+
+        # Table emptied (or a test transaction rolled back) a moment later
+        Generation.objects.filter(name='tests.seeded').delete()
+        with mock.patch.object(generations.time, 'time', return_value=1001.0):
+            self.assertGreater(get_generation('tests.seeded'), held)
+
+    def changes_invalidate(self, model, change):
+        name = model_generation_name(model)
+        compute = Counter('value')
+        cache.clear()
+        cached_query(f'signals:{name}', compute, models=[model])
+        before = get_generation(name)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            change()
+
+        self.assertGreater(get_generation(name), before)
+        cached_query(f'signals:{name}', compute, models=[model])
+        self.assertEqual(compute.calls, 2)
+
+    def test_saves_deletes_and_relations_bump_on_commit(self):
+        book = make_book()
+        author = Author.objects.create(name='Müəllif', slug='muellif')
+        category = Category.objects.create(name='Roman', slug='roman')
+        changes = [
+            (Book, lambda: book.save()),
+            (Book, lambda: book.authors.add(author)),
+            (Book, lambda: book.categories.add(category)),
+            (Author, lambda: author.save()),
+            (Category, lambda: category.save()),
+            (Author, lambda: author.delete()),
+            (Book, lambda: book.delete()),
+            (Category, lambda: category.delete()),
+        ]
+        for model, change in changes:
+            with self.subTest(model=model.__name__):
+                self.changes_invalidate(model, change)
+
+    def test_nothing_is_bumped_before_commit(self):
+        before = get_generation(CATEGORY_GENERATION)
+        with self.captureOnCommitCallbacks() as callbacks:
+            Category.objects.create(name='Roman', slug='roman')
+            self.assertEqual(get_generation(CATEGORY_GENERATION), before)
+        self.assertTrue(callbacks)
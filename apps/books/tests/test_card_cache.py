@@ -0,0 +1,47 @@
+from unittest import mock
+from django.core.cache import cache
+from django.template import Context, Template
+from django.test import TestCase
+from apps.books.models import Author, Book
+from apps.books.templatetags import book_cards
+from .utils import make_book
+
+CARDS = Template('{% load book_cards %}{% book_cards books %}')
+
+
+class BookCardCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.book = make_book(1)
+
+    def render(self, **context):
+        return CARDS.render(Context({'books': Book.objects.filter(pk=self.book.pk), **context}))
+
+    def test_cards_are_rendered_once(self):
+        first = self.render()
+        with mock.patch.object(book_cards, 'render_to_string') as render_to_string:
+            second = self.render()
+        render_to_string.assert_not_called()
+        self.assertEqual(first, second)
+        self.assertIn('Kitab 1', second)
+
+    def test_saved_book_gets_a_new_card(self):
+        self.render()
+        self.book.title = 'Yeni ad'
+        self.book.save()
+        self.assertIn('Yeni ad', self.render())
+
+    def test_author_changes_reach_the_card(self):
+        author = Author.objects.create(name='Köhnə', slug='kohne')
+        self.book.authors.add(author)
+        self.assertIn('Köhnə', self.render())
+
+        author.name = 'Təzə'
+        author.save()
+
+        self.assertIn('Təzə', self.render())
+
+    def test_wishlist_heart_is_filled_in_per_request(self):
+        self.assertIn('far fa-heart', self.render())
+        self.assertIn('fas fa-heart', self.render(wishlist_book_ids={self.book.pk}))
+        self.assertNotIn(book_cards.HEART_PLACEHOLDER, self.render())
@@ -0,0 +1,82 @@
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from django.urls import reverse
+from apps.books.models import Book, Category
+from .utils import make_book
+
+
+def make_category(pk, parent=None):
+    return Category.objects.create(pk=pk, name=f'Kateqoriya {pk}', slug=f'kateqoriya-{pk}', parent=parent)
+
+
+class MaterializedPathTests(TestCase):
+    def setUp(self):
+        self.root = make_category(1)
+        self.child = make_category(5, parent=self.root)
+        self.grandchild = make_category(12, parent=self.child)
+        # "/10/" shares the "/1" prefix with the root but is not under it
+        self.other = make_category(10)
+
+    def test_paths_and_depth(self):
+        self.assertEqual(self.grandchild.path, '/1/5/12/')
+        self.assertEqual(self.grandchild.depth, 2)
+        self.assertEqual([c.pk for c in self.grandchild.ancestors()], [1, 5])
+
+    def test_subtree_is_a_prefix_range(self):
+        self.assertEqual(set(Category.objects.subtree(self.root).values_list('pk', flat=True)), {1, 5, 12})
+        self.assertEqual(set(self.root.get_descendants().values_list('pk', flat=True)), {5, 12})
+
+    def test_moving_rewrites_descendants(self):
+        self.child = Category.objects.get(pk=5)
+        self.child.parent = self.other
+        self.child.save()
+
+        self.grandchild.refresh_from_db()
+        self.assertEqual(self.grandchild.path, '/10/5/12/')
+        self.assertEqual(self.grandchild.depth, 2)
+        self.assertEqual(set(Category.objects.subtree(self.root).values_list('pk', flat=True)), {1})
+
+    def test_plain_save_is_one_update(self):
+        category = Category.objects.get(pk=12)
+        category.name = 'Noir'
+        with self.assertNumQueries(1):
+            category.save()
+
+    def test_stale_copy_does_not_overwrite_the_path(self):
+        stale = Category.objects.get(pk=12)
+        self.child.parent = self.other
+        self.child.save()
+
+        stale.name = 'Noir'
+        stale.save()
+
+        stale.refresh_from_db()
+        self.assertEqual(stale.path, '/10/5/12/')
+
+    def test_str_is_the_name(self):
+        categories = list(Category.objects.all())
+        with self.assertNumQueries(0):
+            self.assertEqual([str(c) for c in categories], [c.name for c in categories])
+
+    def test_cycles_are_rejected(self):
+        self.root.parent = self.grandchild
+        with self.assertRaises(ValidationError):
+            self.root.clean()
+        with self.assertRaises(ValueError):
+            self.root.save()
+
+
+class CategoryTreeFilterTests(TestCase):
+    def test_listing_includes_subcategories(self):
+        root = make_category(1)
+        child = make_category(5, parent=root)
+        other = make_category(10)
+        in_root, in_child, elsewhere = make_book(1), make_book(2), make_book(3)
+        in_root.categories.add(root)
+        in_child.categories.add(child)
+        elsewhere.categories.add(other)
+
+        self.assertEqual(set(Book.objects.in_category_tree(root)), {in_root, in_child})
+
+        response = self.client.get(reverse('books:category_books', args=[root.slug]))
+        self.assertEqual({book.id for book in response.context['books']}, {in_root.id, in_child.id})
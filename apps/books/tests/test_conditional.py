@@ -0,0 +1,57 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from apps.books.models import Book
+from apps.orders import reservations
+from .utils import make_book
+
+
+class ListingConditionalTests(TestCase):
+    def setUp(self):
+        self.book = make_book()
+        self.url = reverse('books:book_list')
+
+    def test_matching_etag_gets_304(self):
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_changes_when_a_book_changes(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book.title = 'Yeni ad'
+            self.book.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_no_validators_for_logged_in_users(self):
+        self.client.force_login(get_user_model().objects.create_user(username='alice', email='alice@example.com', password='x'))
+        self.assertNotIn('ETag', self.client.get(self.url))
+
+
+class DetailConditionalTests(TestCase):
+    def setUp(self):
+        self.book = make_book(stock=2)
+        self.url = reverse('books:book_detail', args=[self.book.slug])
+
+    def test_matching_etag_gets_304(self):
+        response = self.client.get(self.url)
+        self.assertNotIn('Last-Modified', response)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_changes_with_reservations_and_stock(self):
+        first = self.client.get(self.url)['ETag']
+        reservations.reserve('other-shopper', {self.book.id: 1})
+        second = self.client.get(self.url)['ETag']
+        Book.objects.filter(id=self.book.id).update(stock=0)
+        third = self.client.get(self.url)['ETag']
+
+        self.assertEqual(len({first, second, third}), 3)
@@ -0,0 +1,44 @@
+from decimal import Decimal
+from unittest import mock
+from urllib.parse import parse_qs
+from django.test import TestCase
+from django.urls import reverse
+from apps.books.facets import FacetIndex
+from .utils import make_book
+
+
+class ListingFacetTests(TestCase):
+    url = reverse('books:book_list')
+
+    def setUp(self):
+        make_book(1, price=Decimal('5.00'), format='paperback')
+        make_book(2, price=Decimal('25.00'), format='hardcover')
+
+    def test_counts_follow_the_filters(self):
+        response = self.client.get(self.url, {'format': 'paperback'})
+
+        counts = {bucket['min']: bucket['count'] for bucket in response.context['price_buckets']}
+        self.assertEqual(sum(counts.values()), 1)
+
+    def test_price_links_keep_the_other_filters(self):
+        response = self.client.get(self.url, {'q': 'kitab', 'format': 'paperback', 'page': 1, 'min_price': 1})
+
+        params = parse_qs(response.context['price_buckets'][0]['query'])
+        self.assertEqual(params['q'], ['kitab'])
+        self.assertEqual(params['format'], ['paperback'])
+        self.assertNotIn('page', params)
+        self.assertEqual(params['min_price'], [str(response.context['price_buckets'][0]['min'])])
+
+    def test_counts_are_cached_per_filter_combination(self):
+        with mock.patch.object(FacetIndex, 'counts', autospec=True, side_effect=FacetIndex.counts) as counts:
+            self.client.get(self.url, {'format': 'hardcover'})
+            self.client.get(self.url, {'format': 'hardcover', 'page': 1})
+            self.client.get(self.url, {'format': 'paperback'})
+        self.assertEqual(counts.call_count, 2)
+
+    def test_ajax_pages_skip_the_facets(self):
+        with mock.patch.object(FacetIndex, 'counts', autospec=True) as counts:
+            response = self.client.get(self.url, {'cursor': ''}, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('price_buckets', response.context)
+        counts.assert_not_called()
@@ -0,0 +1,81 @@
+from decimal import Decimal
+from django.test import TestCase
+from django.urls import reverse
+from apps.books.cache import bump_generation, CATALOG_GENERATION
+from apps.books.models import Book
+from apps.books.pagination import CachedCountPaginator, InvalidCursor, KeysetPaginator, cached_count
+from .utils import make_book
+
+
+class KeysetPaginatorTests(TestCase):
+    def setUp(self):
+        # Duplicate prices, so the id tie-breaker decides the order inside a price
+        for n in range(1, 8):
+            make_book(n, price=Decimal(10 + n % 3))
+
+    def walk(self, ordering, per_page=3):
+        paginator = KeysetPaginator(Book.objects.all(), ordering, per_page)
+        seen, cursor = [], None
+        while True:
+            page = paginator.page(cursor)
+            seen.extend(book.id for book in page)
+            if not page.has_next():
+                return seen
+            cursor = page.next_cursor
+
+    def test_walks_every_row_once_in_order(self):
+        expected = list(Book.objects.order_by('price', 'id').values_list('id', flat=True))
+        self.assertEqual(self.walk('price'), expected)
+
+    def test_descending(self):
+        expected = list(Book.objects.order_by('-price', '-id').values_list('id', flat=True))
+        self.assertEqual(self.walk('-price'), expected)
+
+    def test_last_page_has_no_cursor(self):
+        page = KeysetPaginator(Book.objects.all(), 'price', 7).page()
+        self.assertEqual(len(page), 7)
+        self.assertIsNone(page.next_cursor)
+
+    def test_bad_cursor(self):
+        paginator = KeysetPaginator(Book.objects.all(), 'price', 3)
+        with self.assertRaises(InvalidCursor):
+            paginator.page('not-a-cursor')
+
+
+class CachedCountTests(TestCase):
+    def test_count_is_cached_until_the_catalog_changes(self):
+        make_book(1)
+        queryset = Book.objects.all()
+        self.assertEqual(cached_count(queryset, 'all'), 1)
+
+        make_book(2)
+        with self.assertNumQueries(1):  # the generation lookup only
+            self.assertEqual(cached_count(queryset, 'all'), 1)
+
+        bump_generation(CATALOG_GENERATION)
+        self.assertEqual(cached_count(queryset, 'all'), 2)
+
+    def test_paginator_counts_the_count_queryset(self):
+        make_book(1)
+        make_book(2, is_active=False)
+        paginator = CachedCountPaginator(Book.objects.all(), 10, count_queryset=Book.objects.filter(is_active=True))
+        self.assertEqual(paginator.count, 1)
+
+
+class ListingCursorTests(TestCase):
+    url = reverse('books:book_list')
+
+    def test_next_cursor_header(self):
+        for n in range(1, 15):
+            make_book(n)
+
+        response = self.client.get(self.url, {'cursor': '', 'sort': 'price'})
+
+        self.assertEqual(len(response.context['books']), 12)
+        second = self.client.get(self.url, {'cursor': response['X-Next-Cursor'], 'sort': 'price'})
+        self.assertEqual(len(second.context['books']), 2)
+        self.assertNotIn('X-Next-Cursor', second)
+
+    def test_bad_cursor_is_404(self):
+        response = self.client.get(self.url, {'cursor': '!!', 'sort': 'price'})
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,63 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from apps.books.models import Book
+from apps.reviews.models import Review
+from .utils import make_book
+
+
+class RatingAggregateTests(TestCase):
+    def setUp(self):
+        self.book = make_book()
+        User = get_user_model()
+        self.users = [
+            User.objects.create_user(username=f'user{n}', email=f'user{n}@example.com', password='x')
+            for n in range(3)
+        ]
+
+    def review(self, user, rating, **kwargs):
+        return Review.objects.create(book=self.book, user=user, rating=rating, comment='...', **kwargs)
+
+    def test_reviews_update_the_stored_aggregates(self):
+        self.review(self.users[0], 5)
+        self.review(self.users[1], 4)
+
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.review_count, 2)
+        self.assertEqual(self.book.avg_rating, 4.5)
+        # (5 * 3 + 9) / (5 + 2)
+        self.assertAlmostEqual(self.book.rating_score, 24 / 7)
+
+    def test_inactive_and_deleted_reviews_drop_out(self):
+        first = self.review(self.users[0], 5)
+        second = self.review(self.users[1], 1)
+
+        second.is_active = False
+        second.save()
+        self.book.refresh_from_db()
+        self.assertEqual((self.book.review_count, self.book.avg_rating), (1, 5.0))
+
+        first.delete()
+        self.book.refresh_from_db()
+        self.assertEqual((self.book.review_count, self.book.avg_rating), (0, 0.0))
+        self.assertEqual(self.book.rating_score, Book.RATING_PRIOR_MEAN)
+
+    def test_bulk_refresh(self):
+        self.review(self.users[0], 2)
+        Book.objects.filter(pk=self.book.pk).update(rating_count=0, rating_avg=0)
+
+        Book.objects.all().refresh_ratings()
+
+        self.book.refresh_from_db()
+        self.assertEqual((self.book.review_count, self.book.avg_rating), (1, 2.0))
+
+    def test_top_rated_sort_prefers_many_good_reviews(self):
+        # One 5-star review is weaker evidence than three 5-star reviews
+        other = make_book(2)
+        Review.objects.create(book=other, user=self.users[0], rating=5, comment='...')
+        for user in self.users:
+            self.review(user, 5)
+
+        response = self.client.get(reverse('books:book_list'), {'sort': '-rating_score'})
+
+        self.assertEqual([book.id for book in response.context['books']], [self.book.id, other.id])
@@ -0,0 +1,53 @@
+import math
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from apps.books.models import BookSimilarity
+from apps.books.recommendations import build_recommendations, count_cooccurrences, iter_baskets, top_neighbours
+from apps.orders.tests.utils import place_order
+from .utils import make_book
+
+
+class CooccurrenceTests(SimpleTestCase):
+    def test_baskets_group_sorted_order_lines(self):
+        lines = [(1, 10), (1, 11), (1, 10), (2, 11), (3, 12)]
+        self.assertEqual(list(iter_baskets(lines)), [{10, 11}, {11}, {12}])
+
+    def test_pairs_and_book_totals(self):
+        book_counts, pair_counts = count_cooccurrences([{1, 2, 3}, {1, 2}, {3}])
+        self.assertEqual(book_counts, {1: 2, 2: 2, 3: 2})
+        self.assertEqual(pair_counts, {(1, 2): 2, (1, 3): 1, (2, 3): 1})
+
+    def test_huge_baskets_count_towards_totals_only(self):
+        book_counts, pair_counts = count_cooccurrences([{1, 2, 3}], max_basket_size=2)
+        self.assertEqual(book_counts, {1: 1, 2: 1, 3: 1})
+        self.assertFalse(pair_counts)
+
+    def test_cosine_scores_best_first(self):
+        neighbours = top_neighbours({1: 4, 2: 4, 3: 4}, {(1, 2): 2, (1, 3): 1}, top_k=5)
+        self.assertEqual(neighbours[1], [(0.5, 2), (0.25, 3)])
+        self.assertEqual(neighbours[3], [(0.25, 1)])
+
+    def test_min_support_and_top_k(self):
+        neighbours = top_neighbours({1: 3, 2: 2, 3: 1}, {(1, 2): 2, (1, 3): 1}, top_k=1, min_support=2)
+        self.assertEqual(list(neighbours[1]), [(2 / math.sqrt(6), 2)])
+        self.assertNotIn(3, neighbours)
+
+
+class BuildRecommendationsTests(TestCase):
+    def test_rebuilds_the_table_from_orders(self):
+        a, b, c = make_book(1, stock=50), make_book(2, stock=50), make_book(3, stock=50)
+        place_order([(a, 1), (b, 1)])
+        place_order([(a, 1), (b, 1)])
+        place_order([(a, 1), (c, 1)])
+        cancelled = place_order([(b, 1), (c, 1)])
+        cancelled.status = 'cancelled'
+        cancelled.save()
+
+        self.assertEqual(build_recommendations(top_k=10), 4)
+
+        ranked = list(BookSimilarity.objects.filter(book=a).order_by('rank').values_list('similar_book_id', flat=True))
+        self.assertEqual(ranked, [b.id, c.id])
+        self.assertFalse(BookSimilarity.objects.filter(book=b, similar_book=c).exists())
+
+        response = self.client.get(reverse('books:book_detail', args=[a.slug]))
+        self.assertEqual(list(response.context['related_books']), [b, c])
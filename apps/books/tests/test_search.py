@@ -0,0 +1,57 @@
+from django.test import TestCase
+from django.urls import reverse
+from apps.books import search
+from apps.books.search.index import build_match_query
+from apps.books.models import Book
+from .utils import make_book
+
+
+class SearchQuerysetTests(TestCase):
+    def setUp(self):
+        self.title_match = make_book(1, title='Şəkər Qızı')
+        self.description_match = make_book(2, title='Bağ', description='şəkər haqqında bir kitab')
+        make_book(3, title='Dəniz')
+
+    def search(self, query):
+        return search.search_queryset(Book.objects.all(), query).order_by('search_rank', 'id')
+
+    def test_title_hits_rank_above_description_hits(self):
+        self.assertEqual(list(self.search('seker')), [self.title_match, self.description_match])
+
+    def test_queries_are_folded_like_the_index(self):
+        self.assertEqual(list(self.search('ŞƏKƏR QIZ')), [self.title_match])
+        self.assertEqual(list(self.search('Шәкәр')), [self.title_match, self.description_match])
+
+    def test_operators_are_searched_as_words(self):
+        self.assertEqual(build_match_query('seker OR deniz'), '"seker"* "or"* "deniz"*')
+        self.assertFalse(self.search('seker NOT').exists())
+
+    def test_query_without_tokens_matches_nothing(self):
+        self.assertFalse(self.search('!!!').exists())
+
+    def test_other_filters_apply_in_the_same_query(self):
+        with self.assertNumQueries(1):
+            books = list(self.search('seker').filter(id=self.description_match.id))
+        self.assertEqual(books, [self.description_match])
+
+
+class SearchListingTests(TestCase):
+    def test_results_are_paginated_in_relevance_order(self):
+        books = [make_book(n, title=f'Roman {n}', description='roman ' * n) for n in range(1, 16)]
+
+        first = self.client.get(reverse('books:book_list'), {'q': 'roman'})
+        second = self.client.get(reverse('books:book_list'), {'q': 'roman', 'page': 2})
+
+        found = list(first.context['books']) + list(second.context['books'])
+        self.assertEqual(sorted(book.id for book in found), [book.id for book in books])
+        ranks = [book.search_rank for book in found]
+        self.assertEqual(ranks, sorted(ranks))
+
+    def test_typo_suggests_a_title_word(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            make_book(1, title='Şəkər Qızı')
+
+        response = self.client.get(reverse('books:book_list'), {'q': 'şəkrə'})
+
+        self.assertEqual(response.context['paginator'].count, 0)
+        self.assertTrue(response.context['did_you_mean'])
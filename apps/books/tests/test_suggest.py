@@ -0,0 +1,68 @@
+from django.test import SimpleTestCase, TestCase
+from apps.books.cache import bump_generation, CATALOG_GENERATION
+from apps.books.models import Author, Book
+from apps.books.search import normalize
+from apps.books.search.suggest import SpellingSuggester, get_suggester
+from .utils import make_book
+
+
+class FoldTests(SimpleTestCase):
+    def test_azerbaijani_letters(self):
+        self.assertEqual(normalize.fold('Şəkər Qızı'), 'seker qizi')
+        self.assertEqual(normalize.fold('ÇÖĞÜ'), 'cogu')
+
+    def test_cyrillic_spelling(self):
+        self.assertEqual(normalize.fold('Шәкәр'), 'seker')
+
+    def test_tokenize(self):
+        self.assertEqual(normalize.tokenize('Əli və Nino, 1937!'), ['eli', 've', 'nino', '1937'])
+
+
+class SpellingSuggesterTests(SimpleTestCase):
+    def test_suggests_closest_frequent_word(self):
+        suggester = SpellingSuggester()
+        suggester.add_text('Şəkər Qızı')
+        self.assertEqual(suggester.suggest('sekr qizi'), 'seker qizi')
+        self.assertIsNone(suggester.suggest('seker'))
+
+
+class DictionaryRefreshTests(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book = make_book(title='Şəkər Qızı')
+        get_suggester()
+
+    def change(self, fn):
+        with self.captureOnCommitCallbacks(execute=True):
+            fn()
+
+    def test_saving_unchanged_title_does_not_inflate_counts(self):
+        for _ in range(3):
+            self.change(self.book.save)
+        self.assertEqual(get_suggester().words['seker'], 1)
+
+    def test_renamed_title_replaces_its_words(self):
+        self.book.title = 'Ağ Gəmi'
+        self.change(self.book.save)
+
+        words = get_suggester().words
+        self.assertNotIn('seker', words)
+        self.assertEqual(words['gemi'], 1)
+
+    def test_deleted_book_is_forgotten(self):
+        self.change(self.book.delete)
+        self.assertNotIn('seker', get_suggester().words)
+
+    def test_changes_from_other_workers_are_picked_up(self):
+        # Another process renamed the book: no signals ran here, only the generation moved
+        Book.objects.filter(pk=self.book.pk).update(title='Ağ Gəmi')
+        bump_generation(CATALOG_GENERATION)
+
+        self.assertEqual(get_suggester().suggest('gemu'), 'gemi')
+
+    def test_author_names(self):
+        self.change(lambda: Author.objects.create(name='Elçin Əfəndiyev', slug='elcin'))
+        self.assertIn('efendiyev', get_suggester().words)
+
+    def test_unchanged_catalog_keeps_the_dictionary(self):
+        self.assertIs(get_suggester(), get_suggester())
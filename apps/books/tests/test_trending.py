@@ -0,0 +1,55 @@
+from datetime import timedelta
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from apps.books.models import Book
+from apps.books.trending import update_trending
+from apps.orders.models import Order
+from apps.orders.tests.utils import place_order
+from .utils import make_book
+
+
+@override_settings(TRENDING_SALES_WINDOW_DAYS=30, BESTSELLER_COUNT=1)
+class TrendingTests(TestCase):
+    def setUp(self):
+        self.book = make_book(1, stock=100)
+        self.other = make_book(2, stock=100)
+
+    def sell(self, book, quantity, days_ago=0):
+        order = place_order([(book, quantity)])
+        Order.objects.filter(pk=order.pk).update(created_at=timezone.now() - timedelta(days=days_ago))
+        return order
+
+    def sales(self):
+        return dict(Book.objects.values_list('id', 'sales_count'))
+
+    def test_sales_count_covers_only_the_window(self):
+        self.sell(self.book, 2)
+        self.sell(self.book, 5, days_ago=40)
+        self.sell(self.other, 1, days_ago=10)
+
+        update_trending()
+
+        self.assertEqual(self.sales(), {self.book.id: 2, self.other.id: 1})
+        self.assertTrue(Book.objects.get(id=self.book.id).is_bestseller)
+
+    def test_sales_age_out_and_cancellations_drop_out(self):
+        order = self.sell(self.book, 2)
+        self.sell(self.other, 3)
+        update_trending()
+
+        order.status = 'cancelled'
+        order.save()
+        update_trending(now=timezone.now() + timedelta(days=1))
+        self.assertEqual(self.sales(), {self.book.id: 0, self.other.id: 3})
+
+        update_trending(now=timezone.now() + timedelta(days=31))
+        self.assertEqual(self.sales(), {self.book.id: 0, self.other.id: 0})
+
+    def test_orders_are_scored_once(self):
+        self.sell(self.book, 1)
+        update_trending()
+        score = Book.objects.get(id=self.book.id).trending_score
+
+        update_trending()
+
+        self.assertAlmostEqual(Book.objects.get(id=self.book.id).trending_score, score, places=3)
@@ -0,0 +1,55 @@
+from unittest import mock
+from django.db import DatabaseError
+from django.db.models import QuerySet
+from django.test import RequestFactory, TestCase, override_settings
+from apps.books import views_counter
+from apps.books.models import Book
+from apps.books.views_counter import ViewCounter, record_view
+from .utils import make_book
+
+
+@override_settings(BOOK_VIEWS_FLUSH_THRESHOLD=3, BOOK_VIEWS_FLUSH_INTERVAL=3600)
+class ViewCounterTests(TestCase):
+    def setUp(self):
+        self.first, self.second = make_book(1), make_book(2)
+        self.counter = ViewCounter()
+
+    def views(self):
+        return dict(Book.objects.values_list('id', 'views_count'))
+
+    def test_hits_are_written_in_one_update_at_the_threshold(self):
+        self.counter.record(self.first.id)
+        self.counter.record(self.second.id)
+        self.assertEqual(self.views(), {self.first.id: 0, self.second.id: 0})
+
+        with self.assertNumQueries(1):
+            self.counter.record(self.first.id)
+
+        self.assertEqual(self.views(), {self.first.id: 2, self.second.id: 1})
+        self.assertFalse(self.counter.pending)
+
+    def test_flush_writes_what_is_pending(self):
+        self.counter.record(self.first.id)
+        self.assertEqual(self.counter.flush(), 1)
+        self.assertEqual(self.counter.flush(), 0)
+        self.assertEqual(self.views()[self.first.id], 1)
+
+    def test_failed_flush_keeps_the_hits(self):
+        self.counter.record(self.first.id)
+        with mock.patch.object(QuerySet, 'update', side_effect=DatabaseError), \
+                self.assertLogs('apps.books.views_counter', 'WARNING'):
+            self.assertEqual(self.counter.flush(), 0)
+        self.assertEqual(self.counter.pending_total, 1)
+
+        self.assertEqual(self.counter.flush(), 1)
+        self.assertEqual(self.views()[self.first.id], 1)
+
+
+class RecordViewTests(TestCase):
+    def test_crawlers_are_not_counted(self):
+        factory = RequestFactory()
+        with mock.patch.object(views_counter, 'view_counter') as counter:
+            record_view(factory.get('/', HTTP_USER_AGENT='Googlebot/2.1'), 1)
+            record_view(factory.get('/'), 1)
+            record_view(factory.get('/', HTTP_USER_AGENT='Mozilla/5.0 (X11; Linux x86_64)'), 1)
+        counter.record.assert_called_once_with(1)
@@ -0,0 +1,16 @@
+from decimal import Decimal
+from apps.books.models import Book
+
+
+def make_book(n=1, **kwargs):
+    defaults = {
+        'title': f'Kitab {n}',
+        'slug': f'kitab-{n}',
+        'isbn': f'{n:013d}',
+        'description': '',
+        'cover_image': 'books/covers/test.jpg',
+        'price': Decimal('10.00'),
+        'stock': 10,
+    }
+    defaults.update(kwargs)
+    return Book.objects.create(**defaults)
@@ -0,0 +1,144 @@
+"""
+Trending scores and bestseller flags.
+
+trending_score is an exponentially decayed sum of sales and views: every
+contribution loses half its weight each TRENDING_HALF_LIFE_DAYS. Because
+decay is multiplicative, a run only has to
+
+1. multiply all existing scores by the decay since the previous run,
+2. add the order lines created after the watermark (each already decayed
+   by its own age) and the views counted since the previous run,
+
+so the order history is read once, incrementally. Order lines enter the
+score when first seen; orders cancelled later are not subtracted again.
+
+sales_count is the number of copies sold in the last
+TRENDING_SALES_WINDOW_DAYS, summed on each run from the order lines of
+non-cancelled orders created inside the window (an indexed range on
+Order.created_at), so it drops as sales age out and when orders are
+cancelled. is_bestseller marks the top BESTSELLER_COUNT books by trending
+score.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, When, Value, F, Max, Sum, FloatField, IntegerField
+from django.utils import timezone
+from apps.books.cache import bump_generation, BOOK_GENERATION
+
+WATERMARK = 'books.trending'
+SALE_WEIGHT = 1.0
+VIEW_WEIGHT = 0.05
+UPDATE_BATCH_SIZE = 500
+
+
+def decay_factor(seconds):
+    half_life = getattr(settings, 'TRENDING_HALF_LIFE_DAYS', 7) * 24 * 60 * 60
+    return 0.5 ** (max(seconds, 0) / half_life)
+
+
+def _batched_case(book_ids, values, default, output_field):
+    return Case(
+        *[When(id=book_id, then=Value(values[book_id])) for book_id in book_ids],
+        default=default,
+        output_field=output_field,
+    )
+
+
+def _add_scores(book_scores):
+    from apps.books.models import Book
+
+    book_ids = list(book_scores)
+    for start in range(0, len(book_ids), UPDATE_BATCH_SIZE):
+        batch = book_ids[start:start + UPDATE_BATCH_SIZE]
+        Book.objects.filter(id__in=batch).update(
+            trending_score=F('trending_score') + _batched_case(batch, book_scores, Value(0.0), FloatField()),
+        )
+
+
+def windowed_sales(now):
+    """{book_id: copies sold} over the sales window, from non-cancelled orders."""
+    from apps.orders.models import OrderItem
+
+    window_start = now - timedelta(days=getattr(settings, 'TRENDING_SALES_WINDOW_DAYS', 30))
+    return dict(
+        OrderItem.objects.filter(book__isnull=False, order__created_at__gt=window_start, order__created_at__lte=now)
+        .exclude(order__status='cancelled')
+        .values('book_id')
+        .annotate(units=Sum('quantity'))
+        .values_list('book_id', 'units')
+    )
+
+
+def _set_sales_counts(book_sales):
+    from apps.books.models import Book
+
+    Book.objects.filter(sales_count__gt=0).exclude(id__in=list(book_sales)).update(sales_count=0)
+    book_ids = list(book_sales)
+    for start in range(0, len(book_ids), UPDATE_BATCH_SIZE):
+        batch = book_ids[start:start + UPDATE_BATCH_SIZE]
+        Book.objects.filter(id__in=batch).update(
+            sales_count=_batched_case(batch, book_sales, F('sales_count'), IntegerField()),
+        )
+
+
+def update_trending(now=None):
+    """Runs one incremental pass. Returns a dict with what was processed."""
+    from apps.books.models import Book, JobWatermark
+    from apps.orders.models import OrderItem
+
+    now = now or timezone.now()
+    bestseller_count = getattr(settings, 'BESTSELLER_COUNT', 20)
+
+    with transaction.atomic():
+        watermark, _ = JobWatermark.objects.select_for_update().get_or_create(name=WATERMARK)
+
+        # 1. Age the existing scores
+        if watermark.last_run_at:
+            factor = decay_factor((now - watermark.last_run_at).total_seconds())
+            Book.objects.filter(trending_score__gt=0).update(trending_score=F('trending_score') * factor)
+
+        # 2. New order lines since the watermark (upper bound fixed up front)
+        last_id = OrderItem.objects.aggregate(last=Max('id'))['last'] or watermark.last_id
+        new_items = (
+            OrderItem.objects.filter(id__gt=watermark.last_id, id__lte=last_id, book__isnull=False)
+            .exclude(order__status='cancelled')
+            .values_list('book_id', 'quantity', 'order__created_at')
+        )
+        book_scores = defaultdict(float)
+        for book_id, quantity, ordered_at in new_items.iterator(chunk_size=5000):
+            book_scores[book_id] += SALE_WEIGHT * quantity * decay_factor((now - ordered_at).total_seconds())
+        _add_scores(book_scores)
+
+        # 3. Sales over the window, recounted every run
+        book_sales = windowed_sales(now)
+        _set_sales_counts(book_sales)
+
+        # 4. Views recorded since the previous run
+        Book.objects.filter(views_count__gt=F('views_counted')).update(
+            trending_score=F('trending_score') + (F('views_count') - F('views_counted')) * VIEW_WEIGHT,
+            views_counted=F('views_count'),
+        )
+
+        # 5. Bestseller flags follow the trending ranking
+        top_ids = list(
+            Book.objects.filter(is_active=True, trending_score__gt=0)
+            .order_by('-trending_score')
+            .values_list('id', flat=True)[:bestseller_count]
+        )
+        Book.objects.filter(is_bestseller=True).exclude(id__in=top_ids).update(is_bestseller=False)
+        Book.objects.filter(id__in=top_ids, is_bestseller=False).update(is_bestseller=True)
+
+        watermark.last_id = last_id
+        watermark.last_run_at = now
+        watermark.save(update_fields=['last_id', 'last_run_at'])
+        # Queryset updates send no signals: invalidate pages that show these columns
+        transaction.on_commit(lambda: bump_generation(BOOK_GENERATION))
+
+    return {
+        'books_sold': len(book_sales),
+        'units_sold': sum(book_sales.values()),
+        'bestsellers': len(top_ids),
+        'watermark': last_id,
+    }
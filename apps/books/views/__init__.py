@@ -1,3 +1,4 @@
 from .home import HomeView
 from .listing import BookListView, CategoryBrowseView
 from .detail import BookDetailView
+from .search import AutocompleteView
@@ -1,5 +1,9 @@
 from django.views.generic import DetailView
+from django.http import Http404
+from django.db.models import Max, Q
 from apps.books.models import Book
+from apps.books.views_counter import record_view
+from apps.books.conditional import conditional_response, make_etag
 from apps.reviews.forms import ReviewForm
 
 class BookDetailView(DetailView):
@@ -8,17 +12,58 @@ class BookDetailView(DetailView):
     context_object_name = 'book'
 
     def get_queryset(self):
-        return Book.objects.filter(is_active=True).prefetch_related('authors', 'categories', 'publisher')
+        return (
+            Book.objects.filter(is_active=True)
+            .with_available_stock()
+            .prefetch_related('authors', 'categories', 'publisher')
+        )
+
+    def get_versions(self):
+        """
+        (id, updated_at, rating_count, latest active review change, available
+        stock) in one query, without loading the book.
+        """
+        versions = (
+            Book.objects.filter(is_active=True, slug=self.kwargs['slug'])
+            .with_available_stock()
+            .annotate(last_review=Max('reviews__updated_at', filter=Q(reviews__is_active=True)))
+            .values_list('id', 'updated_at', 'rating_count', 'last_review', 'available_stock')
+            .first()
+        )
+        if versions is None:
+            raise Http404('Book not found')
+        return versions
+
+    def get(self, request, *args, **kwargs):
+        book_id, updated_at, rating_count, last_review, available_stock = self.get_versions()
+        render = super().get
+        # ETag only: the page shows available stock, which checkouts and
+        # reservations (and their expiry) change without any timestamp to
+        # send as Last-Modified
+        response = conditional_response(
+            request,
+            lambda: render(request, *args, **kwargs),
+            etag=lambda: make_etag(book_id, updated_at.timestamp(), rating_count, last_review, available_stock),
+        )
+        record_view(request, book_id)
+        return response
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        # Related books (from same category)
-        first_category = self.object.categories.first()
-        if first_category:
-            context['related_books'] = Book.objects.with_stats().filter(
-                is_active=True, 
-                categories=first_category
-            ).exclude(id=self.object.id).prefetch_related('authors')[:4]
+        # Related books: precomputed co-purchase neighbours (see build_recommendations)
+        related_books = list(
+            Book.objects.filter(is_active=True, neighbour_of__book=self.object)
+            .order_by('neighbour_of__rank')[:4]
+        )
+        if not related_books:
+            # No purchase history yet: fall back to the same category
+            first_category = self.object.categories.first()
+            if first_category:
+                related_books = Book.objects.filter(
+                    is_active=True, 
+                    categories=first_category
+                ).exclude(id=self.object.id)[:4]
+        context['related_books'] = related_books
             
         context['review_form'] = ReviewForm()
         return context
@@ -1,6 +1,7 @@
 from django.views.generic import TemplateView
-from apps.books.models import Book, Category
-from django.core.cache import cache
+from django.db.models import Count
+from apps.books.models import Book, Category, Author
+from apps.books.cache import cached_query
 
 class HomeView(TemplateView):
     template_name = 'home.html'
@@ -10,28 +11,26 @@ class HomeView(TemplateView):
         context = super().get_context_data(**kwargs)
         
         # Sənədinə (rules.md) uyğun olaraq aktiv və önə çıxan kitabları gətiririk
-        # CACHING: Database query-lərini 15 dəqiqəlik keşləyirik
+        # CACHING: 15 dəqiqə, amma kitab/müəllif/kateqoriya dəyişəndə dərhal yenilənir
         
-        # 1. Featured Books Cache
-        featured_books = cache.get('home_featured_books')
-        if not featured_books:
-            featured_books = list(Book.objects.with_stats().filter(
+        # 1. Featured Books
+        context['featured_books'] = cached_query(
+            'home_featured_books',
+            lambda: list(Book.objects.filter(
                 is_active=True, 
                 is_featured=True
-            ).prefetch_related('authors', 'categories')[:4])
-            cache.set('home_featured_books', featured_books, 60 * 15)
+            ).prefetch_related('authors', 'categories')[:4]),
+            models=[Book, Author, Category],
+        )
         
-        context['featured_books'] = featured_books
-        
-        # 2. Categories Cache
-        categories = cache.get('home_categories')
-        if not categories:
-            categories = list(Category.objects.filter(
+        # 2. Categories
+        context['categories'] = cached_query(
+            'home_categories',
+            lambda: list(Category.objects.filter(
                 is_active=True, 
                 parent=None
-            ).order_by('order')[:8])
-            cache.set('home_categories', categories, 60 * 15)
-            
-        context['categories'] = categories
+            ).annotate(book_count=Count('books')).order_by('order')[:8]),
+            models=[Category, Book],
+        )
         
         return context
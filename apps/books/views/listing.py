@@ -1,12 +1,50 @@
+import hashlib
+import json
+from decimal import Decimal
 from django.views.generic import ListView
 from django.shortcuts import get_object_or_404
+from django.http import Http404
 from django.db.models import Q
+from django.utils.cache import patch_vary_headers
 from apps.books.models import Book, Category, Author
+from apps.books import search
+from apps.books.facets import get_facet_index, PRICE_BUCKETS
+from apps.books.pagination import CachedCountPaginator, KeysetPaginator, InvalidCursor
+from apps.books.cache import (
+    cached_query, get_generations, CATALOG_GENERATION, BOOK_GENERATION, AUTHOR_GENERATION, CATEGORY_GENERATION
+)
+from apps.books.conditional import conditional_response, make_etag
+
+LANGUAGE_LABELS = {
+    'az': 'Azərbaycan dili',
+    'en': 'İngilis dili',
+    'tr': 'Türk dili',
+    'ru': 'Rus dili',
+}
 
 class BookListView(ListView):
     model = Book
     context_object_name = 'books'
     paginate_by = 12
+    paginator_class = CachedCountPaginator
+    allowed_sorts = ['price', '-price', '-created_at', '-views_count', '-rating_score', '-trending_score']
+
+    def get(self, request, *args, **kwargs):
+        render = super().get
+        # The generations are database rows (one query), so every worker
+        # issues the same ETag and it never repeats after a restart
+        response = conditional_response(
+            request,
+            lambda: render(request, *args, **kwargs),
+            etag=lambda: make_etag(
+                *get_generations(CATALOG_GENERATION, BOOK_GENERATION, AUTHOR_GENERATION, CATEGORY_GENERATION),
+                request.get_full_path(),
+                request.headers.get('x-requested-with', ''),
+            ),
+        )
+        # AJAX requests get the content partial only
+        patch_vary_headers(response, ['X-Requested-With'])
+        return response
 
     def get_template_names(self):
         if self.request.headers.get('x-requested-with') == 'XMLHttpRequest':
@@ -14,22 +52,30 @@ class BookListView(ListView):
         return ['books/book_list.html']
 
     def get_queryset(self):
-        queryset = Book.objects.with_stats().filter(is_active=True).prefetch_related('authors', 'categories')
+        queryset = Book.objects.filter(is_active=True)
         
         # 1. Full-text Search
         query = self.request.GET.get('q')
+        self.ranked_search = False
         if query:
-            queryset = queryset.filter(
-                Q(title__icontains=query) | 
-                Q(authors__name__icontains=query) |
-                Q(isbn__icontains=query)
-            ).distinct()
+            ranked = search.search_queryset(queryset, query)
+            if ranked is None:
+                # No FTS5 index on this database backend
+                queryset = queryset.filter(
+                    Q(title__icontains=query) | 
+                    Q(authors__name__icontains=query) |
+                    Q(isbn__icontains=query)
+                ).distinct()
+            else:
+                queryset = ranked
+                self.ranked_search = True
 
         # 2. Category Filtering
         category_slug = self.kwargs.get('category_slug')
         if category_slug:
             self.category = get_object_or_404(Category, slug=category_slug)
-            queryset = queryset.filter(categories=self.category)
+            # Include books filed under any subcategory
+            queryset = queryset.in_category_tree(self.category)
         else:
             self.category = None
             
@@ -41,6 +87,10 @@ class BookListView(ListView):
         book_format = self.request.GET.get('format')
         if book_format:
             queryset = queryset.filter(format=book_format)
+
+        language = self.request.GET.get('language')
+        if language:
+            queryset = queryset.filter(language=language)
             
         min_price = self.request.GET.get('min_price')
         if min_price:
@@ -50,28 +100,156 @@ class BookListView(ListView):
         if max_price:
             queryset = queryset.filter(price__lte=max_price)
             
+        # Plain filtered set (used for counting and facets). Cards are cached,
+        # so authors/categories are only loaded for cards that get rendered.
+        # No with_available_stock() here: cards don't show stock, and the
+        # reservation subquery would run for every row for nothing.
+        self.filtered_queryset = queryset
+
         # 4. Sorting
-        sort = self.request.GET.get('sort', '-created_at')
-        allowed_sorts = ['price', '-price', '-created_at', '-views_count']
-        if sort in allowed_sorts:
+        sort = self.get_sort()
+        if sort == 'relevance' and self.ranked_search:
+            # bm25 from the joined search index; id keeps ties stable across pages
+            queryset = queryset.order_by('search_rank', 'id')
+        elif sort in self.allowed_sorts:
             queryset = queryset.order_by(sort)
+        else:
+            queryset = queryset.order_by('-created_at')
             
         return queryset
 
+    def get_facet_counts(self):
+        """
+        Counts from the in-memory facet bitmaps for the filtered result set.
+        Cached per filter signature until the catalog changes, so loading the
+        id list of the result set is paid once per filter combination.
+        """
+        index = get_facet_index()
+        return cached_query(
+            f'facets:{index.generation}:{self.get_count_key()}',
+            lambda: index.counts(self.filtered_queryset.values_list('id', flat=True)),
+        )
+
+    def get_facet_context(self):
+        """Sidebar options with the number of matching books for each one."""
+        counts = self.get_facet_counts()
+
+        categories = list(Category.objects.filter(is_active=True, parent=None).prefetch_related('children'))
+        for category in categories:
+            category.book_count = counts['category'].get(category.id, 0)
+
+        # Top 20 authors of the current result set (plus the selected one)
+        author_counts = counts['author']
+        top_author_ids = sorted(author_counts, key=author_counts.get, reverse=True)[:20]
+        active_author = self.request.GET.get('author')
+        if active_author and active_author.isdigit() and int(active_author) not in top_author_ids:
+            top_author_ids.append(int(active_author))
+        authors_by_id = Author.objects.in_bulk(top_author_ids)
+        authors = []
+        for author_id in top_author_ids:
+            if author_id in authors_by_id:
+                author = authors_by_id[author_id]
+                author.book_count = author_counts.get(author_id, 0)
+                authors.append(author)
+
+        languages = sorted(counts['language'].items(), key=lambda item: item[1], reverse=True)
+        # Bucket links keep the other active filters and start from the first page
+        params = self.request.GET.copy()
+        for key in ('page', 'cursor', 'min_price', 'max_price'):
+            params.pop(key, None)
+        price_buckets = []
+        for index, (low, high) in enumerate(PRICE_BUCKETS):
+            bucket_params = params.copy()
+            bucket_params['min_price'] = low
+            if high is not None:
+                bucket_params['max_price'] = high - Decimal('0.01')
+            price_buckets.append({
+                'min': low,
+                'max': high - Decimal('0.01') if high is not None else None,
+                'label': f'{low}-{high} AZN' if high is not None else f'{low}+ AZN',
+                'count': counts['price'].get(index, 0),
+                'query': bucket_params.urlencode(),
+            })
+
+        return {
+            'all_categories': categories,
+            'authors': authors,
+            'formats': [
+                (value, label, counts['format'].get(value, 0)) for value, label in Book.Format.choices
+            ],
+            'languages': [
+                (code, LANGUAGE_LABELS.get(code, code), count) for code, count in languages
+            ],
+            'price_buckets': price_buckets,
+        }
+
+    def get_sort(self):
+        default = 'relevance' if self.request.GET.get('q') else '-created_at'
+        return self.request.GET.get('sort', default)
+
+    # ==========================================
+    # 📄 PAGINATION
+    # ==========================================
+    @property
+    def cursor_mode(self):
+        """Opt-in keyset pagination (?cursor=...), available for the indexed sorts."""
+        return 'cursor' in self.request.GET and self.get_sort() in self.allowed_sorts
+
+    def get_count_key(self):
+        params = sorted(
+            (key, value) for key, value in self.request.GET.items()
+            if key not in ('page', 'sort', 'cursor')
+        )
+        raw = json.dumps([self.kwargs.get('category_slug'), params])
+        return hashlib.md5(raw.encode()).hexdigest()
+
+    def get_paginator(self, queryset, per_page, orphans=0, allow_empty_first_page=True, **kwargs):
+        return self.paginator_class(
+            queryset, per_page, orphans=orphans, allow_empty_first_page=allow_empty_first_page,
+            count_key=self.get_count_key(), count_queryset=self.filtered_queryset, **kwargs
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, page_size)
+
+        paginator = KeysetPaginator(
+            queryset, self.get_sort(), page_size,
+            count_key=self.get_count_key(), count_queryset=self.filtered_queryset
+        )
+        try:
+            page = paginator.page(self.request.GET.get('cursor'))
+        except InvalidCursor:
+            raise Http404('Invalid cursor')
+        return (paginator, page, page.object_list, page.has_next())
+
+    def render_to_response(self, context, **response_kwargs):
+        response = super().render_to_response(context, **response_kwargs)
+        page = context.get('page_obj')
+        if self.cursor_mode and page is not None and page.next_cursor:
+            response['X-Next-Cursor'] = page.next_cursor
+        return response
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['all_categories'] = Category.objects.filter(is_active=True, parent=None).prefetch_related('children')
+        context['cursor_mode'] = self.cursor_mode
         context['current_category'] = self.category
-        context['authors'] = Author.objects.all()[:20] # Top 20 authors for filter
-        context['formats'] = Book.Format.choices
+        context['category_ancestors'] = self.category.ancestors() if self.category else []
+        if self.request.headers.get('x-requested-with') != 'XMLHttpRequest':
+            # Only the full page has the sidebar; AJAX pages and cursor fetches skip the facets
+            context.update(self.get_facet_context())
         
         # Keep track of active filters for UI state
         context['active_author'] = self.request.GET.get('author')
         context['active_format'] = self.request.GET.get('format')
+        context['active_language'] = self.request.GET.get('language')
         context['active_min_price'] = self.request.GET.get('min_price')
         context['active_max_price'] = self.request.GET.get('max_price')
-        context['active_sort'] = self.request.GET.get('sort', '-created_at')
+        context['active_sort'] = self.get_sort()
         context['search_query'] = self.request.GET.get('q', '')
+        # Nothing matched even after folding, most likely a typo
+        if self.ranked_search and context['paginator'].count == 0:
+            context['did_you_mean'] = search.suggest(self.request.GET['q'])
         
         return context
 
@@ -82,3 +260,13 @@ class CategoryBrowseView(ListView):
     
     def get_queryset(self):
         return Category.objects.filter(is_active=True, parent=None).prefetch_related('children')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Subtree book counts come from the cached facet bitmaps
+        totals = get_facet_index().totals('category')
+        for category in context['categories']:
+            category.book_count = totals.get(category.id, 0)
+            for child in category.children.all():
+                child.book_count = totals.get(child.id, 0)
+        return context
@@ -0,0 +1,17 @@
+from django.http import JsonResponse
+from django.views import View
+from apps.books.search.autocomplete import autocomplete
+
+
+class AutocompleteView(View):
+    """Typeahead suggestions for the search box, served from the in-memory prefix index."""
+
+    def get(self, request, *args, **kwargs):
+        query = request.GET.get('q', '').strip()[:100]
+        try:
+            limit = int(request.GET.get('limit', 5))
+        except ValueError:
+            limit = 5
+
+        results = autocomplete.search(query, limit) if query else {'books': [], 'authors': [], 'categories': []}
+        return JsonResponse({'query': query, **results})
@@ -1 +1,3 @@
-from .service import CartService
+from .service import CartService, get_cart
+from .snapshot import CartSnapshot
+from .session import SessionCart, CartLimitExceeded
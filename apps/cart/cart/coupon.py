@@ -1,33 +1,22 @@
-from decimal import Decimal, ROUND_HALF_UP
+from django.utils.functional import cached_property
+from apps.coupons.rules import get_rule
 
 class CouponMixin:
     """Handles coupon logic and discount calculations."""
+
+    @cached_property
+    def coupon(self):
+        """
+        The applied coupon as a compiled CouponRule. Resolved once per request:
+        a warm rule cache still reads the coupon generation (one query).
+        """
+        return get_rule(self.session.get('coupon_id'))
     
     def get_coupon(self):
-        from apps.coupons.models import Coupon
-        coupon_id = self.session.get('coupon_id')
-        if coupon_id:
-            try:
-                return Coupon.objects.get(id=coupon_id)
-            except Coupon.DoesNotExist:
-                pass
-        return None
+        return self.coupon
 
     def get_discount(self):
-        coupon = self.get_coupon()
-        if coupon:
-            total = self.get_total_price()
-            if coupon.min_purchase_amount and total < coupon.min_purchase_amount:
-               return Decimal('0.00')
-               
-            if coupon.discount_type == 'fixed':
-                return Decimal(str(coupon.discount_value)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-            else: # percentage
-                discount = (Decimal(str(coupon.discount_value)) / Decimal('100')) * total
-                if coupon.max_discount_amount and discount > coupon.max_discount_amount:
-                     return Decimal(str(coupon.max_discount_amount)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-                return discount.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-        return Decimal('0.00')
+        return self.snapshot.discount
 
     def get_total_price_after_discount(self):
-        return self.get_total_price() - self.get_discount()
+        return self.snapshot.total_price_after_discount
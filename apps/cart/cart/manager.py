@@ -1,48 +1,96 @@
+from datetime import timedelta
 from django.conf import settings
-from apps.cart.models import Cart, CartItem
+from django.db import transaction
+from django.utils import timezone
+from django.utils.functional import cached_property
+from apps.cart.models import Cart
+from . import upsert
+from .session import SessionCart
+
+CART_TOUCH_INTERVAL = timedelta(hours=1)
 
 class CartManagerMixin:
-    """Manages creation, retrieval, and merging of carts."""
+    """
+    Manages retrieval, creation and merging of carts.
+    Nothing is read before the cart is first used and no Cart row is
+    inserted before the first add().
+    """
     
     def __init__(self, request):
         self.session = request.session
         self.request = request
-        self.cart = self._get_or_create_cart()
 
-    def _get_or_create_cart(self):
+    @cached_property
+    def session_cart(self):
+        """SessionCart for guests when CART_ANONYMOUS_STORAGE = 'session', otherwise None."""
+        if self.request.user.is_authenticated:
+            return None
+        if getattr(settings, 'CART_ANONYMOUS_STORAGE', 'database') != 'session':
+            return None
+        return SessionCart(self.session)
+
+    @cached_property
+    def cart(self):
+        """The visitor's existing Cart, or None while nothing has been added."""
+        return self._get_cart()
+
+    def _get_cart(self):
+        session_cart_id = self.session.get(settings.CART_SESSION_ID)
         if self.request.user.is_authenticated:
-            cart, created = Cart.objects.get_or_create(user=self.request.user)
+            cart = Cart.objects.filter(user=self.request.user).first()
             # If there's an anonymous cart in session, merge it
-            session_cart_id = self.session.get(settings.CART_SESSION_ID)
             if session_cart_id:
-                try:
-                    anon_cart = Cart.objects.get(id=session_cart_id, user__isnull=True)
-                    self._merge_carts(cart, anon_cart)
-                    self.session.pop(settings.CART_SESSION_ID)
-                except Cart.DoesNotExist:
-                    pass
-            return cart
-        else:
-            cart_id = self.session.get(settings.CART_SESSION_ID)
-            if cart_id:
-                try:
-                    return Cart.objects.get(id=cart_id, user__isnull=True)
-                except Cart.DoesNotExist:
-                    pass
-            
-            # Create new anonymous cart
-            cart = Cart.objects.create(session_key=self.session.session_key)
-            self.session[settings.CART_SESSION_ID] = cart.id
+                anon_cart = Cart.objects.filter(id=session_cart_id, user__isnull=True).first()
+                if anon_cart is not None:
+                    if cart is None:
+                        # Nothing to merge into: the anonymous cart becomes the user's
+                        anon_cart.user = self.request.user
+                        anon_cart.save(update_fields=['user'])
+                        cart = anon_cart
+                    else:
+                        with transaction.atomic():
+                            upsert.merge_cart(cart, anon_cart)
+                            anon_cart.delete()
+                self.session.pop(settings.CART_SESSION_ID)
+            session_cart = SessionCart(self.session)
+            if session_cart:
+                cart = self._merge_lines(cart, session_cart.lines)
+                session_cart.clear()
             return cart
 
-    def _merge_carts(self, user_cart, anon_cart):
-        for item in anon_cart.items.all():
-            user_item, created = CartItem.objects.get_or_create(
-                cart=user_cart,
-                book=item.book,
-                defaults={'quantity': item.quantity, 'price_at_addition': item.price_at_addition}
-            )
-            if not created:
-                user_item.quantity += item.quantity
-                user_item.save()
-        anon_cart.delete()
+        if session_cart_id:
+            cart = Cart.objects.filter(id=session_cart_id, user__isnull=True).first()
+            if cart is not None:
+                return cart
+            # Stale id (cart deleted): forget it
+            self.session.pop(settings.CART_SESSION_ID)
+        return None
+
+    def _get_or_create_cart(self):
+        if self.cart is None:
+            if self.request.user.is_authenticated:
+                self.cart = Cart.objects.create(user=self.request.user)
+            else:
+                # Create new anonymous cart
+                self.cart = Cart.objects.create(session_key=self.session.session_key)
+                self.session[settings.CART_SESSION_ID] = self.cart.id
+        return self.cart
+
+    def _touch(self):
+        """
+        Marks the cart as active: item upserts don't save the Cart row, and
+        cleanup_carts reaps guest carts by updated_at. Written at most hourly.
+        """
+        now = timezone.now()
+        if self.cart is not None and self.cart.updated_at < now - CART_TOUCH_INTERVAL:
+            Cart.objects.filter(pk=self.cart.pk).update(updated_at=now)
+            self.cart.updated_at = now
+
+    def _merge_lines(self, user_cart, lines):
+        """Adds (book_id, quantity, ...) session lines to the user's cart with upserts in one transaction."""
+        if not lines:
+            return user_cart
+        if user_cart is None:
+            user_cart = Cart.objects.create(user=self.request.user)
+        upsert.merge_lines(user_cart, lines)
+        return user_cart
@@ -1,44 +1,126 @@
+from collections import Counter
+from django.utils.functional import cached_property
 from apps.books.models import Book
 from apps.cart.models import CartItem
+from . import upsert
 from .manager import CartManagerMixin
 from .coupon import CouponMixin
+from .snapshot import CartSnapshot
 
 class CartService(CartManagerMixin, CouponMixin):
     """
     Main Cart Service that composes management and coupon mixins.
     Handles basic item operations (add, remove, clear, list).
+    Totals, discount and the item list all come from one CartSnapshot,
+    rebuilt only after the cart changes.
     """
 
+    @cached_property
+    def snapshot(self):
+        if self.session_cart is not None:
+            return CartSnapshot.from_items(self.session_cart.items(), self.coupon)
+        return CartSnapshot.build(self.cart, self.coupon)
+
+    def _invalidate(self):
+        self.__dict__.pop('snapshot', None)
+
     def add(self, book_id, quantity=1, update_quantity=False):
-        book = Book.objects.get(id=book_id)
-        item, created = CartItem.objects.get_or_create(
-            cart=self.cart,
-            book=book,
-            defaults={'quantity': quantity, 'price_at_addition': book.final_price}
+        """Raises Book.DoesNotExist for unknown books."""
+        if self.session_cart is not None:
+            book = Book.objects.get(id=book_id)
+            item = self.session_cart.add(book, quantity, update_quantity)
+            self._invalidate()
+            return item
+
+        # One INSERT ... ON CONFLICT statement; safe against concurrent adds
+        item = upsert.upsert_item(self._get_or_create_cart(), book_id, quantity, replace=update_quantity)
+        self._touch()
+        self._invalidate()
+        return item
+
+    def add_many(self, lines):
+        """
+        Adds several (book_id, quantity) lines at once. Books and stock are
+        checked with one query and the valid lines are written together; a
+        line is out of stock when it plus the copies already in the cart
+        exceed the stock left after other shoppers' checkout reservations.
+        Returns (added book ids, {book_id: 'not_found' | 'out_of_stock'}).
+        """
+        quantities = Counter()
+        for book_id, quantity in lines:
+            quantities[int(book_id)] += int(quantity)
+        books = (
+            Book.objects.filter(id__in=list(quantities), is_active=True)
+            .only('id', 'title', 'price', 'discount_price', 'stock')
+            # Our own reservation holds copies of this cart, already counted in in_cart
+            .with_available_stock(exclude_holder=self.session.session_key)
+            .in_bulk()
         )
-        
-        if not created:
-            if update_quantity:
-                item.quantity = quantity
+        in_cart = self._quantities_in_cart(list(books))
+        rejected = {}
+        accepted = []
+        for book_id, quantity in quantities.items():
+            book = books.get(book_id)
+            if book is None:
+                rejected[book_id] = 'not_found'
+            elif book.available_stock < in_cart.get(book_id, 0) + quantity:
+                rejected[book_id] = 'out_of_stock'
             else:
-                item.quantity += quantity
-            item.save()
-        return item
+                accepted.append((book, quantity))
+        if not accepted:
+            return [], rejected
+
+        if self.session_cart is not None:
+            self.session_cart.add_many(accepted)
+        else:
+            upsert.merge_lines(self._get_or_create_cart(), [(book.id, quantity) for book, quantity in accepted])
+            self._touch()
+        self._invalidate()
+        return [book.id for book, _ in accepted], rejected
+
+    def _quantities_in_cart(self, book_ids):
+        """{book_id: quantity} of the given books already in the cart."""
+        if self.session_cart is not None:
+            return {line[0]: line[1] for line in self.session_cart.lines if line[0] in book_ids}
+        if self.cart is None or not book_ids:
+            return {}
+        return dict(
+            CartItem.objects.filter(cart=self.cart, book_id__in=book_ids).values_list('book_id', 'quantity')
+        )
 
     def remove(self, book_id):
-        CartItem.objects.filter(cart=self.cart, book_id=book_id).delete()
+        if self.session_cart is not None:
+            self.session_cart.remove(book_id)
+            self._invalidate()
+        elif self.cart is not None:
+            CartItem.objects.filter(cart=self.cart, book_id=book_id).delete()
+            self._touch()
+            self._invalidate()
 
     def clear(self):
-        self.cart.items.all().delete()
+        if self.session_cart is not None:
+            self.session_cart.clear()
+            self._invalidate()
+        elif self.cart is not None:
+            self.cart.items.all().delete()
+            self._touch()
+            self._invalidate()
 
     def get_total_price(self):
-        return self.cart.total_price
+        return self.snapshot.total_price
 
     def get_total_items(self):
-        return self.cart.total_items
+        return self.snapshot.total_items
     
     def __len__(self):
         return self.get_total_items()
 
     def __iter__(self):
-        return iter(self.cart.items.all())
+        return iter(self.snapshot.items)
+
+
+def get_cart(request):
+    """The request's CartService, created once and shared by views and templates."""
+    if not hasattr(request, '_cart_service'):
+        request._cart_service = CartService(request)
+    return request._cart_service
@@ -0,0 +1,79 @@
+from decimal import Decimal
+from django.conf import settings
+from apps.books.models import Book
+from apps.cart.models import CartItem
+
+class CartLimitExceeded(Exception):
+    pass
+
+class SessionCart:
+    """
+    Anonymous cart kept in the session as compact [book_id, quantity, price]
+    lines instead of Cart/CartItem rows. Bounded to CART_SESSION_MAX_LINES
+    books; rendering loads all books with one query.
+    """
+
+    def __init__(self, session):
+        self.session = session
+        self.key = getattr(settings, 'CART_SESSION_LINES', 'cart_lines')
+        self.max_lines = getattr(settings, 'CART_SESSION_MAX_LINES', 50)
+
+    @property
+    def lines(self):
+        return self.session.get(self.key, [])
+
+    def _save(self, lines):
+        if lines:
+            self.session[self.key] = lines
+        else:
+            self.session.pop(self.key, None)
+
+    def __bool__(self):
+        return bool(self.lines)
+
+    def add(self, book, quantity=1, update_quantity=False):
+        lines = [list(line) for line in self.lines]
+        for line in lines:
+            if line[0] == book.id:
+                line[1] = quantity if update_quantity else line[1] + quantity
+                break
+        else:
+            if len(lines) >= self.max_lines:
+                raise CartLimitExceeded(f'A cart can hold at most {self.max_lines} different books.')
+            line = [book.id, quantity, str(book.final_price)]
+            lines.append(line)
+        self._save(lines)
+        return CartItem(book=book, quantity=line[1], price_at_addition=Decimal(line[2]))
+
+    def add_many(self, books_quantities):
+        """Adds (book, quantity) pairs with a single session write; all or nothing."""
+        lines = [list(line) for line in self.lines]
+        by_book = {line[0]: line for line in lines}
+        new_ids = {book.id for book, _ in books_quantities} - set(by_book)
+        if len(lines) + len(new_ids) > self.max_lines:
+            raise CartLimitExceeded(f'A cart can hold at most {self.max_lines} different books.')
+        for book, quantity in books_quantities:
+            if book.id in by_book:
+                by_book[book.id][1] += quantity
+            else:
+                by_book[book.id] = [book.id, quantity, str(book.final_price)]
+                lines.append(by_book[book.id])
+        self._save(lines)
+
+    def remove(self, book_id):
+        self._save([line for line in self.lines if line[0] != int(book_id)])
+
+    def clear(self):
+        self._save([])
+
+    def items(self):
+        """Unsaved CartItem objects with their books loaded in one query (books since removed are skipped)."""
+        lines = self.lines
+        if not lines:
+            return ()
+        books = Book.objects.prefetch_related('authors').in_bulk([line[0] for line in lines])
+        return tuple(
+            CartItem(book=books[book_id], quantity=quantity, price_at_addition=Decimal(price))
+            for book_id, quantity, price in lines
+            if book_id in books
+        )
@@ -0,0 +1,46 @@
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import TYPE_CHECKING, Optional, Tuple
+from apps.cart.models import CartItem
+
+if TYPE_CHECKING:
+    from apps.coupons.rules import CouponRule
+
+@dataclass(frozen=True)
+class CartSnapshot:
+    """
+    Priced contents of a cart at one point in time.
+    Built once per request from a single query (plus one for authors) and
+    shared by the cart page, the mini-cart and checkout.
+    """
+    items: Tuple[CartItem, ...]
+    total_items: int
+    total_price: Decimal
+    coupon: Optional['CouponRule']
+    discount: Decimal
+
+    @property
+    def total_price_after_discount(self):
+        return self.total_price - self.discount
+
+    @classmethod
+    def build(cls, cart, coupon=None):
+        items = ()
+        if cart is not None:
+            items = tuple(
+                cart.items.select_related('book')
+                .prefetch_related('book__authors')
+                .order_by('added_at', 'id')
+            )
+        return cls.from_items(items, coupon)
+
+    @classmethod
+    def from_items(cls, items, coupon=None):
+        total_price = sum((item.subtotal for item in items), Decimal('0'))
+        return cls(
+            items=tuple(items),
+            total_items=sum(item.quantity for item in items),
+            total_price=total_price,
+            coupon=coupon,
+            discount=coupon.discount(total_price) if coupon else Decimal('0.00'),
+        )
@@ -0,0 +1,92 @@
+"""
+Set-based cart writes.
+
+Every mutation is one INSERT ... ON CONFLICT (cart, book) DO UPDATE statement
+backed by the unique_cart_book constraint, so concurrent adds of the same
+book (double clicks, parallel tabs) add up instead of racing a
+get_or_create. The book row is read by the same statement, which gives us
+the current price and skips unknown books without a separate query.
+MySQL gets the equivalent ON DUPLICATE KEY UPDATE form.
+"""
+from django.db import connection, transaction
+from django.utils import timezone
+from apps.books.models import Book
+from apps.cart.models import CartItem
+
+# Mirrors Book.final_price
+FINAL_PRICE_SQL = 'CASE WHEN b.discount_price IS NOT NULL AND b.discount_price <> 0 THEN b.discount_price ELSE b.price END'
+
+
+def _names():
+    qn = connection.ops.quote_name
+    return {'item': qn(CartItem._meta.db_table), 'book': qn(Book._meta.db_table)}
+
+
+def _on_conflict(new_quantity):
+    """new_quantity uses {item} for the stored row and {new} for the incoming one."""
+    names = _names()
+    if connection.vendor == 'mysql':
+        return 'ON DUPLICATE KEY UPDATE {item}.quantity = '.format(**names) + new_quantity.format(
+            new='VALUES(quantity)', **names
+        )
+    return 'ON CONFLICT (cart_id, book_id) DO UPDATE SET quantity = ' + new_quantity.format(
+        new='excluded.quantity', **names
+    )
+
+
+def _book_upsert_sql(replace):
+    new_quantity = '{new}' if replace else '{item}.quantity + {new}'
+    return (
+        'INSERT INTO {item} (cart_id, book_id, quantity, price_at_addition, added_at) '
+        f'SELECT %s, b.id, %s, {FINAL_PRICE_SQL}, %s FROM {{book}} b WHERE b.id = %s '
+    ).format(**_names()) + _on_conflict(new_quantity)
+
+
+def _now():
+    return connection.ops.adapt_datetimefield_value(timezone.now())
+
+
+def upsert_item(cart, book_id, quantity, replace=False):
+    """
+    Adds quantity of a book to the cart (or sets it, with replace=True) in
+    one statement and returns the resulting CartItem (book not loaded).
+    Raises Book.DoesNotExist for unknown books.
+    """
+    sql = _book_upsert_sql(replace)
+    params = [cart.pk, quantity, _now(), book_id]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            cursor.execute(sql, params)
+            cursor.execute(
+                'SELECT id, quantity FROM {item} WHERE cart_id = %s AND book_id = %s'.format(**_names()),
+                [cart.pk, book_id],
+            )
+        else:
+            cursor.execute(sql + ' RETURNING id, quantity', params)
+        row = cursor.fetchone()
+    if row is None:
+        raise Book.DoesNotExist(f'Book {book_id} does not exist.')
+    return CartItem(id=row[0], cart=cart, book_id=book_id, quantity=row[1])
+
+
+def merge_lines(cart, lines):
+    """
+    Adds (book_id, quantity, ...) lines to the cart in one transaction;
+    lines for unknown books are skipped.
+    """
+    if not lines:
+        return
+    now = _now()
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(_book_upsert_sql(replace=False), [[cart.pk, line[1], now, line[0]] for line in lines])
+
+
+def merge_cart(target, source):
+    """Moves every item of source into target in one statement, adding up quantities."""
+    sql = (
+        'INSERT INTO {item} (cart_id, book_id, quantity, price_at_addition, added_at) '
+        'SELECT %s, src.book_id, src.quantity, src.price_at_addition, src.added_at '
+        'FROM {item} src WHERE src.cart_id = %s '
+    ).format(**_names()) + _on_conflict('{item}.quantity + {new}')
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [target.pk, source.pk])
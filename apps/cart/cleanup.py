@@ -0,0 +1,31 @@
+"""
+Garbage collection for abandoned guest carts and expired sessions.
+
+Both are deleted with apps.core.batching.delete_in_batches, picking each
+batch through an index (Cart.updated_at, Session.expire_date).
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.utils import timezone
+from apps.cart.models import Cart
+from apps.core.batching import delete_in_batches, DEFAULT_BATCH_SIZE
+
+
+def abandoned_carts(now=None):
+    """Guest carts untouched for CART_ANONYMOUS_TTL_DAYS (their session is long gone)."""
+    now = now or timezone.now()
+    cutoff = now - timedelta(days=getattr(settings, 'CART_ANONYMOUS_TTL_DAYS', 14))
+    return Cart.objects.filter(user__isnull=True, updated_at__lt=cutoff)
+
+
+def expired_sessions(now=None):
+    return Session.objects.filter(expire_date__lt=now or timezone.now())
+
+
+def cleanup(batch_size=DEFAULT_BATCH_SIZE, pause=0.0, now=None):
+    """Runs both passes. Returns {model label: rows deleted}."""
+    now = now or timezone.now()
+    reclaimed = delete_in_batches(abandoned_carts(now), batch_size, pause)
+    reclaimed.update(delete_in_batches(expired_sessions(now), batch_size, pause))
+    return reclaimed
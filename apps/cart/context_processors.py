@@ -1,4 +1,6 @@
-from .cart import CartService
+from django.utils.functional import SimpleLazyObject
+from .cart import get_cart
 
 def cart(request):
-    return {'cart': CartService(request)}
+    # Evaluated only if a template actually uses the cart
+    return {'cart': SimpleLazyObject(lambda: get_cart(request))}
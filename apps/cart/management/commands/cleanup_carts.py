@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from apps.cart.cleanup import abandoned_carts, expired_sessions, cleanup, DEFAULT_BATCH_SIZE
+
+class Command(BaseCommand):
+    help = 'Deletes abandoned guest carts and expired sessions in small batches (safe on a live site)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Rows deleted per transaction')
+        parser.add_argument('--pause', type=float, default=0.1, help='Seconds to sleep between batches')
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would be deleted')
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            self.stdout.write(
+                f'Would delete {abandoned_carts().count()} abandoned carts '
+                f'and {expired_sessions().count()} expired sessions.'
+            )
+            return
+
+        self.stdout.write('Deleting abandoned carts and expired sessions...')
+        reclaimed = cleanup(batch_size=options['batch_size'], pause=options['pause'])
+        if not reclaimed:
+            self.stdout.write(self.style.SUCCESS('Nothing to clean up.'))
+            return
+        for label, count in sorted(reclaimed.items()):
+            self.stdout.write(f'  {label}: {count}')
+        self.stdout.write(self.style.SUCCESS(f'Reclaimed {sum(reclaimed.values())} rows.'))
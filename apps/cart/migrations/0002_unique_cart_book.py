@@ -0,0 +1,35 @@
+# Generated by Django 5.2.10 on 2026-10-18 12:41
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_duplicate_items(apps, schema_editor):
+    """Folds duplicate (cart, book) rows into the oldest one before the constraint is added."""
+    CartItem = apps.get_model("cart", "CartItem")
+
+    duplicates = (
+        CartItem.objects.values("cart_id", "book_id")
+        .annotate(rows=Count("id"), keep_id=Min("id"), total=Sum("quantity"))
+        .filter(rows__gt=1)
+    )
+    for row in duplicates:
+        CartItem.objects.filter(id=row["keep_id"]).update(quantity=row["total"])
+        CartItem.objects.filter(cart_id=row["cart_id"], book_id=row["book_id"]).exclude(
+            id=row["keep_id"]
+        ).delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("books", "0008_trending_score"),
+        ("cart", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_items, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="cartitem",
+            constraint=models.UniqueConstraint(fields=("cart", "book"), name="unique_cart_book"),
+        ),
+    ]
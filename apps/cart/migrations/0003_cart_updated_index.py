@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-18 12:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("cart", "0002_unique_cart_book"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="cart",
+            index=models.Index(fields=["user", "updated_at"], name="cart_user_updated_idx"),
+        ),
+    ]
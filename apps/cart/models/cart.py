@@ -16,6 +16,10 @@ class Cart(models.Model):
     class Meta:
         ordering = ['-created_at']
         app_label = 'cart'
+        indexes = [
+            # cleanup_carts: guest carts (user IS NULL) by age
+            models.Index(fields=['user', 'updated_at'], name='cart_user_updated_idx'),
+        ]
 
     def __str__(self):
         if self.user:
@@ -12,6 +12,10 @@ class CartItem(models.Model):
 
     class Meta:
         app_label = 'cart'
+        constraints = [
+            # One row per book per cart; quantities are added up via upserts
+            models.UniqueConstraint(fields=['cart', 'book'], name='unique_cart_book'),
+        ]
 
     def __str__(self):
         return f"{self.quantity} x {self.book.title}"
@@ -0,0 +1,72 @@
+import json
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from apps.books.tests.utils import make_book
+from apps.orders.models import StockReservation
+
+
+class BatchAddTests(TestCase):
+    url = reverse('cart:cart_add_batch')
+
+    def post(self, payload):
+        return self.client.post(self.url, json.dumps(payload), content_type='application/json')
+
+    def test_adds_lines_and_reports_rejected_ones(self):
+        book = make_book(1, stock=5)
+
+        response = self.post({'items': [{'book_id': book.id, 'quantity': 2}, {'book_id': book.id + 1000}]})
+
+        data = response.json()
+        self.assertEqual((data['added'], data['total_items']), ([book.id], 2))
+        self.assertEqual(data['rejected'][0]['reason'], 'not_found')
+
+    def test_stock_check_counts_copies_already_in_the_cart(self):
+        book = make_book(1, stock=3)
+        self.post({'items': [{'book_id': book.id, 'quantity': 2}]})
+
+        response = self.post({'items': [{'book_id': book.id, 'quantity': 2}]})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['rejected'][0]['reason'], 'out_of_stock')
+
+    def test_stock_check_counts_database_cart_too(self):
+        book = make_book(1, stock=3)
+        user = get_user_model().objects.create_user(username='alice', email='alice@example.com', password='x')
+        self.client.force_login(user)
+        self.post({'items': [{'book_id': book.id, 'quantity': 3}]})
+
+        response = self.post({'items': [{'book_id': book.id, 'quantity': 1}]})
+
+        self.assertEqual(response.json()['rejected'][0]['reason'], 'out_of_stock')
+
+    def test_stock_check_subtracts_other_shoppers_reservations(self):
+        book = make_book(1, stock=3)
+        expires_at = timezone.now() + timedelta(minutes=10)
+        StockReservation.objects.create(book=book, holder='someone-else', quantity=2, expires_at=expires_at)
+
+        response = self.post({'items': [{'book_id': book.id, 'quantity': 2}]})
+        self.assertEqual(response.json()['rejected'][0]['reason'], 'out_of_stock')
+
+        # Our own checkout reservation holds the copies already in our cart
+        self.post({'items': [{'book_id': book.id, 'quantity': 1}]})
+        StockReservation.objects.create(
+            book=book, holder=self.client.session.session_key, quantity=1, expires_at=expires_at,
+        )
+        response = self.post({'items': [{'book_id': book.id, 'quantity': 1}]})
+        self.assertEqual(response.json()['rejected'][0]['reason'], 'out_of_stock')
+        StockReservation.objects.filter(holder='someone-else').delete()
+        self.assertEqual(self.post({'items': [{'book_id': book.id, 'quantity': 2}]}).status_code, 200)
+
+    def test_out_of_range_values_are_rejected(self):
+        book = make_book(1)
+        for item in (
+            {'book_id': 10 ** 30},
+            {'book_id': -1},
+            {'book_id': book.id, 'quantity': 10 ** 30},
+            {'book_id': book.id, 'quantity': 0},
+        ):
+            with self.subTest(item=item):
+                self.assertEqual(self.post({'items': [item]}).status_code, 400)
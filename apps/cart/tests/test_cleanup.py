@@ -0,0 +1,59 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from apps.cart.cleanup import cleanup
+from apps.cart.models import Cart, CartItem
+from apps.core import batching
+from apps.core.batching import delete_in_batches
+from apps.books.tests.utils import make_book
+
+
+@override_settings(CART_ANONYMOUS_TTL_DAYS=14)
+class CartCleanupTests(TestCase):
+    def setUp(self):
+        self.book = make_book()
+        user = get_user_model().objects.create_user(username='alice', email='alice@example.com', password='x')
+        long_ago = timezone.now() - timedelta(days=30)
+
+        self.abandoned = Cart.objects.create()
+        self.abandoned.items.create(book=self.book, quantity=1, price_at_addition=self.book.price)
+        self.recent = Cart.objects.create()
+        self.users_cart = Cart.objects.create(user=user)
+        Cart.objects.filter(pk__in=[self.abandoned.pk, self.users_cart.pk]).update(updated_at=long_ago)
+
+        Session.objects.create(session_key='expired', session_data='', expire_date=long_ago)
+        Session.objects.create(session_key='live', session_data='', expire_date=timezone.now() + timedelta(days=1))
+
+    def test_reaps_old_guest_carts_and_expired_sessions(self):
+        reclaimed = cleanup()
+
+        self.assertEqual(reclaimed, {'cart.Cart': 1, 'cart.CartItem': 1, 'sessions.Session': 1})
+        self.assertEqual(set(Cart.objects.values_list('pk', flat=True)), {self.recent.pk, self.users_cart.pk})
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), ['live'])
+
+    def test_dry_run_deletes_nothing(self):
+        out = StringIO()
+        call_command('cleanup_carts', '--dry-run', stdout=out)
+
+        self.assertIn('Would delete 1 abandoned carts and 1 expired sessions.', out.getvalue())
+        self.assertEqual(Cart.objects.count(), 3)
+
+
+class DeleteInBatchesTests(TestCase):
+    def test_deletes_in_batches_with_a_pause_between_them(self):
+        cart = Cart.objects.create()
+        for n in range(1, 6):
+            cart.items.create(book=make_book(n), quantity=1, price_at_addition=1)
+
+        with mock.patch.object(batching.time, 'sleep') as sleep, self.assertNumQueries(6):
+            # 3 batches of at most 2 rows: one SELECT of ids and one DELETE each
+            reclaimed = delete_in_batches(CartItem.objects.all(), batch_size=2, pause=0.5)
+
+        self.assertEqual(reclaimed, {'cart.CartItem': 5})
+        self.assertEqual(sleep.call_count, 2)
+        self.assertFalse(CartItem.objects.exists())
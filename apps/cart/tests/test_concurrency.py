@@ -0,0 +1,39 @@
+from django.db import connection
+from django.test import TransactionTestCase
+from apps.cart.cart import upsert
+from apps.cart.models import Cart
+from apps.books.tests.utils import make_book
+from .utils import run_in_threads
+
+
+class ConcurrentCartTests(TransactionTestCase):
+    THREADS = 10
+
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest('Needs a database shared between threads (run with config.settings.testing)')
+
+    def test_concurrent_adds_of_one_book(self):
+        book = make_book()
+        cart = Cart.objects.create()
+
+        errors = run_in_threads(lambda i: upsert.upsert_item(cart, book.id, 1), self.THREADS)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(list(cart.items.values_list('quantity', flat=True)), [self.THREADS])
+
+    def test_merge_while_adding(self):
+        book = make_book()
+        user_cart, anon_cart = Cart.objects.create(), Cart.objects.create()
+        upsert.upsert_item(anon_cart, book.id, 5)
+
+        def work(i):
+            if i == 0:
+                upsert.merge_cart(user_cart, anon_cart)
+            else:
+                upsert.upsert_item(user_cart, book.id, 1)
+
+        errors = run_in_threads(work, self.THREADS)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(list(user_cart.items.values_list('quantity', flat=True)), [5 + self.THREADS - 1])
@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from apps.cart.cart import get_cart
+from apps.cart.models import Cart
+from apps.books.tests.utils import make_book
+
+
+class LazyCartTests(TestCase):
+    def setUp(self):
+        self.book = make_book()
+
+    def test_browsing_creates_no_cart(self):
+        self.client.get(reverse('books:book_list'))
+        self.client.get(reverse('books:book_detail', args=[self.book.slug]))
+        response = self.client.get(reverse('cart:cart_detail'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Cart.objects.exists())
+        self.assertNotIn(settings.CART_SESSION_ID, self.client.session)
+
+    def test_first_add_creates_the_cart(self):
+        self.client.post(reverse('cart:cart_add', args=[self.book.id]), {'quantity': 2})
+
+        cart = Cart.objects.get()
+        self.assertEqual(self.client.session[settings.CART_SESSION_ID], cart.id)
+        self.assertEqual(cart.items.get().quantity, 2)
+
+    def test_one_service_per_request(self):
+        request = RequestFactory().get('/')
+        request.session = self.client.session
+        self.assertIs(get_cart(request), get_cart(request))
+
+    def test_stale_cart_id_is_forgotten(self):
+        self.client.post(reverse('cart:cart_add', args=[self.book.id]))
+        Cart.objects.all().delete()
+
+        self.client.get(reverse('cart:cart_detail'))
+
+        self.assertNotIn(settings.CART_SESSION_ID, self.client.session)
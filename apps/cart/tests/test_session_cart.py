@@ -0,0 +1,53 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from apps.cart.models import Cart, CartItem
+from apps.books.tests.utils import make_book
+
+
+@override_settings(CART_ANONYMOUS_STORAGE='session', CART_SESSION_MAX_LINES=2)
+class SessionCartTests(TestCase):
+    def setUp(self):
+        self.first, self.second = make_book(1), make_book(2)
+
+    def add(self, book, quantity=1):
+        return self.client.post(reverse('cart:cart_add', args=[book.id]), {'quantity': quantity})
+
+    def test_guest_lines_live_in_the_session(self):
+        self.add(self.first, 2)
+        self.add(self.first, 1)
+
+        self.assertFalse(Cart.objects.exists())
+        self.assertEqual(self.client.session['cart_lines'], [[self.first.id, 3, '10.00']])
+        response = self.client.get(reverse('cart:cart_detail'))
+        self.assertEqual(response.context['cart'].get_total_items(), 3)
+
+    def test_update_and_remove(self):
+        self.add(self.first, 2)
+        self.client.post(reverse('cart:cart_update', args=[self.first.id]), {'quantity': 5})
+        self.assertEqual(self.client.session['cart_lines'][0][1], 5)
+
+        self.client.post(reverse('cart:cart_remove', args=[self.first.id]))
+        self.assertNotIn('cart_lines', self.client.session)
+
+    def test_line_limit(self):
+        self.add(self.first)
+        self.add(self.second)
+
+        response = self.add(make_book(3), 1)
+
+        self.assertRedirects(response, reverse('cart:cart_detail'), fetch_redirect_response=False)
+        self.assertEqual(len(self.client.session['cart_lines']), 2)
+
+    def test_login_moves_the_lines_into_the_user_cart(self):
+        user = get_user_model().objects.create_user(username='alice', email='alice@example.com', password='x')
+        self.add(self.first, 2)
+        self.client.force_login(user)
+
+        self.client.get(reverse('cart:cart_detail'))
+
+        self.assertEqual(
+            list(CartItem.objects.filter(cart__user=user).values_list('book_id', 'quantity')),
+            [(self.first.id, 2)],
+        )
+        self.assertNotIn('cart_lines', self.client.session)
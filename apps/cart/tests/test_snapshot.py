@@ -0,0 +1,79 @@
+from datetime import timedelta
+from decimal import Decimal
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from apps.cart.cart import CartSnapshot, get_cart
+from apps.cart.models import Cart
+from apps.coupons.rules import CouponRule
+from apps.books.tests.utils import make_book
+
+
+def make_rule(**kwargs):
+    now = timezone.now()
+    defaults = {
+        'id': 1, 'code': 'YAY10', 'is_percentage': True, 'value': Decimal('10'),
+        'min_purchase': None, 'max_discount': None,
+        'valid_from': now - timedelta(days=1), 'valid_until': now + timedelta(days=1), 'is_active': True,
+    }
+    defaults.update(kwargs)
+    return CouponRule(**defaults)
+
+
+class CartSnapshotTests(TestCase):
+    def setUp(self):
+        self.cart = Cart.objects.create()
+        self.cart.items.create(book=make_book(1, price=Decimal('12.00')), quantity=2, price_at_addition=Decimal('12.00'))
+        self.cart.items.create(
+            book=make_book(2, price=Decimal('20.00'), discount_price=Decimal('15.50')),
+            quantity=1, price_at_addition=Decimal('15.50'),
+        )
+
+    def test_totals(self):
+        snapshot = CartSnapshot.build(self.cart)
+        self.assertEqual(len(snapshot.items), 2)
+        self.assertEqual(snapshot.total_items, 3)
+        self.assertEqual(snapshot.total_price, Decimal('39.50'))
+        self.assertEqual(snapshot.discount, Decimal('0.00'))
+
+    def test_coupon_discount(self):
+        snapshot = CartSnapshot.build(self.cart, make_rule())
+        self.assertEqual(snapshot.discount, Decimal('3.95'))
+        self.assertEqual(snapshot.total_price_after_discount, Decimal('35.55'))
+
+    def test_no_cart(self):
+        snapshot = CartSnapshot.build(None)
+        self.assertEqual((snapshot.items, snapshot.total_items, snapshot.total_price), ((), 0, Decimal('0')))
+
+
+class SharedSnapshotTests(TestCase):
+    def test_snapshot_is_built_once_and_rebuilt_after_changes(self):
+        request = RequestFactory().get('/')
+        request.session = self.client.session
+        request.user = AnonymousUser()
+        cart = get_cart(request)
+        cart.add(make_book(1).id)
+
+        first = cart.snapshot
+        self.assertIs(cart.snapshot, first)
+        self.assertEqual(cart.get_total_items(), 1)
+
+        cart.add(make_book(2).id, 2)
+        self.assertIsNot(cart.snapshot, first)
+        self.assertEqual(cart.get_total_items(), 3)
+
+    def test_cart_page_queries_do_not_grow_with_items(self):
+        def cart_page_queries():
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(reverse('cart:cart_detail'))
+            return len(queries)
+
+        self.client.post(reverse('cart:cart_add', args=[make_book(1).id]))
+        one_item = cart_page_queries()
+        for n in range(2, 6):
+            self.client.post(reverse('cart:cart_add', args=[make_book(n).id]))
+
+        self.assertEqual(cart_page_queries(), one_item)
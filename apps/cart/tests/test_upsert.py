@@ -0,0 +1,68 @@
+from decimal import Decimal
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from apps.books.models import Book
+from apps.cart.cart import upsert
+from apps.cart.models import Cart, CartItem
+from apps.books.tests.utils import make_book
+
+
+class CartUpsertTests(TestCase):
+    def setUp(self):
+        self.book = make_book(discount_price=Decimal('8.00'))
+        self.cart = Cart.objects.create()
+
+    def test_add_inserts_then_increments(self):
+        item = upsert.upsert_item(self.cart, self.book.id, 2)
+        self.assertEqual(item.quantity, 2)
+        item = upsert.upsert_item(self.cart, self.book.id, 3)
+        self.assertEqual(item.quantity, 5)
+        stored = CartItem.objects.get(cart=self.cart, book=self.book)
+        self.assertEqual((stored.id, stored.quantity), (item.id, 5))
+        self.assertEqual(stored.price_at_addition, Decimal('8.00'))
+
+    def test_replace_sets_quantity(self):
+        upsert.upsert_item(self.cart, self.book.id, 4)
+        item = upsert.upsert_item(self.cart, self.book.id, 1, replace=True)
+        self.assertEqual(item.quantity, 1)
+
+    def test_unknown_book(self):
+        with self.assertRaises(Book.DoesNotExist):
+            upsert.upsert_item(self.cart, self.book.id + 1000, 1)
+        self.assertFalse(CartItem.objects.exists())
+
+    def test_merge_cart_adds_up_overlapping_books(self):
+        other = make_book(2)
+        anon_cart = Cart.objects.create()
+        upsert.upsert_item(self.cart, self.book.id, 1)
+        upsert.upsert_item(anon_cart, self.book.id, 2)
+        upsert.upsert_item(anon_cart, other.id, 3)
+
+        upsert.merge_cart(self.cart, anon_cart)
+
+        quantities = dict(self.cart.items.values_list('book_id', 'quantity'))
+        self.assertEqual(quantities, {self.book.id: 3, other.id: 3})
+
+    def test_merge_lines_skips_deleted_books(self):
+        upsert.merge_lines(self.cart, [[self.book.id, 2, '8.00'], [self.book.id + 1000, 1, '5.00']])
+        self.assertEqual(list(self.cart.items.values_list('book_id', 'quantity')), [(self.book.id, 2)])
+
+
+class LoginMergeTests(TestCase):
+    def test_anonymous_cart_is_merged_on_login(self):
+        book, other = make_book(1), make_book(2)
+        user = get_user_model().objects.create_user(username='alice', email='alice@example.com', password='x')
+        user_cart = Cart.objects.create(user=user)
+        upsert.upsert_item(user_cart, book.id, 1)
+
+        self.client.post(reverse('cart:cart_add', args=[book.id]), {'quantity': 2})
+        self.client.post(reverse('cart:cart_add', args=[other.id]), {'quantity': 1})
+        anon_cart_id = self.client.session[settings.CART_SESSION_ID]
+        self.client.force_login(user)
+        self.client.get(reverse('cart:cart_detail'))
+
+        quantities = dict(user_cart.items.values_list('book_id', 'quantity'))
+        self.assertEqual(quantities, {book.id: 3, other.id: 1})
+        self.assertFalse(Cart.objects.filter(id=anon_cart_id).exists())
@@ -0,0 +1,24 @@
+import threading
+from django.db import connection
+
+
+def run_in_threads(target, count):
+    """Runs target(i) in count threads released at the same moment."""
+    barrier = threading.Barrier(count)
+    errors = []
+
+    def worker(i):
+        try:
+            barrier.wait()
+            target(i)
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
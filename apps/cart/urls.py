@@ -6,6 +6,7 @@ app_name = 'cart'
 urlpatterns = [
     path('', views.cart_detail, name='cart_detail'),
     path('add/<int:book_id>/', views.cart_add, name='cart_add'),
+    path('add/batch/', views.cart_add_batch, name='cart_add_batch'),
     path('update/<int:book_id>/', views.cart_update, name='cart_update'),
     path('remove/<int:book_id>/', views.cart_remove, name='cart_remove'),
 ]
@@ -1,2 +1,2 @@
 from apps.cart.views.base import cart_detail
-from apps.cart.views.actions import cart_add, cart_update, cart_remove
+from apps.cart.views.actions import cart_add, cart_add_batch, cart_update, cart_remove
@@ -1,20 +1,40 @@
+import json
 from django.shortcuts import get_object_or_404, redirect
+from django.template.loader import render_to_string
 from django.views.decorators.http import require_POST
-from django.http import JsonResponse
+from django.http import JsonResponse, Http404
 from apps.books.models import Book
-from apps.cart.cart import CartService
+from apps.cart.cart import get_cart, CartLimitExceeded
+from apps.orders.models import Order
+
+# Most lines accepted by one cart_add_batch request
+BATCH_MAX_LINES = 100
+BATCH_MAX_QUANTITY = 999
+# Largest BigAutoField value; bigger ids can't even be bound as query parameters
+MAX_BOOK_ID = 2 ** 63 - 1
+REJECTION_MESSAGES = {
+    'not_found': 'Kitab tapılmadı.',
+    'out_of_stock': 'Kifayət qədər stok yoxdur.',
+}
 
 @require_POST
 def cart_add(request, book_id):
-    cart = CartService(request)
-    book = get_object_or_404(Book, id=book_id)
+    cart = get_cart(request)
     quantity = int(request.POST.get('quantity', 1))
     
-    cart.add(book_id=book_id, quantity=quantity)
+    try:
+        item = cart.add(book_id=book_id, quantity=quantity)
+    except Book.DoesNotExist:
+        raise Http404('Kitab tapılmadı.')
+    except CartLimitExceeded:
+        if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+            return JsonResponse({'status': 'error', 'message': 'Səbətə daha çox kitab əlavə etmək mümkün deyil.'}, status=400)
+        return redirect('cart:cart_detail')
     
     if request.headers.get('x-requested-with') == 'XMLHttpRequest':
-        from django.template.loader import render_to_string
         mini_cart_html = render_to_string('cart/includes/mini_cart.html', {'cart': cart}, request=request)
+        # The snapshot already loaded the book for the mini cart
+        book = next(line.book for line in cart if line.book_id == item.book_id)
         return JsonResponse({
             'status': 'success',
             'total_items': cart.get_total_items(),
@@ -24,14 +44,85 @@ def cart_add(request, book_id):
     
     return redirect('cart:cart_detail')
 
+def _parse_batch_lines(payload):
+    """[(book_id, quantity), ...] from {"items": [{"book_id": 1, "quantity": 2}, ...]}, or None if malformed."""
+    items = payload.get('items')
+    if not isinstance(items, list) or not 0 < len(items) <= BATCH_MAX_LINES:
+        return None
+    lines = []
+    for item in items:
+        try:
+            book_id, quantity = int(item['book_id']), int(item.get('quantity', 1))
+        except (TypeError, KeyError, ValueError):
+            return None
+        if not (0 < book_id <= MAX_BOOK_ID and 0 < quantity <= BATCH_MAX_QUANTITY):
+            return None
+        lines.append((book_id, quantity))
+    return lines
+
+@require_POST
+def cart_add_batch(request):
+    """
+    JSON endpoint adding many books in one request: either
+    {"items": [{"book_id": 1, "quantity": 2}, ...]} or
+    {"order_number": "..."} to put a past order back into the cart.
+    Unavailable books are skipped and reported; one mini cart is rendered.
+    """
+    try:
+        payload = json.loads(request.body or b'{}')
+    except ValueError:
+        payload = None
+    if not isinstance(payload, dict):
+        return JsonResponse({'status': 'error', 'message': 'Yanlış sorğu.'}, status=400)
+
+    if payload.get('order_number'):
+        if not request.user.is_authenticated:
+            raise Http404('Sifariş tapılmadı.')
+        order = get_object_or_404(Order, order_number=payload['order_number'], user=request.user)
+        lines = list(order.items.filter(book__isnull=False).values_list('book_id', 'quantity'))
+    else:
+        lines = _parse_batch_lines(payload)
+        if lines is None:
+            return JsonResponse({'status': 'error', 'message': 'Yanlış sorğu.'}, status=400)
+
+    cart = get_cart(request)
+    try:
+        added, rejected = cart.add_many(lines)
+    except CartLimitExceeded:
+        return JsonResponse({'status': 'error', 'message': 'Səbətə daha çox kitab əlavə etmək mümkün deyil.'}, status=400)
+
+    rejected = [
+        {'book_id': book_id, 'reason': reason, 'message': REJECTION_MESSAGES[reason]}
+        for book_id, reason in rejected.items()
+    ]
+    if not added:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Seçilmiş kitablar hazırda mövcud deyil.',
+            'rejected': rejected,
+        }, status=400)
+
+    return JsonResponse({
+        'status': 'success',
+        'added': added,
+        'rejected': rejected,
+        'total_items': cart.get_total_items(),
+        'message': f'{len(added)} kitab səbətə əlavə edildi.',
+        'mini_cart_html': render_to_string('cart/includes/mini_cart.html', {'cart': cart}, request=request),
+    })
+
 @require_POST
 def cart_update(request, book_id):
-    cart = CartService(request)
+    cart = get_cart(request)
     quantity = int(request.POST.get('quantity'))
     
-    item = cart.add(book_id=book_id, quantity=quantity, update_quantity=True)
+    try:
+        item = cart.add(book_id=book_id, quantity=quantity, update_quantity=True)
+    except Book.DoesNotExist:
+        raise Http404('Kitab tapılmadı.')
     
     if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+        item = next(line for line in cart if line.book_id == item.book_id)
         return JsonResponse({
             'status': 'success',
             'item_subtotal': item.subtotal,
@@ -43,7 +134,7 @@ def cart_update(request, book_id):
 
 @require_POST
 def cart_remove(request, book_id):
-    cart = CartService(request)
+    cart = get_cart(request)
     cart.remove(book_id)
     
     if request.headers.get('x-requested-with') == 'XMLHttpRequest':
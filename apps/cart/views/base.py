@@ -1,6 +1,6 @@
 from django.shortcuts import render
-from apps.cart.cart import CartService
+from apps.cart.cart import get_cart
 
 def cart_detail(request):
-    cart = CartService(request)
+    cart = get_cart(request)
     return render(request, 'cart/cart_detail.html', {'cart': cart})
@@ -0,0 +1,31 @@
+"""
+Batched deletes for maintenance jobs.
+
+Rows are deleted in small batches of primary keys picked through an index,
+each batch in its own short transaction with an optional pause in between,
+so the SQLite write lock is never held for long and the jobs can run while
+the shop is serving traffic.
+"""
+import time
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def delete_in_batches(queryset, batch_size=DEFAULT_BATCH_SIZE, pause=0.0):
+    """
+    Deletes the queryset batch by batch. Returns {model label: rows deleted},
+    including cascaded rows.
+    """
+    model = queryset.model
+    reclaimed = {}
+    while True:
+        batch = list(queryset.order_by().values_list('pk', flat=True)[:batch_size])
+        if not batch:
+            return reclaimed
+        _, per_model = model.objects.filter(pk__in=batch).delete()
+        for label, count in per_model.items():
+            reclaimed[label] = reclaimed.get(label, 0) + count
+        if len(batch) < batch_size:
+            return reclaimed
+        if pause:
+            time.sleep(pause)
@@ -0,0 +1,14 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from apps.books.cache import bump_generation
+from .models import Coupon
+from .rules import COUPON_GENERATION
+
+# ==========================================
+# 🎟️ COUPON RULE CACHE
+# ==========================================
+@receiver(post_save, sender=Coupon)
+@receiver(post_delete, sender=Coupon)
+def invalidate_coupon_rules(sender, **kwargs):
+    transaction.on_commit(lambda: bump_generation(COUPON_GENERATION))
@@ -0,0 +1,102 @@
+from datetime import timedelta
+from decimal import Decimal
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+from apps.cart.cart import get_cart
+from apps.coupons.models import Coupon
+from apps.coupons.rules import CouponRule, CouponUnavailableError, get_rule, redeem
+
+
+def make_coupon(code='YAY10', **kwargs):
+    now = timezone.now()
+    defaults = {
+        'code': code,
+        'discount_type': 'percentage',
+        'discount_value': Decimal('10'),
+        'valid_from': now - timedelta(days=1),
+        'valid_until': now + timedelta(days=1),
+    }
+    defaults.update(kwargs)
+    return Coupon.objects.create(**defaults)
+
+
+class CouponRuleMathTests(TestCase):
+    def rule(self, **kwargs):
+        return CouponRule.compile(make_coupon(**kwargs))
+
+    def test_percentage_is_rounded_to_cents(self):
+        rule = self.rule(discount_value=Decimal('12.5'))
+        self.assertEqual(rule.discount(Decimal('19.99')), Decimal('2.50'))
+
+    def test_percentage_is_capped(self):
+        rule = self.rule(discount_value=Decimal('50'), max_discount_amount=Decimal('15.00'))
+        self.assertEqual(rule.discount(Decimal('100.00')), Decimal('15.00'))
+
+    def test_fixed_amount(self):
+        rule = self.rule(discount_type='fixed', discount_value=Decimal('5'))
+        self.assertEqual(rule.discount(Decimal('40.00')), Decimal('5.00'))
+
+    def test_below_minimum_purchase(self):
+        rule = self.rule(min_purchase_amount=Decimal('50.00'))
+        self.assertEqual(rule.discount(Decimal('49.99')), Decimal('0.00'))
+        self.assertEqual(rule.discount(Decimal('50.00')), Decimal('5.00'))
+
+    def test_outside_validity_window_or_inactive(self):
+        rule = self.rule()
+        later = rule.valid_until + timedelta(seconds=1)
+        self.assertEqual(rule.discount(Decimal('100'), now=later), Decimal('0.00'))
+        self.assertEqual(self.rule(code='OFF', is_active=False).discount(Decimal('100')), Decimal('0.00'))
+
+
+class RuleCacheTests(TestCase):
+    def test_saved_coupon_is_reread(self):
+        coupon = make_coupon()
+        self.assertEqual(get_rule(coupon.id).value, Decimal('10'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            coupon.discount_value = Decimal('20')
+            coupon.save()
+
+        self.assertEqual(get_rule(coupon.id).value, Decimal('20'))
+
+    def test_unknown_coupon(self):
+        self.assertIsNone(get_rule(12345))
+        self.assertIsNone(get_rule(None))
+
+
+class RedeemTests(TestCase):
+    def test_counts_uses_up_to_the_limit(self):
+        coupon = make_coupon(usage_limit=1)
+        rule = get_rule(coupon.id)
+
+        redeem(rule)
+        with self.assertRaises(CouponUnavailableError):
+            redeem(rule)
+
+        coupon.refresh_from_db()
+        self.assertEqual(coupon.usage_count, 1)
+
+    def test_rechecks_the_row_not_the_cached_rule(self):
+        coupon = make_coupon()
+        rule = get_rule(coupon.id)
+        # Disabled without going through signals, e.g. by another worker's bulk update
+        Coupon.objects.filter(id=coupon.id).update(is_active=False)
+
+        with self.assertRaises(CouponUnavailableError):
+            redeem(rule)
+
+
+class CartCouponTests(TestCase):
+    def test_coupon_is_resolved_once_per_request(self):
+        coupon = make_coupon()
+        get_rule(coupon.id)  # warm the rule cache
+        request = RequestFactory().get('/')
+        request.session = {'coupon_id': coupon.id}
+        request.user = AnonymousUser()
+        cart = get_cart(request)
+
+        with self.assertNumQueries(1):  # the generation check
+            self.assertEqual(cart.coupon.code, 'YAY10')
+            cart.get_coupon()
+            get_cart(request).coupon
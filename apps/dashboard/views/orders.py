@@ -4,6 +4,8 @@ from django.views.decorators.http import require_POST
 from django.http import HttpResponse
 from django.utils import timezone
 from apps.orders.models import Order, Courier, Delivery
+from apps.orders.services import OrderCoordinator
+from apps.orders.stock import InsufficientStockError
 
 @staff_member_required
 def dashboard_orders(request):
@@ -35,8 +37,17 @@ def dashboard_update_order_status(request, pk):
     new_status = request.POST.get('status')
     
     if new_status in dict(Order.STATUS_CHOICES):
-        order.status = new_status
-        order.save()
+        try:
+            # Cancelling returns the stock, reopening takes it again
+            OrderCoordinator.change_status(order, new_status)
+        except InsufficientStockError as e:
+            order.refresh_from_db()
+            couriers = Courier.objects.filter(is_active=True)
+            context = {
+                'order': order, 'couriers': couriers, 'has_delivery': hasattr(order, 'delivery'),
+                'error': f'Stok kifayət etmir: {e}',
+            }
+            return render(request, 'dashboard/partials/order_detail.html', context)
         
         # Sync with Delivery status to ensure customer view matches admin
         if hasattr(order, 'delivery'):
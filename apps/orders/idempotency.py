@@ -0,0 +1,72 @@
+"""
+Idempotent checkout submissions.
+
+The checkout form carries a random token. The first submission claims it by
+inserting an IdempotencyKey row (the unique index decides the race) and
+links the order to it in the order's own transaction. A duplicate submission
+(double click, browser retry) either finds the finished order and replays
+the response, or is sent to a "processing" page that reloads itself until
+the first one finishes; the request never waits, and never runs
+OrderCoordinator.create_order again.
+"""
+import secrets
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+
+def new_key():
+    return secrets.token_urlsafe(24)
+
+
+def completed_order(key, holder):
+    """The order already placed with this key by this holder, or None."""
+    from apps.orders.models import IdempotencyKey
+
+    row = IdempotencyKey.objects.filter(key=key, holder=holder, order__isnull=False).select_related('order').first()
+    return row.order if row else None
+
+
+def claim(key, holder):
+    """
+    Returns (True, None) when this request owns the key and should place the
+    order, otherwise (False, order) with the first submission's order, which
+    is None while it is still being placed or if it failed.
+    """
+    from apps.orders.models import IdempotencyKey
+
+    ttl = timedelta(hours=getattr(settings, 'IDEMPOTENCY_KEY_TTL_HOURS', 24))
+    try:
+        with transaction.atomic():
+            IdempotencyKey.objects.create(key=key, holder=holder, expires_at=timezone.now() + ttl)
+        return True, None
+    except IntegrityError:
+        return False, completed_order(key, holder)
+
+
+def in_progress(key, holder):
+    """True while this holder's submission with the key is still being placed."""
+    from apps.orders.models import IdempotencyKey
+
+    return IdempotencyKey.objects.filter(key=key, holder=holder, order__isnull=True).exists()
+
+
+def complete(key, order):
+    """Links the order to its key; call inside the transaction that created the order."""
+    from apps.orders.models import IdempotencyKey
+
+    IdempotencyKey.objects.filter(key=key).update(order=order)
+
+
+def abandon(key):
+    """Frees a key whose submission failed, so the form can be sent again."""
+    from apps.orders.models import IdempotencyKey
+
+    IdempotencyKey.objects.filter(key=key, order__isnull=True).delete()
+
+
+def expired_keys(now=None):
+    from apps.orders.models import IdempotencyKey
+
+    return IdempotencyKey.objects.filter(expires_at__lte=now or timezone.now())
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from apps.core.batching import delete_in_batches, DEFAULT_BATCH_SIZE
+from apps.orders.reservations import expired_reservations
+
+class Command(BaseCommand):
+    help = 'Deletes expired stock reservations in small batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Rows deleted per transaction')
+        parser.add_argument('--pause', type=float, default=0.1, help='Seconds to sleep between batches')
+
+    def handle(self, *args, **options):
+        reclaimed = delete_in_batches(expired_reservations(), options['batch_size'], options['pause'])
+        count = reclaimed.get('orders.StockReservation', 0)
+        self.stdout.write(self.style.SUCCESS(f'Deleted {count} expired reservations.'))
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.10 on 2026-10-18 12:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("books", "0008_trending_score"),
+        ("orders", "0003_alter_order_status"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StockReservation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("holder", models.CharField(max_length=40)),
+                ("quantity", models.PositiveIntegerField()),
+                ("expires_at", models.DateTimeField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "book",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reservations",
+                        to="books.book",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["book", "expires_at", "quantity"],
+                        name="orders_reservation_active_idx",
+                    ),
+                    models.Index(fields=["expires_at"], name="orders_reservation_expiry_idx"),
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("holder", "book"), name="unique_reservation_holder_book"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.10 on 2026-10-18 13:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("coupons", "0003_alter_couponusage_order_alter_couponusage_user"),
+        ("orders", "0006_idempotency_key"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(fields=["created_at"], name="orders_created_idx"),
+        ),
+    ]
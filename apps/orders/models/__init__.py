@@ -1,3 +1,6 @@
 from .order import Order, OrderItem
 from .courier import Courier
 from .delivery import Delivery
+from .reservation import StockReservation
+from .sequence import Sequence
+from .idempotency import IdempotencyKey
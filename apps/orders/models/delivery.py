@@ -36,3 +36,9 @@ class Delivery(models.Model):
 
     def __str__(self):
         return f"Delivery for {self.order.order_number} - {self.get_status_display()}"
+
+    def save(self, *args, **kwargs):
+        if not self.tracking_number:
+            from apps.orders.numbers import next_tracking_number
+            self.tracking_number = next_tracking_number()
+        super().save(*args, **kwargs)
@@ -0,0 +1,21 @@
+from django.db import models
+from .order import Order
+
+class IdempotencyKey(models.Model):
+    """
+    One checkout submission. The token is embedded in the checkout form;
+    repeated submissions of the same form find the row and replay its order
+    instead of placing a second one.
+    """
+    key = models.CharField(max_length=64, unique=True)
+    # Session key of the shopper, so a token only replays for its own session
+    holder = models.CharField(max_length=40)
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        app_label = 'orders'
+
+    def __str__(self):
+        return f"{self.key} -> {self.order_id or '...'}"
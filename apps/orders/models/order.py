@@ -58,17 +58,19 @@ class Order(models.Model):
     class Meta:
         ordering = ['-created_at']
         app_label = 'orders'
+        indexes = [
+            # Windowed sales (apps.books.trending)
+            models.Index(fields=['created_at'], name='orders_created_idx'),
+        ]
 
     def __str__(self):
         return f"Sifariş #{self.order_number}"
 
     def save(self, *args, **kwargs):
         if not self.order_number:
-            import datetime
-            import random
-            # Simple unique order number generation
-            now = datetime.datetime.now()
-            self.order_number = f"OLR{now.strftime('%y%m%d%H%M')}{random.randint(10, 99)}"
+            from apps.orders.numbers import next_order_number
+            # Per-day counter: unique across workers, no retries
+            self.order_number = next_order_number()
         super().save(*args, **kwargs)
 
 from apps.books.models import Book
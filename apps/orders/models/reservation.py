@@ -0,0 +1,29 @@
+from django.db import models
+from apps.books.models import Book
+
+class StockReservation(models.Model):
+    """
+    Copies of a book held for a checkout in progress. Only rows with
+    expires_at in the future count; expired rows are swept in batches by
+    the sweep_reservations command.
+    """
+    book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name='reservations')
+    # Session key of the shopper holding the copies
+    holder = models.CharField(max_length=40)
+    quantity = models.PositiveIntegerField()
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        app_label = 'orders'
+        constraints = [
+            models.UniqueConstraint(fields=['holder', 'book'], name='unique_reservation_holder_book'),
+        ]
+        indexes = [
+            # Covers SUM(quantity) of a book's active reservations
+            models.Index(fields=['book', 'expires_at', 'quantity'], name='orders_reservation_active_idx'),
+            models.Index(fields=['expires_at'], name='orders_reservation_expiry_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.quantity} x {self.book_id} for {self.holder} until {self.expires_at:%H:%M}"
@@ -0,0 +1,15 @@
+from django.db import models
+
+class Sequence(models.Model):
+    """
+    Named counter handed out by apps.orders.numbers (e.g. one row per day
+    for order numbers). Incremented with a single upsert statement.
+    """
+    name = models.CharField(max_length=64, unique=True)
+    value = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        app_label = 'orders'
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
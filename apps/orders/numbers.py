@@ -0,0 +1,59 @@
+"""
+Order and tracking number allocation.
+
+Numbers are a prefix, the local date and a per-day counter, e.g.
+OLR24101800042. The counter lives in a Sequence row per prefix and day and is
+advanced with one INSERT ... ON CONFLICT DO UPDATE ... RETURNING statement,
+so every worker gets a distinct value without retries.
+
+The upsert locks the day's row until its transaction ends, so checkout
+allocates the order number before opening its own transaction: in
+autocommit the statement is its own short transaction and concurrent
+checkouts only queue for that one statement, not for each other's whole
+checkout. A checkout that then fails leaves a gap in the day's numbers,
+which is fine; numbers are unique, not contiguous. Order.save() still
+allocates a number for orders created without one (admin, scripts), inside
+whatever transaction they run in.
+"""
+from django.db import connection
+from django.utils import timezone
+from apps.orders.models import Sequence
+
+ORDER_PREFIX = 'OLR'
+TRACKING_PREFIX = 'TRK'
+
+
+def next_value(name):
+    """Increments the named sequence (creating it at 1) and returns the new value."""
+    qn = connection.ops.quote_name
+    table = qn(Sequence._meta.db_table)
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            # LAST_INSERT_ID(expr) makes the new value readable on this connection
+            cursor.execute(
+                f'INSERT INTO {table} (name, value) VALUES (%s, LAST_INSERT_ID(1)) '
+                f'ON DUPLICATE KEY UPDATE value = LAST_INSERT_ID(value + 1)',
+                [name],
+            )
+            cursor.execute('SELECT LAST_INSERT_ID()')
+        else:
+            cursor.execute(
+                f'INSERT INTO {table} (name, value) VALUES (%s, 1) '
+                f'ON CONFLICT (name) DO UPDATE SET value = {table}.value + 1 RETURNING value',
+                [name],
+            )
+        return cursor.fetchone()[0]
+
+
+def next_number(prefix, now=None):
+    day = timezone.localdate(now)
+    value = next_value(f'{prefix}:{day:%y%m%d}')
+    return f'{prefix}{day:%y%m%d}{value:05d}'
+
+
+def next_order_number(now=None):
+    return next_number(ORDER_PREFIX, now)
+
+
+def next_tracking_number(now=None):
+    return next_number(TRACKING_PREFIX, now)
@@ -0,0 +1,85 @@
+"""
+Soft stock reservations.
+
+While a shopper fills in the checkout form, the books in their cart are held
+for STOCK_RESERVATION_MINUTES (0 disables reservations). Available stock is
+stock minus the other shoppers' active reservations, read from the covering
+(book, expires_at, quantity) index. Checkout converts the holder's
+reservations into a real stock decrement (see stock.take_stock).
+
+Reservations are advisory: they never block the holder themselves, and
+nothing has to clean them up for correctness because expired rows simply
+stop counting.
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+def reservation_minutes():
+    return getattr(settings, 'STOCK_RESERVATION_MINUTES', 0)
+
+
+def holder_for(request):
+    """The session key reservations are filed under (creating the session if needed)."""
+    if not request.session.session_key:
+        request.session.save()
+    return request.session.session_key
+
+
+def reserved_quantity(exclude_holder=None, now=None):
+    """Expression for a Book queryset: copies held by active reservations (other than exclude_holder's)."""
+    from apps.orders.models import StockReservation
+
+    reservations = StockReservation.objects.filter(book=OuterRef('pk'), expires_at__gt=now or timezone.now())
+    if exclude_holder:
+        reservations = reservations.exclude(holder=exclude_holder)
+    total = reservations.order_by().values('book').annotate(total=Sum('quantity')).values('total')
+    return Coalesce(Subquery(total), 0)
+
+
+def reserve(holder, quantities):
+    """
+    Replaces the holder's reservations with {book_id: quantity}. Books that
+    don't have enough unreserved stock are not held. Returns the ids held.
+    """
+    from apps.books.models import Book
+    from apps.orders.models import StockReservation
+
+    minutes = reservation_minutes()
+    if not minutes or not holder:
+        return []
+
+    now = timezone.now()
+    with transaction.atomic():
+        StockReservation.objects.filter(holder=holder).delete()
+        available = dict(
+            Book.objects.filter(id__in=list(quantities))
+            .annotate(available=F('stock') - reserved_quantity(now=now))
+            .values_list('id', 'available')
+        )
+        held = [book_id for book_id, quantity in quantities.items() if available.get(book_id, 0) >= quantity]
+        StockReservation.objects.bulk_create([
+            StockReservation(
+                book_id=book_id, holder=holder, quantity=quantities[book_id],
+                expires_at=now + timedelta(minutes=minutes),
+            )
+            for book_id in held
+        ])
+    return held
+
+
+def release(holder):
+    from apps.orders.models import StockReservation
+
+    if holder:
+        StockReservation.objects.filter(holder=holder).delete()
+
+
+def expired_reservations(now=None):
+    from apps.orders.models import StockReservation
+
+    return StockReservation.objects.filter(expires_at__lte=now or timezone.now())
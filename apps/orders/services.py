@@ -1,6 +1,8 @@
 from decimal import Decimal
 from django.db import transaction
-from .models import OrderItem
+from apps.coupons.rules import redeem
+from .models import Order, OrderItem
+from .stock import order_quantities, take_stock, release_stock
 
 class OrderCoordinator:
     """
@@ -9,7 +11,7 @@ class OrderCoordinator:
     
     @staticmethod
     @transaction.atomic
-    def create_order(user, order_instance, cart):
+    def create_order(user, order_instance, cart, reservation_holder=None):
         """
         Finalizes and persists the order based on cart contents.
         
@@ -17,33 +19,46 @@ class OrderCoordinator:
             user: The user creating the order (can be AnonymousUser).
             order_instance: The unsaved Order model instance (from form.save(commit=False)).
             cart: The CartService instance.
+            reservation_holder: Session key whose stock reservations this order uses up.
             
         Returns:
             Order: The saved order instance.
+
+        Raises:
+            InsufficientStockError: Some line is out of stock; nothing is saved.
+            CouponUnavailableError: The coupon expired, was disabled or used up; nothing is saved.
         """
+        snapshot = cart.snapshot
+
+        # 0. Take the stock first: a shortage rejects the whole order
+        take_stock(
+            order_quantities((item.book_id, item.quantity) for item in snapshot.items),
+            holder=reservation_holder,
+        )
         
         # 1. Assign User (if authenticated)
         if user.is_authenticated:
             order_instance.user = user
             
-        # 2. Calculate Pricing
+        # 2. Calculate Pricing (totals and items come from one snapshot)
         # Ensure we use Decimals for currency
-        order_instance.subtotal = cart.get_total_price()
-        order_instance.discount_amount = Decimal(cart.get_discount())
+        order_instance.subtotal = snapshot.total_price
+        order_instance.discount_amount = Decimal(snapshot.discount)
         order_instance.shipping_cost = Decimal(0) # Future-proof: easy to add shipping logic here later
-        order_instance.total_amount = Decimal(cart.get_total_price_after_discount()) + order_instance.shipping_cost
+        order_instance.total_amount = Decimal(snapshot.total_price_after_discount) + order_instance.shipping_cost
         
-        # 3. Associate Coupon
-        coupon = cart.get_coupon()
+        # 3. Associate Coupon (checked and counted against the row, not the cached rule)
+        coupon = snapshot.coupon
         if coupon:
-            order_instance.coupon = coupon
+            redeem(coupon)
+            order_instance.coupon_id = coupon.id
             
         # 4. Save the Order (Generate IDs)
         order_instance.save()
         
         # 5. Create Order Items (Snapshots of current price/titles)
         items_to_create = []
-        for item in cart:
+        for item in snapshot.items:
             items_to_create.append(OrderItem(
                 order=order_instance,
                 book=item.book,
@@ -54,10 +69,26 @@ class OrderCoordinator:
             
         # Bulk create is more efficient
         OrderItem.objects.bulk_create(items_to_create)
-        
-        # 6. Handle Side Effects (Coupons)
-        if coupon:
-            coupon.usage_count += 1
-            coupon.save()
             
         return order_instance
+
+    @staticmethod
+    @transaction.atomic
+    def change_status(order, new_status):
+        """
+        Moves the order to new_status. Cancelling gives its stock back and
+        reopening a cancelled order takes it again (InsufficientStockError if
+        it's gone). The cancelled/not-cancelled switch is a conditional
+        UPDATE, so two simultaneous cancels release the stock only once.
+        """
+        lines = order.items.values_list('book_id', 'quantity')
+        if new_status == 'cancelled':
+            if Order.objects.filter(pk=order.pk).exclude(status='cancelled').update(status='cancelled'):
+                release_stock(order_quantities(lines))
+        elif Order.objects.filter(pk=order.pk, status='cancelled').update(status=new_status):
+            take_stock(order_quantities(lines))
+
+        order.status = new_status
+        # Regular save: status signals (delivery, SMS) still fire
+        order.save()
+        return order
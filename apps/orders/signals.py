@@ -1,5 +1,6 @@
 from django.db.models.signals import post_save
 from django.dispatch import receiver
+from apps.outbox.service import enqueue
 from .models import Order, Delivery
 from .sms import SMSService
 
@@ -21,15 +22,14 @@ def order_status_changed_sms(sender, instance, created, **kwargs):
 @receiver(post_save, sender=Delivery)
 def send_delivery_status_sms(sender, instance, created, **kwargs):
     """
-    Automatically send SMS to customer when delivery status changes
+    Automatically send SMS to customer when delivery status changes.
+    Queued in the outbox with this save's transaction; run_outbox sends it.
     """
     # Only send SMS if delivery has an order with a phone number
     if not instance.order or not instance.order.phone:
         return
     
     # Generate appropriate message based on status
-    sms_service = SMSService()
-    message = sms_service.format_order_status_message(instance.order, instance)
+    message = SMSService.format_order_status_message(instance.order, instance)
     
-    # Send the SMS
-    sms_service.send_sms(instance.order.phone, message)
+    enqueue('sms', phone=instance.order.phone, message=message)
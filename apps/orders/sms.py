@@ -15,14 +15,15 @@ class SMSService:
         self.api_key = getattr(settings, 'SMS_API_KEY', 'test_key')
         self.sender_name = getattr(settings, 'SMS_SENDER_NAME', 'OLRIC')
 
-    def send_sms(self, phone, message):
+    def send_sms(self, phone, message, reference=None):
         """
         Routing method: Decides whether to use real SMS API or Mock.
+        reference is a client message id the provider can use to drop resends.
         """
         if self.use_mock:
             return self._send_mock_sms(phone, message)
         else:
-            return self._send_real_sms(phone, message)
+            return self._send_real_sms(phone, message, reference)
 
     # ==========================================
     # 🧪 MOCK IMPLEMENTATION (For Development)
@@ -43,7 +44,7 @@ class SMSService:
     # ==========================================
     # 🚀 REAL IMPLEMENTATION (Production Ready)
     # ==========================================
-    def _send_real_sms(self, phone, message):
+    def _send_real_sms(self, phone, message, reference=None):
         """
         Sends actual SMS via provider API.
         Replace with your SMS provider's implementation (e.g., Twilio, SMS.az, etc.)
@@ -56,7 +57,8 @@ class SMSService:
                 'api_key': self.api_key,
                 'sender': self.sender_name,
                 'phone': phone,
-                'message': message
+                'message': message,
+                'reference': reference,
             }
             
             # Uncomment when you have real API credentials:
@@ -0,0 +1,96 @@
+"""
+Stock bookkeeping for orders.
+
+Checkout takes stock with one guarded UPDATE per book
+(SET stock = stock - qty WHERE id = ? AND stock >= qty): the check and the
+decrement are a single statement, so concurrent buyers cannot both take the
+last copy and no row is locked for longer than the statement. Any line that
+doesn't match makes the whole order fail; the caller's transaction rolls
+back the lines already taken.
+"""
+from collections import Counter
+from dataclasses import dataclass
+from django.db.models import Case, When, Value, F, IntegerField
+from django.utils import timezone
+from apps.books.models import Book
+from . import reservations
+
+
+@dataclass(frozen=True)
+class Shortage:
+    book_id: int
+    title: str
+    requested: int
+    available: int
+
+
+class InsufficientStockError(Exception):
+    def __init__(self, shortages):
+        self.shortages = shortages
+        super().__init__(', '.join(f'{s.title}: {s.requested} > {s.available}' for s in shortages))
+
+
+def order_quantities(lines):
+    """{book_id: quantity} from (book_id, quantity) pairs; lines without a book are dropped."""
+    quantities = Counter()
+    for book_id, quantity in lines:
+        if book_id is not None:
+            quantities[book_id] += quantity
+    return quantities
+
+
+def take_stock(quantities, holder=None):
+    """
+    Decrements stock for {book_id: quantity}. Must run inside a transaction;
+    raises InsufficientStockError listing every short line.
+
+    Copies reserved by other shoppers are off limits; the holder's own
+    reservations are turned into the decrement and deleted.
+    """
+    now = timezone.now()
+    reserving = bool(reservations.reservation_minutes())
+    short = {}
+    # Fixed order, so concurrent checkouts touch rows in the same sequence
+    for book_id in sorted(quantities):
+        quantity = quantities[book_id]
+        needed = Value(quantity)
+        if reserving:
+            needed = needed + reservations.reserved_quantity(exclude_holder=holder, now=now)
+        taken = Book.objects.filter(id=book_id, stock__gte=needed).update(
+            stock=F('stock') - quantity, updated_at=now
+        )
+        if not taken:
+            short[book_id] = quantity
+    if not short:
+        reservations.release(holder)
+        return
+
+    books = Book.objects.filter(id__in=list(short))
+    if reserving:
+        books = books.annotate(available=F('stock') - reservations.reserved_quantity(exclude_holder=holder, now=now))
+    else:
+        books = books.annotate(available=F('stock'))
+    found = {book_id: (title, available) for book_id, title, available in books.values_list('id', 'title', 'available')}
+    raise InsufficientStockError([
+        Shortage(
+            book_id=book_id,
+            title=found.get(book_id, ('', 0))[0],
+            requested=quantity,
+            available=max(found.get(book_id, ('', 0))[1], 0),
+        )
+        for book_id, quantity in short.items()
+    ])
+
+
+def release_stock(quantities):
+    """Gives {book_id: quantity} back, e.g. when an order is cancelled."""
+    if not quantities:
+        return
+    Book.objects.filter(id__in=list(quantities)).update(
+        stock=F('stock') + Case(
+            *[When(id=book_id, then=Value(quantity)) for book_id, quantity in quantities.items()],
+            default=Value(0),
+            output_field=IntegerField(),
+        ),
+        updated_at=timezone.now(),
+    )
@@ -0,0 +1,76 @@
+from datetime import timedelta
+from django.contrib.sessions.models import Session
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from apps.orders.models import IdempotencyKey, Order
+from apps.books.tests.utils import make_book
+from .utils import place_order
+
+
+class IdempotentCheckoutTests(TestCase):
+    def test_resubmitted_form_replays_the_first_order(self):
+        book = make_book(stock=5)
+        self.client.post(reverse('cart:cart_add', args=[book.id]), {'quantity': 1})
+        key = self.client.get(reverse('orders:order_create')).context['idempotency_key']
+        data = {
+            'full_name': 'Test', 'email': 'test@example.com', 'phone': '+994501234567',
+            'address': 'Bakı', 'city': 'Bakı', 'payment_method': 'cash', 'idempotency_key': key,
+        }
+
+        first = self.client.post(reverse('orders:order_create'), data)
+        second = self.client.post(reverse('orders:order_create'), data)
+
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(first.context['order'], second.context['order'])
+        book.refresh_from_db()
+        self.assertEqual(book.stock, 4)
+
+
+class PendingSubmissionTests(TestCase):
+    def setUp(self):
+        self.book = make_book(stock=5)
+        self.client.post(reverse('cart:cart_add', args=[self.book.id]), {'quantity': 1})
+        self.key = self.client.get(reverse('orders:order_create')).context['idempotency_key']
+        self.holder = self.client.session.session_key
+        # The first submission has claimed the key but not finished yet
+        IdempotencyKey.objects.create(key=self.key, holder=self.holder, expires_at=timezone.now() + timedelta(hours=1))
+        self.pending_url = reverse('orders:order_pending', args=[self.key])
+
+    def test_duplicate_is_sent_to_the_processing_page_without_waiting(self):
+        data = {
+            'full_name': 'Test', 'email': 'test@example.com', 'phone': '+994501234567',
+            'address': 'Bakı', 'city': 'Bakı', 'payment_method': 'cash', 'idempotency_key': self.key,
+        }
+        response = self.client.post(reverse('orders:order_create'), data)
+
+        self.assertRedirects(response, self.pending_url, fetch_redirect_response=False)
+        self.assertEqual(Order.objects.count(), 0)
+
+        response = self.client.get(self.pending_url)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response['Refresh'], '2')
+
+    def test_processing_page_shows_the_finished_order(self):
+        order = place_order([(self.book, 1)])
+        IdempotencyKey.objects.filter(key=self.key).update(order=order)
+
+        response = self.client.get(self.pending_url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['order'], order)
+
+    def test_failed_submission_goes_back_to_the_cart(self):
+        IdempotencyKey.objects.filter(key=self.key).delete()
+
+        response = self.client.get(self.pending_url)
+
+        self.assertRedirects(response, reverse('cart:cart_detail'), fetch_redirect_response=False)
+
+
+class EmptyCartTests(TestCase):
+    def test_empty_cart_is_redirected_without_creating_a_session(self):
+        response = self.client.get(reverse('orders:order_create'))
+
+        self.assertRedirects(response, reverse('cart:cart_detail'), fetch_redirect_response=False)
+        self.assertFalse(Session.objects.exists())
@@ -0,0 +1,28 @@
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from apps.books.models import Book
+from apps.orders.models import Order, Sequence
+from apps.orders.numbers import next_order_number
+from apps.books.tests.utils import make_book
+
+
+class OrderNumberTests(TestCase):
+    def test_numbers_count_up_per_day(self):
+        prefix = f'OLR{timezone.localdate():%y%m%d}'
+        self.assertEqual([next_order_number(), next_order_number()], [prefix + '00001', prefix + '00002'])
+
+    def test_failed_checkout_leaves_a_gap(self):
+        book = make_book(stock=1)
+        data = {
+            'full_name': 'Test', 'email': 'test@example.com', 'phone': '+994501234567',
+            'address': 'Bakı', 'city': 'Bakı', 'payment_method': 'cash',
+        }
+        self.client.post(reverse('cart:cart_add', args=[book.id]), {'quantity': 1})
+        # Sold out between adding to the cart and checking out
+        Book.objects.filter(id=book.id).update(stock=0)
+
+        self.client.post(reverse('orders:order_create'), data)
+
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(Sequence.objects.get().value, 1)
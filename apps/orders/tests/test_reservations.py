@@ -0,0 +1,36 @@
+from datetime import timedelta
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from apps.books.models import Book
+from apps.orders import reservations
+from apps.orders.models import StockReservation
+from apps.orders.stock import InsufficientStockError
+from apps.books.tests.utils import make_book
+from .utils import place_order
+
+
+@override_settings(STOCK_RESERVATION_MINUTES=10)
+class ReservationTests(TestCase):
+    def test_reserved_copies_are_held_for_the_holder(self):
+        book = make_book(stock=1)
+        self.assertEqual(reservations.reserve('alice', {book.id: 1}), [book.id])
+        self.assertEqual(reservations.reserve('bob', {book.id: 1}), [])
+        self.assertEqual(Book.objects.with_available_stock().get(id=book.id).available_stock, 0)
+
+        with self.assertRaises(InsufficientStockError):
+            with transaction.atomic():
+                place_order([(book, 1)], holder='bob')
+        place_order([(book, 1)], holder='alice')
+
+        self.assertFalse(StockReservation.objects.exists())
+        book.refresh_from_db()
+        self.assertEqual(book.stock, 0)
+
+    def test_expired_reservations_do_not_count(self):
+        book = make_book(stock=1)
+        reservations.reserve('alice', {book.id: 1})
+        StockReservation.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        place_order([(book, 1)], holder='bob')
+        self.assertEqual(reservations.expired_reservations().count(), 1)
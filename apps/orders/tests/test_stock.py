@@ -0,0 +1,98 @@
+import threading
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from apps.orders.models import Order
+from apps.orders.numbers import next_order_number
+from apps.orders.services import OrderCoordinator
+from apps.orders.stock import InsufficientStockError
+from apps.books.tests.utils import make_book
+from .utils import place_order
+
+
+class StockTests(TestCase):
+    def test_order_takes_stock(self):
+        book = make_book(stock=5)
+        place_order([(book, 3)])
+        book.refresh_from_db()
+        self.assertEqual(book.stock, 2)
+
+    def test_shortage_rejects_whole_order(self):
+        plenty, scarce = make_book(1, stock=5), make_book(2, stock=1)
+
+        with self.assertRaises(InsufficientStockError) as ctx:
+            place_order([(plenty, 2), (scarce, 2)])
+
+        [shortage] = ctx.exception.shortages
+        self.assertEqual((shortage.book_id, shortage.requested, shortage.available), (scarce.id, 2, 1))
+        self.assertFalse(Order.objects.exists())
+        plenty.refresh_from_db()
+        self.assertEqual(plenty.stock, 5)
+
+    def test_cancel_restores_stock_once(self):
+        book = make_book(stock=2)
+        order = place_order([(book, 2)])
+
+        OrderCoordinator.change_status(order, 'cancelled')
+        OrderCoordinator.change_status(order, 'cancelled')
+        book.refresh_from_db()
+        self.assertEqual(book.stock, 2)
+
+        OrderCoordinator.change_status(order, 'pending')
+        book.refresh_from_db()
+        self.assertEqual(book.stock, 0)
+
+
+class ConcurrentCheckoutTests(TransactionTestCase):
+    BUYERS = 50
+
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest('Needs a database shared between threads (run with config.settings.testing)')
+
+    def test_last_copy_is_sold_once(self):
+        book = make_book(stock=1)
+        barrier = threading.Barrier(self.BUYERS)
+        results = []
+
+        def buy():
+            try:
+                barrier.wait()
+                place_order([(book, 1)])
+                results.append('sold')
+            except InsufficientStockError:
+                results.append('short')
+            except Exception as exc:
+                results.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=buy) for _ in range(self.BUYERS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results.count('sold'), 1, results)
+        self.assertEqual(results.count('short'), self.BUYERS - 1, results)
+        self.assertEqual(Order.objects.count(), 1)
+        book.refresh_from_db()
+        self.assertEqual(book.stock, 0)
+
+    def test_order_numbers_are_unique_under_load(self):
+        barrier = threading.Barrier(self.BUYERS)
+        numbers = []
+
+        def allocate():
+            try:
+                barrier.wait()
+                numbers.append(next_order_number())
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=allocate) for _ in range(self.BUYERS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(set(numbers)), self.BUYERS)
@@ -0,0 +1,20 @@
+from django.contrib.auth.models import AnonymousUser
+from apps.cart.cart import CartSnapshot
+from apps.cart.models import CartItem
+from apps.orders.models import Order
+from apps.orders.services import OrderCoordinator
+
+
+class FakeCart:
+    """Just enough of CartService for OrderCoordinator: a priced snapshot."""
+
+    def __init__(self, lines):
+        self.snapshot = CartSnapshot.from_items([CartItem(book=book, quantity=qty) for book, qty in lines])
+
+
+def place_order(lines, holder=None):
+    order = Order(
+        full_name='Test', email='test@example.com', phone='+994500000000',
+        address='Bakı', city='Bakı', payment_method='cash',
+    )
+    return OrderCoordinator.create_order(AnonymousUser(), order, FakeCart(lines), reservation_holder=holder)
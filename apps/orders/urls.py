@@ -5,6 +5,7 @@ app_name = 'orders'
 
 urlpatterns = [
     path('create/', views.order_create, name='order_create'),
+    path('pending/<str:key>/', views.order_pending, name='order_pending'),
     path('list/', views.order_list, name='order_list'),
     path('<str:order_number>/', views.order_detail, name='order_detail'),
     path('track/<str:order_number>/', views.order_track, name='order_track'),
@@ -1,33 +1,93 @@
+from django.db import transaction
 from django.shortcuts import render, redirect, get_object_or_404
+from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from apps.cart.cart import CartService
+from apps.cart.cart import get_cart
+from apps.coupons.rules import CouponUnavailableError
 from .models import Order, OrderItem
 from .forms import OrderCreateForm
+from .numbers import next_order_number
+from .stock import InsufficientStockError, order_quantities
+from . import idempotency, reservations
+
+# How often the "processing" page reloads while a duplicate submission waits
+PENDING_REFRESH_SECONDS = 2
+
+def _order_placed(request, order):
+    """Response for a placed order; also replayed for duplicate submissions."""
+    if order.payment_method == 'card':
+        return redirect('payments:process', order_number=order.order_number)
+    return render(request, 'orders/order_success.html', {'order': order})
 
 def order_create(request):
-    cart = CartService(request)
+    cart = get_cart(request)
+    key = request.POST.get('idempotency_key') if request.method == 'POST' else None
+
+    # A resubmitted form whose order already exists: replay, even though the cart is empty by now.
+    # Without a session there is no earlier submission to find.
+    if key and request.session.session_key:
+        order = idempotency.completed_order(key, request.session.session_key)
+        if order is not None:
+            return _order_placed(request, order)
+
     if cart.get_total_items() == 0:
         return redirect('cart:cart_detail')
 
+    # Only now: holder_for() saves a session, which bounced visitors don't need
+    holder = reservations.holder_for(request)
+
     if request.method == 'POST':
         form = OrderCreateForm(request.POST)
         if form.is_valid():
+            if key:
+                owner, order = idempotency.claim(key, holder)
+                if not owner:
+                    if order is not None:
+                        return _order_placed(request, order)
+                    # The first submission is still running (or failed); don't block on it
+                    return redirect('orders:order_pending', key=key)
+
             # Delegate strict business logic to the service
             from .services import OrderCoordinator
-            order = OrderCoordinator.create_order(
-                user=request.user,
-                order_instance=form.save(commit=False),
-                cart=cart
-            )
+            order_instance = form.save(commit=False)
+            # Allocated in its own short transaction, so checkouts don't queue on the sequence row
+            order_instance.order_number = next_order_number()
+            try:
+                with transaction.atomic():
+                    order = OrderCoordinator.create_order(
+                        user=request.user,
+                        order_instance=order_instance,
+                        cart=cart,
+                        reservation_holder=holder,
+                    )
+                    if key:
+                        idempotency.complete(key, order)
+            except InsufficientStockError as e:
+                if key:
+                    idempotency.abandon(key)
+                for shortage in e.shortages:
+                    messages.error(
+                        request,
+                        f'"{shortage.title}" üçün stokda yalnız {shortage.available} ədəd qalıb '
+                        f'(səbətdə {shortage.requested}).'
+                    )
+                return redirect('cart:cart_detail')
+            except CouponUnavailableError as e:
+                if key:
+                    idempotency.abandon(key)
+                request.session.pop('coupon_id', None)
+                messages.error(request, f'"{e.code}" kuponu artıq etibarlı deyil.')
+                return redirect('cart:cart_detail')
+            except Exception:
+                if key:
+                    idempotency.abandon(key)
+                raise
             
             # Clear the cart and coupon session after order is complete
             cart.clear()
             request.session.pop('coupon_id', None)
             
-            if order.payment_method == 'card':
-                return redirect('payments:process', order_number=order.order_number)
-            
-            return render(request, 'orders/order_success.html', {'order': order})
+            return _order_placed(request, order)
     else:
         # Pre-fill with user info if authenticated
         initial_data = {}
@@ -37,12 +97,29 @@ def order_create(request):
                 'email': request.user.email,
             }
         form = OrderCreateForm(initial=initial_data)
+        # Hold the cart's books while the form is being filled in
+        reservations.reserve(holder, order_quantities((item.book_id, item.quantity) for item in cart))
 
     return render(request, 'orders/order_create.html', {
         'cart': cart, 
-        'form': form
+        'form': form,
+        'idempotency_key': key or idempotency.new_key(),
     })
 
+def order_pending(request, key):
+    """Where duplicate submissions wait; reloads itself until the first one has finished."""
+    holder = reservations.holder_for(request)
+    order = idempotency.completed_order(key, holder)
+    if order is not None:
+        return _order_placed(request, order)
+    if not idempotency.in_progress(key, holder):
+        # The first submission failed and released its key; its errors were shown to that request
+        messages.error(request, 'Sifariş tamamlanmadı. Zəhmət olmasa, yenidən cəhd edin.')
+        return redirect('cart:cart_detail')
+    response = render(request, 'orders/order_pending.html', status=202)
+    response['Refresh'] = str(PENDING_REFRESH_SECONDS)
+    return response
+
 @login_required
 def order_list(request):
     orders = request.user.orders.all()
@@ -0,0 +1,14 @@
+from django.contrib import admin
+from django.utils import timezone
+from .models import OutboxMessage
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'status', 'attempts', 'available_at', 'created_at', 'sent_at')
+    list_filter = ('kind', 'status')
+    readonly_fields = ('created_at', 'sent_at', 'last_error')
+    actions = ['retry_messages']
+
+    def retry_messages(self, request, queryset):
+        queryset.exclude(status='sent').update(status='pending', attempts=0, available_at=timezone.now())
+    retry_messages.short_description = "Retry selected messages"
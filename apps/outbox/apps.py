@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+class OutboxConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.outbox'
+
+    def ready(self):
+        import apps.outbox.handlers  # Register handlers
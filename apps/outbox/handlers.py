@@ -0,0 +1,74 @@
+"""
+Outbox message handlers, one per kind. A handler receives the payload dict
+and the message's idempotency key, and raises on failure so the worker
+retries it.
+
+A worker can die after a provider accepted a message but before the row is
+marked sent; the message is then delivered again once its lease expires.
+The key is the same for every attempt of a message, and handlers pass it
+to the provider (Idempotency-Key header, Message-ID, SMS reference) so the
+repeat can be recognised and dropped.
+"""
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+
+HANDLERS = {}
+
+
+class DeliveryError(Exception):
+    pass
+
+
+def handler(kind):
+    """Registers fn(payload, key) as the handler for kind."""
+    def register(fn):
+        HANDLERS[kind] = fn
+        return fn
+    return register
+
+
+def idempotency_key(message):
+    return f'outbox-{message.pk}'
+
+
+def dispatch(message):
+    try:
+        fn = HANDLERS[message.kind]
+    except KeyError:
+        raise DeliveryError(f'No outbox handler for {message.kind!r}')
+    fn(message.payload, idempotency_key(message))
+
+
+@handler('sms')
+def send_sms(payload, key):
+    from apps.orders.sms import SMSService
+
+    result = SMSService().send_sms(payload['phone'], payload['message'], reference=key)
+    if isinstance(result, dict) and result.get('status') == 'error':
+        raise DeliveryError(result.get('message', 'SMS provider error'))
+
+
+@handler('email')
+def send_email(payload, key):
+    domain = settings.DEFAULT_FROM_EMAIL.rpartition('@')[2] or 'localhost'
+    email = EmailMultiAlternatives(
+        payload['subject'],
+        payload['body'],
+        payload.get('from_email') or settings.DEFAULT_FROM_EMAIL,
+        payload['to'],
+        # A resent copy carries the same Message-ID, which mail clients deduplicate
+        headers={'Message-ID': f'<{key}@{domain}>'},
+    )
+    if payload.get('html'):
+        email.attach_alternative(payload['html'], 'text/html')
+    email.send()
+
+
+@handler('webhook')
+def post_webhook(payload, key):
+    import requests
+
+    response = requests.post(
+        payload['url'], json=payload.get('body', {}), headers={'Idempotency-Key': key}, timeout=10
+    )
+    response.raise_for_status()
@@ -0,0 +1,25 @@
+import os
+import socket
+import time
+from django.core.management.base import BaseCommand
+from apps.outbox.service import run_once
+
+class Command(BaseCommand):
+    help = 'Delivers queued outbox messages (SMS, email, webhooks) with retries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50, help='Messages claimed at a time')
+        parser.add_argument('--sleep', type=float, default=2.0, help='Seconds to wait when nothing is due')
+        parser.add_argument('--once', action='store_true', help='Process one batch and exit')
+
+    def handle(self, *args, **options):
+        worker_id = f'{socket.gethostname()}:{os.getpid()}'[-64:]
+        self.stdout.write(f'Outbox worker {worker_id} started.')
+        while True:
+            sent, failed = run_once(worker_id, options['batch_size'])
+            if sent or failed:
+                self.stdout.write(self.style.SUCCESS(f'Sent {sent}, failed {failed}.'))
+            if options['once']:
+                return
+            if not sent and not failed:
+                time.sleep(options['sleep'])
@@ -0,0 +1,33 @@
+from django.db import models
+from django.utils import timezone
+
+class OutboxMessage(models.Model):
+    """
+    A side effect (SMS, email, webhook...) recorded in the same transaction
+    as the change that causes it and delivered later by the run_outbox worker.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Gözləyir'),
+        ('processing', 'Göndərilir'),
+        ('sent', 'Göndərildi'),
+        ('failed', 'Uğursuz'),
+    ]
+    kind = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    # Next attempt for pending rows; lease expiry for processing rows
+    available_at = models.DateTimeField(default=timezone.now)
+    claimed_by = models.CharField(max_length=64, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'available_at'], name='outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
@@ -0,0 +1,104 @@
+"""
+Transactional outbox.
+
+enqueue() inserts an OutboxMessage with the caller's transaction, so a side
+effect is recorded if and only if the change that caused it commits, and
+the request never waits on an external provider. The run_outbox worker
+reads a batch of due ids and sends them one by one:
+
+- each message is claimed right before it is sent, with a conditional
+  UPDATE that stamps it with the worker id and a lease
+  (available_at = now + LEASE). Only that one send runs under the lease, so
+  a slow batch can't outlive it, several workers never send the same row,
+  and the rows of a crashed worker become due again when the lease runs out;
+- handlers get a key that is stable across retries (see handlers.py), so
+  providers can drop the duplicate when a worker dies between sending and
+  recording the result;
+- a failed send is retried after OUTBOX_RETRY_BASE_SECONDS * 2^(attempt-1)
+  (capped at an hour) until OUTBOX_MAX_ATTEMPTS, then marked failed.
+"""
+import logging
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from .handlers import dispatch
+from .models import OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+LEASE = timedelta(minutes=5)
+MAX_BACKOFF = timedelta(hours=1)
+
+
+def enqueue(kind, **payload):
+    """Records a side effect to run after commit. Payload must be JSON serializable."""
+    return OutboxMessage.objects.create(kind=kind, payload=payload)
+
+
+def retry_delay(attempts):
+    base = getattr(settings, 'OUTBOX_RETRY_BASE_SECONDS', 30)
+    return min(timedelta(seconds=base * 2 ** (attempts - 1)), MAX_BACKOFF)
+
+
+def due_ids(batch_size=50, now=None):
+    """Ids of up to batch_size messages that are due (pending, or with an expired lease)."""
+    now = now or timezone.now()
+    return list(
+        OutboxMessage.objects.filter(_due(now)).order_by('available_at').values_list('id', flat=True)[:batch_size]
+    )
+
+
+def claim(message_id, worker_id, now=None):
+    """Leases one due message to worker_id and returns it, or None if it is no longer due."""
+    now = now or timezone.now()
+    claimed = OutboxMessage.objects.filter(_due(now), id=message_id).update(
+        status='processing', claimed_by=worker_id, available_at=now + LEASE
+    )
+    if not claimed:
+        # Sent, or claimed by another worker since due_ids() saw it
+        return None
+    return OutboxMessage.objects.filter(id=message_id, claimed_by=worker_id).first()
+
+
+def _due(now):
+    return Q(status__in=['pending', 'processing'], available_at__lte=now)
+
+
+def deliver(message):
+    """Dispatches one claimed message and records the outcome. Returns True when sent."""
+    max_attempts = getattr(settings, 'OUTBOX_MAX_ATTEMPTS', 8)
+    attempts = message.attempts + 1
+    try:
+        dispatch(message)
+    except Exception as e:
+        logger.warning('Outbox %s #%s failed (attempt %s): %s', message.kind, message.pk, attempts, e)
+        status = 'failed' if attempts >= max_attempts else 'pending'
+        OutboxMessage.objects.filter(pk=message.pk, claimed_by=message.claimed_by).update(
+            status=status,
+            attempts=attempts,
+            available_at=timezone.now() + retry_delay(attempts),
+            last_error=f'{type(e).__name__}: {e}',
+        )
+        return False
+
+    OutboxMessage.objects.filter(pk=message.pk, claimed_by=message.claimed_by).update(
+        status='sent', attempts=attempts, sent_at=timezone.now(), last_error='',
+    )
+    return True
+
+
+def run_once(worker_id=None, batch_size=50):
+    """Claims and delivers up to batch_size messages, one at a time. Returns (sent, failed)."""
+    worker_id = worker_id or uuid.uuid4().hex
+    sent = failed = 0
+    for message_id in due_ids(batch_size):
+        message = claim(message_id, worker_id)
+        if message is None:
+            continue
+        if deliver(message):
+            sent += 1
+        else:
+            failed += 1
+    return sent, failed
@@ -0,0 +1,147 @@
+from datetime import timedelta
+from unittest import mock
+from django.core import mail
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from apps.books.tests.utils import make_book
+from apps.orders.tests.utils import place_order
+from apps.outbox import service
+from apps.outbox.handlers import HANDLERS, DeliveryError, dispatch
+from apps.outbox.models import OutboxMessage
+
+
+class Recorder:
+    """Test handler: records (payload, key) and fails while fail_times > 0."""
+
+    def __init__(self, fail_times=0):
+        self.calls = []
+        self.fail_times = fail_times
+
+    def __call__(self, payload, key):
+        self.calls.append((payload, key))
+        if self.fail_times:
+            self.fail_times -= 1
+            raise DeliveryError('provider down')
+
+
+class OutboxTestCase(TestCase):
+    def setUp(self):
+        self.handler = Recorder()
+        patcher = mock.patch.dict(HANDLERS, {'test': self.handler})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class ClaimTests(OutboxTestCase):
+    def test_claim_leases_a_message_to_one_worker(self):
+        message = service.enqueue('test', n=1)
+
+        claimed = service.claim(message.id, 'worker-a')
+
+        self.assertEqual((claimed.status, claimed.claimed_by), ('processing', 'worker-a'))
+        self.assertGreater(claimed.available_at, timezone.now())
+        self.assertIsNone(service.claim(message.id, 'worker-b'))
+        self.assertEqual(service.due_ids(), [])
+
+    def test_expired_lease_is_claimed_again(self):
+        message = service.enqueue('test', n=1)
+        service.claim(message.id, 'worker-a')
+
+        later = timezone.now() + service.LEASE + timedelta(seconds=1)
+        self.assertEqual(service.due_ids(now=later), [message.id])
+        self.assertEqual(service.claim(message.id, 'worker-b', now=later).claimed_by, 'worker-b')
+
+    def test_stale_worker_cannot_record_a_result(self):
+        message = service.enqueue('test', n=1)
+        stale = service.claim(message.id, 'worker-a')
+        later = timezone.now() + service.LEASE + timedelta(seconds=1)
+        service.claim(message.id, 'worker-b', now=later)
+
+        service.deliver(stale)
+
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.claimed_by), ('processing', 'worker-b'))
+
+    def test_run_once_sends_with_a_stable_key(self):
+        message = service.enqueue('test', n=1)
+
+        self.assertEqual(service.run_once('worker-a'), (1, 0))
+        self.assertEqual(self.handler.calls, [({'n': 1}, f'outbox-{message.id}')])
+        message.refresh_from_db()
+        self.assertEqual(message.status, 'sent')
+        self.assertEqual(service.run_once('worker-a'), (0, 0))
+
+
+@override_settings(OUTBOX_RETRY_BASE_SECONDS=30, OUTBOX_MAX_ATTEMPTS=3)
+class RetryTests(OutboxTestCase):
+    def test_backoff_doubles_and_is_capped(self):
+        self.assertEqual(service.retry_delay(1), timedelta(seconds=30))
+        self.assertEqual(service.retry_delay(3), timedelta(seconds=120))
+        self.assertEqual(service.retry_delay(20), service.MAX_BACKOFF)
+
+    def test_failed_send_is_retried_later(self):
+        self.handler.fail_times = 1
+        message = service.enqueue('test', n=1)
+
+        with self.assertLogs('apps.outbox.service', 'WARNING'):
+            self.assertEqual(service.run_once('worker-a'), (0, 1))
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.attempts), ('pending', 1))
+        self.assertIn('provider down', message.last_error)
+        self.assertGreater(message.available_at, timezone.now() + timedelta(seconds=25))
+
+        OutboxMessage.objects.update(available_at=timezone.now())
+        self.assertEqual(service.run_once('worker-a'), (1, 0))
+        self.assertEqual([key for _, key in self.handler.calls], [f'outbox-{message.id}'] * 2)
+
+    def test_gives_up_after_max_attempts(self):
+        self.handler.fail_times = 10
+        message = service.enqueue('test', n=1)
+
+        with self.assertLogs('apps.outbox.service', 'WARNING'):
+            for _ in range(3):
+                OutboxMessage.objects.update(available_at=timezone.now())
+                service.run_once('worker-a')
+
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.attempts), ('failed', 3))
+        OutboxMessage.objects.update(available_at=timezone.now())
+        self.assertEqual(service.due_ids(), [])
+
+
+class EnqueueTests(TestCase):
+    def confirm(self, order):
+        order.status = 'confirmed'
+        order.save()
+
+    def test_message_commits_with_the_order_change(self):
+        order = place_order([(make_book(stock=1), 1)])
+
+        with transaction.atomic():
+            self.confirm(order)
+
+        message = OutboxMessage.objects.get()
+        self.assertEqual((message.kind, message.payload['phone']), ('sms', order.phone))
+
+    def test_rolled_back_change_leaves_no_message(self):
+        order = place_order([(make_book(stock=1), 1)])
+
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                self.confirm(order)
+                raise RuntimeError
+
+        self.assertFalse(OutboxMessage.objects.exists())
+
+
+class HandlerTests(TestCase):
+    def test_email_resends_keep_the_message_id(self):
+        message = service.enqueue('email', subject='Salam', body='...', to=['a@example.com'])
+
+        dispatch(message)
+        dispatch(message)
+
+        first, second = mail.outbox
+        self.assertEqual(first.extra_headers['Message-ID'], second.extra_headers['Message-ID'])
+        self.assertIn(f'outbox-{message.id}', first.message()['Message-ID'])
@@ -1,4 +1,6 @@
 from django.contrib import admin
+from django.db import transaction
+from apps.books.models import Book
 from .models import Review
 
 @admin.register(Review)
@@ -8,10 +10,17 @@ class ReviewAdmin(admin.ModelAdmin):
     search_fields = ('book__title', 'user__username', 'comment')
     actions = ['approve_reviews', 'disapprove_reviews']
 
+    @transaction.atomic
     def approve_reviews(self, request, queryset):
+        book_ids = list(queryset.values_list('book_id', flat=True))
         queryset.update(is_active=True)
+        # Bulk update skips signals, so refresh the affected books explicitly
+        Book.objects.filter(id__in=book_ids).refresh_ratings()
     approve_reviews.short_description = "Approve selected reviews"
 
+    @transaction.atomic
     def disapprove_reviews(self, request, queryset):
+        book_ids = list(queryset.values_list('book_id', flat=True))
         queryset.update(is_active=False)
+        Book.objects.filter(id__in=book_ids).refresh_ratings()
     disapprove_reviews.short_description = "Disapprove selected reviews"
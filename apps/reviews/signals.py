@@ -0,0 +1,10 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from apps.books.models import Book
+from .models import Review
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def refresh_book_rating(sender, instance, **kwargs):
+    """Keeps Book.rating_avg / rating_count / rating_score in sync with active reviews."""
+    Book.objects.filter(pk=instance.book_id).refresh_ratings()
@@ -1,5 +1,6 @@
 from django.shortcuts import get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
+from django.db import transaction
 from django.http import JsonResponse
 from django.views.decorators.http import require_POST
 from apps.books.models import Book
@@ -8,6 +9,7 @@ from .forms import ReviewForm
 
 @login_required
 @require_POST
+@transaction.atomic
 def add_review(request, book_id):
     book = get_object_or_404(Book, id=book_id)
     
@@ -45,6 +47,7 @@ def add_review(request, book_id):
 
 @login_required
 @require_POST
+@transaction.atomic
 def delete_review(request, review_id):
     review = get_object_or_404(Review, id=review_id, user=request.user)
     review.delete()
@@ -55,6 +58,7 @@ def delete_review(request, review_id):
 
 @login_required
 @require_POST
+@transaction.atomic
 def edit_review(request, review_id):
     review = get_object_or_404(Review, id=review_id, user=request.user)
     form = ReviewForm(request.POST, instance=review)
@@ -44,6 +44,7 @@ INSTALLED_APPS = [
     'apps.dashboard',
     'apps.reviews',
     'apps.wishlist',
+    'apps.outbox',
 ]
 
 MIDDLEWARE = [
@@ -179,6 +180,31 @@ SECURE_CONTENT_TYPE_NOSNIFF = True
 SECURE_BROWSER_XSS_FILTER = True
 # Cart settings
 CART_SESSION_ID = 'cart_id'
+# Guest carts: 'database' (Cart/CartItem rows) or 'session' (compact lines in the session)
+CART_ANONYMOUS_STORAGE = 'database'
+CART_SESSION_LINES = 'cart_lines'
+CART_SESSION_MAX_LINES = 50
+# cleanup_carts deletes guest carts untouched for this long
+CART_ANONYMOUS_TTL_DAYS = 14
+# Checkout holds the cart's books this long (0 disables reservations)
+STOCK_RESERVATION_MINUTES = 10
+# Checkout form tokens are kept this long
+IDEMPOTENCY_KEY_TTL_HOURS = 24
+
+# Outbox worker (run_outbox): retry after 30s, 60s, 120s... up to 8 attempts
+OUTBOX_RETRY_BASE_SECONDS = 30
+OUTBOX_MAX_ATTEMPTS = 8
+
+# Book view counter: hits are buffered per worker and flushed in batches
+BOOK_VIEWS_FLUSH_THRESHOLD = 100
+BOOK_VIEWS_FLUSH_INTERVAL = 30  # seconds
+# Write what is still buffered when the worker exits
+BOOK_VIEWS_FLUSH_AT_EXIT = True
+
+# Trending scores (see update_trending)
+TRENDING_HALF_LIFE_DAYS = 7
+TRENDING_SALES_WINDOW_DAYS = 30
+BESTSELLER_COUNT = 20
 
 # Account Settings
 LOGIN_URL = 'accounts:login'
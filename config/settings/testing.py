@@ -0,0 +1,34 @@
+from .base import *
+
+DEBUG = False
+
+# File-backed test database: concurrency tests open one connection per
+# thread, which an in-memory database cannot share. IMMEDIATE transactions
+# take the write lock up front and writers wait for it instead of failing.
+# Its own file, so nothing under test ever opens the development database.
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'testing.sqlite3',
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
+    }
+}
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+AXES_ENABLED = False
+
+# Rebuild the typeahead index in the request thread: a background thread has
+# its own connection and can't see a test's uncommitted rows
+AUTOCOMPLETE_BACKGROUND_REBUILD = False
+
+# The exit flush would run after the test database is gone
+BOOK_VIEWS_FLUSH_AT_EXIT = False
@@ -6,7 +6,10 @@ import sys
 
 def main():
     """Run administrative tasks."""
-    # Default to development settings
+    # Default to development settings; the test runner gets the testing settings
+    # (file-backed SQLite, so the concurrency tests can share the database)
+    if len(sys.argv) > 1 and sys.argv[1] == 'test':
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.testing')
     os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.development')
     try:
         from django.core.management import execute_from_command_line